@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from typing import List, Dict, Any, Optional, Union, Literal
 from datetime import datetime
 from enum import Enum
+from uuid import UUID
+from latency_histogram import LatencyHistogram
 
 class TestStatus(str, Enum):
     PENDING = "pending"
@@ -102,16 +104,36 @@ class EndpointSchema(BaseModel):
 
 class OpenAPIEndpointsRequest(BaseModel):
     target_url: HttpUrl = Field(..., description="URL of the target API to analyze")
+    spec_path: Optional[str] = Field(None, description="JSON or YAML spec file under the server's specs directory to use instead of probing target_url")
+
+class SpecChanges(BaseModel):
+    """Operations that differ from the previously fetched version of a target's spec"""
+    added: List[str] = Field(default_factory=list, description="\"METHOD /path\" keys of new operations")
+    removed: List[str] = Field(default_factory=list, description="Keys of operations no longer in the spec")
+    changed: List[str] = Field(default_factory=list, description="Keys of operations whose definition changed")
+    affected_configurations: List[str] = Field(default_factory=list, description="IDs of saved session configurations calling a removed or changed operation")
 
 class OpenAPIEndpointsResponse(BaseModel):
     target_url: HttpUrl = Field(..., description="Target API URL")
     endpoints: List[EndpointSchema] = Field(default_factory=list, description="List of endpoints")
     timestamp: datetime = Field(default_factory=datetime.now, description="Timestamp of the analysis")
+    changes: Optional[SpecChanges] = Field(None, description="Changes since the spec was last fetched; absent the first time")
 
 class DistributionStrategy(str, Enum):
     SEQUENTIAL = "sequential"
     INTERLEAVED = "interleaved"
     RANDOM = "random"
+    ADAPTIVE = "adaptive"  # Search for the highest concurrency that still meets the SLO
+
+class LoadMode(str, Enum):
+    """How load is generated during an advanced stress test"""
+    CLOSED_LOOP = "closed_loop"  # Step through concurrency levels, waiting for each batch to finish
+    OPEN_LOOP = "open_loop"  # Fire requests at request_rate for duration, independent of response times
+
+class ArrivalDistribution(str, Enum):
+    """Spacing of request arrivals in open-loop mode"""
+    FIXED = "fixed"  # Evenly spaced at 1 / request_rate
+    POISSON = "poisson"  # Exponentially distributed gaps averaging 1 / request_rate
 
 class DataGenerationStrategy(str, Enum):
     """Strategy for generating test data for endpoints"""
@@ -119,19 +141,81 @@ class DataGenerationStrategy(str, Enum):
     CONSISTENT_RANDOM = "consistent_random"  # Use the same random data for all requests
     USER_DEFINED = "user_defined"  # Use user-defined data
 
+class ExportFormat(str, Enum):
+    """Serialisation of exported test rows"""
+    NDJSON = "ndjson"  # One JSON object per line
+    CSV = "csv"  # Header line, then one comma-separated line per row
+    PARQUET = "parquet"  # Columnar file, one row group per batch (requires the 'pyarrow' package)
+
+class ExportRows(str, Enum):
+    """Which rows of a test are exported"""
+    SAMPLES = "samples"  # One row per request, from the raw sample file
+    RESULTS = "results"  # One row per endpoint and concurrency level
+
+class ResponseBodyMode(str, Enum):
+    """How response bodies are handled on the request hot path"""
+    DISCARD = "discard"  # Stream the body off the socket and drop it
+    SIZE_ONLY = "size_only"  # Stream the body and record its size
+    SAMPLE = "sample"  # Decode a percentage of bodies and keep a few for inspection
+    VALIDATE = "validate"  # Decode every body and check it against the OpenAPI response schema
+
+class LoadProfileShape(str, Enum):
+    """Shape of the load over time in a load-profile run"""
+    RAMP = "ramp"  # Linear ramp up to target, hold, linear ramp down
+    STEP = "step"  # Ramp up to target in equal steps, hold, ramp down
+    SPIKE = "spike"  # Ramp up and hold, with a burst of spike_multiplier x target halfway through
+    SOAK = "soak"  # Ramp up, then hold target for the whole steady period
+    CUSTOM = "custom"  # Piecewise-linear schedule given by points
+
+class LoadProfileDriver(str, Enum):
+    """What a load profile's target controls"""
+    USERS = "users"  # Number of virtual users, each sending requests back to back with think time in between
+    RATE = "rate"  # Arrival rate in requests per second, independent of response times
+
+class LoadProfilePoint(BaseModel):
+    at: float = Field(..., ge=0, description="Seconds since the start of the run")
+    value: float = Field(..., ge=0, description="Virtual users or requests per second at this time")
+    phase: Optional[str] = Field(None, description="Phase name for the segment starting here")
+
+class LoadProfileConfig(BaseModel):
+    shape: LoadProfileShape = Field(LoadProfileShape.RAMP, description="Shape of the load over time")
+    driver: LoadProfileDriver = Field(LoadProfileDriver.USERS, description="Whether the profile drives virtual users or arrival rate")
+    target: float = Field(1, ge=0, description="Peak virtual users or requests per second (ignored for custom profiles)")
+    ramp_up: float = Field(0, ge=0, description="Seconds taken to reach target")
+    steady: float = Field(0, ge=0, description="Seconds spent at target")
+    ramp_down: float = Field(0, ge=0, description="Seconds taken to return to zero after the steady period")
+    steps: int = Field(4, ge=1, description="Number of equal steps in the ramp up of a step profile")
+    spike_multiplier: float = Field(3.0, ge=1, description="Load during the spike of a spike profile, relative to target")
+    spike_duration: float = Field(10, ge=0, description="Seconds the spike of a spike profile lasts")
+    points: Optional[List[LoadProfilePoint]] = Field(None, description="Schedule of a custom profile, in time order")
+    think_time: float = Field(0, ge=0, description="Seconds each virtual user waits between requests")
+
+class AdaptiveSearchConfig(BaseModel):
+    percentile: float = Field(99, gt=0, le=100, description="Latency percentile the SLO applies to")
+    max_latency: float = Field(1.0, gt=0, description="Highest acceptable latency at that percentile, in seconds")
+    max_error_rate: float = Field(1.0, ge=0, le=100, description="Highest acceptable percentage of failed requests")
+    window: float = Field(1.0, gt=0, description="Seconds per measurement window while a level is held")
+    min_hold: float = Field(3.0, ge=0, description="Seconds each level is held at least")
+    max_hold: float = Field(30.0, gt=0, description="Seconds after which a level is judged even if latency has not settled")
+    stable_windows: int = Field(3, ge=2, description="Consecutive windows whose latency must agree before a level is judged on them")
+    stability_tolerance: float = Field(0.1, gt=0, description="Largest coefficient of variation of the windows' latency percentile that counts as stable")
+    resolution: float = Field(0.05, ge=0, le=1, description="Stop searching once the knee is bracketed to within this fraction of the concurrency (or one user)")
+
 class StressTestEndpointConfig(BaseModel):
     path: str = Field(..., description="Endpoint path")
     method: str = Field(..., description="HTTP method")
     weight: Optional[float] = Field(1.0, description="Weight for distribution strategies")
     custom_parameters: Optional[Dict[str, Any]] = Field(None, description="Custom parameters for this endpoint")
     data_strategy: DataGenerationStrategy = Field(
-        DataGenerationStrategy.CONSISTENT_RANDOM, 
-        description="Strategy for generating test data"
+        DataGenerationStrategy.RANDOM_EACH_TIME, 
+        description="Strategy for generating test data (fresh data per request unless another strategy is chosen)"
     )
     test_data_samples: Optional[List[Dict[str, Any]]] = Field(
         None, 
         description="Sample data to use for testing (used with CONSISTENT_RANDOM or USER_DEFINED strategies)"
     )
+    body_mode: ResponseBodyMode = Field(ResponseBodyMode.DISCARD, description="How response bodies are handled")
+    body_sample_percent: float = Field(1.0, ge=0, le=100, description="Percentage of responses decoded in sample mode")
 
 class StressTestConfig(BaseModel):
     target_url: HttpUrl = Field(..., description="URL of the target API to test")
@@ -142,6 +226,22 @@ class StressTestConfig(BaseModel):
     endpoints: List[StressTestEndpointConfig] = Field(..., min_items=1, description="List of endpoints to test")
     headers: Optional[Dict[str, str]] = Field(None, description="Optional request headers")
     use_random_session: bool = Field(False, description="Whether to use random sessions for testing")
+    load_mode: LoadMode = Field(LoadMode.CLOSED_LOOP, description="Closed-loop concurrency steps or open-loop constant arrival rate")
+    arrival_distribution: ArrivalDistribution = Field(ArrivalDistribution.FIXED, description="Arrival spacing used in open-loop mode")
+    http2: bool = Field(False, description="Multiplex requests over HTTP/2 (requires the 'h2' package)")
+    max_connections: Optional[int] = Field(None, ge=1, description="Connection pool size per target; defaults to max_concurrent_users")
+    max_keepalive_connections: Optional[int] = Field(None, ge=0, description="Idle connections kept open per target; defaults to the pool size")
+    worker_processes: Optional[int] = Field(None, ge=1, le=64, description="Worker processes to shard closed-loop load across; runs inside the API process when unset")
+    agents: Optional[List[str]] = Field(None, description="Base URLs of load agents to spread the test across; runs locally when unset")
+    session_config_id: Optional[UUID] = Field(None, description="Session configuration this run is stored under")
+    record_samples: bool = Field(False, description="Write one raw record per in-process request to disk for post-run queries")
+    adaptive: Optional[AdaptiveSearchConfig] = Field(None, description="SLO and hold settings for the adaptive strategy; defaults apply when unset")
+    load_profile: Optional[LoadProfileConfig] = Field(None, description="Drive virtual users or arrival rate over time instead of stepping through concurrency levels; duration and strategy are then ignored")
+
+class AgentTestRequest(BaseModel):
+    test_id: str = Field(..., description="Test ID assigned by the coordinator")
+    start_at: float = Field(..., description="Start time in seconds since the epoch, on the agent's clock")
+    config: Dict[str, Any] = Field(..., description="This agent's share of the advanced test configuration")
 
 class StressTestProgressResponse(BaseModel):
     test_id: str = Field(..., description="Unique identifier for the test")
@@ -151,16 +251,35 @@ class StressTestProgressResponse(BaseModel):
     results_available: bool = Field(..., description="Whether partial results are available")
 
 class EndpointResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
     endpoint: str = Field(..., description="Endpoint path and method")
     concurrent_requests: int = Field(..., description="Number of concurrent requests")
     success_count: int = Field(..., description="Number of successful requests")
     failure_count: int = Field(..., description="Number of failed requests")
-    avg_response_time: float = Field(..., description="Average response time in seconds")
+    avg_response_time: float = Field(..., description="Average response time in seconds, excluding client pool wait")
     min_response_time: float = Field(..., description="Minimum response time in seconds")
     max_response_time: float = Field(..., description="Maximum response time in seconds")
+    p50_response_time: float = Field(0.0, description="Median response time in seconds")
+    p90_response_time: float = Field(0.0, description="90th percentile response time in seconds")
+    p99_response_time: float = Field(0.0, description="99th percentile response time in seconds")
+    p999_response_time: float = Field(0.0, description="99.9th percentile response time in seconds")
+    avg_pool_wait_time: float = Field(0.0, description="Average time spent waiting for a client connection pool slot in seconds")
+    max_pool_wait_time: float = Field(0.0, description="Longest time a request waited for a client connection pool slot in seconds")
+    avg_connect_time: float = Field(0.0, description="Average TCP connect time in seconds, over requests that opened a connection")
+    avg_tls_time: float = Field(0.0, description="Average TLS handshake time in seconds, over requests that performed one")
+    avg_time_to_first_byte: float = Field(0.0, description="Average time from sending request headers to receiving response headers in seconds")
+    avg_download_time: float = Field(0.0, description="Average response body download time in seconds")
+    connections_opened: int = Field(0, description="Number of requests that opened a new connection")
+    avg_response_size: float = Field(0.0, description="Average response body size in bytes, when measured")
+    response_samples: List[Any] = Field(default_factory=list, description="A few decoded response bodies kept in sample mode")
+    validation_failures: int = Field(0, description="Number of responses that did not match the OpenAPI response schema")
+    validation_error: Optional[str] = Field(None, description="First schema validation error, if any")
     status_codes: Dict[str, int] = Field(default_factory=dict, description="Count of each status code")
     timestamp: datetime = Field(default_factory=datetime.now, description="Timestamp of the test")
     error_message: Optional[str] = Field(None, description="Error message if any")
+    phase: Optional[str] = Field(None, description="Load profile phase the result covers, if the run followed a load profile")
+    histogram: Optional[LatencyHistogram] = Field(None, exclude=True, description="Latency histogram of successful requests")
 
 class StressTestResultsResponse(BaseModel):
     test_id: str = Field(..., description="Test identifier")
@@ -171,6 +290,32 @@ class StressTestResultsResponse(BaseModel):
     results: List[EndpointResult] = Field(default_factory=list, description="List of endpoint results")
     summary: Dict[str, Any] = Field(..., description="Test summary statistics")
 
+class MetricsHistoryResponse(BaseModel):
+    test_id: str = Field(..., description="Test identifier")
+    cursor: int = Field(..., description="Sequence number of the newest window returned; pass it back as 'since'")
+    start: int = Field(..., description="Sequence number of the first window returned")
+    fields: List[str] = Field(..., description="Fields recorded for every series")
+    timestamps: List[Optional[float]] = Field(..., description="Unix time at which each window closed")
+    series: Dict[str, Dict[str, List[Optional[float]]]] = Field(
+        ..., description="Per series ('*' for test totals, then 'METHOD path'), one column of values per field"
+    )
+
+class SamplePercentilesResponse(BaseModel):
+    test_id: str = Field(..., description="Test identifier")
+    count: int = Field(..., description="Number of recorded requests matching the filters")
+    errors: int = Field(..., description="Matching requests that failed or returned an error status")
+    percentiles: Dict[str, float] = Field(..., description="Exact latency percentiles of successful requests in seconds")
+
+class SampleWindowsResponse(BaseModel):
+    test_id: str = Field(..., description="Test identifier")
+    width: float = Field(..., description="Window width in seconds")
+    start_ns: List[int] = Field(..., description="Start of each window in nanoseconds since the epoch")
+    requests: List[int] = Field(..., description="Requests started in each window")
+    errors: List[int] = Field(..., description="Failed requests started in each window")
+    mean: List[float] = Field(..., description="Mean latency of successful requests in each window in seconds")
+    p50: List[float] = Field(..., description="Median latency of successful requests in each window in seconds")
+    p99: List[float] = Field(..., description="99th percentile latency of successful requests in each window in seconds")
+
 class DataGenerationRequest(BaseModel):
     schema_type: str = Field(..., description="Schema type (string, integer, number, boolean, object, array)")
     schema_format: Optional[str] = Field(None, description="Schema format (e.g., email, date, uri)")
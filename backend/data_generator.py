@@ -1,93 +1,135 @@
 from faker import Faker
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable
+import json
 import random
 import logging
 
 logger = logging.getLogger(__name__)
 
+PRIMITIVE_TYPES = ('string', 'integer', 'number', 'boolean')
+
+# Compiled generators kept per RequestDataGenerator before the oldest are evicted
+MAX_COMPILED_SCHEMAS = 512
+
 class RequestDataGenerator:
     """Generate fake data based on OpenAPI schemas"""
     
     def __init__(self):
         self.fake = Faker()
+        # Compiled generators by kind and schema content
+        self._compiled: "OrderedDict[Any, Callable[[], Any]]" = OrderedDict()
     
     def generate_primitive(self, schema_type: str, schema_format: Optional[str] = None, enum: Optional[List] = None) -> Any:
         """Generate a primitive value based on type and format"""
+        return self._compile_primitive(schema_type, schema_format, enum)()
+        
+    def _compile_primitive(self, schema_type: str, schema_format: Optional[str] = None, enum: Optional[List] = None) -> Callable[[], Any]:
+        """Bind the generator for a primitive type and format"""
         # If enum is provided, choose a random value from it
         if enum:
-            return random.choice(enum)
-            
+            choices = list(enum)
+            return lambda: random.choice(choices)
+        
         # Handle different primitive types
         if schema_type == 'string':
-            if schema_format == 'email':
-                return self.fake.email()
-            elif schema_format == 'date':
-                return self.fake.date()
-            elif schema_format == 'date-time':
-                return self.fake.iso8601()
-            elif schema_format == 'uuid':
-                return str(self.fake.uuid4())
-            elif schema_format == 'uri':
-                return self.fake.uri()
-            elif schema_format == 'password':
-                return self.fake.password()
-            else:
-                return self.fake.word()
+            string_generators = {
+                'email': self.fake.email,
+                'date': self.fake.date,
+                'date-time': self.fake.iso8601,
+                'uuid': lambda: str(self.fake.uuid4()),
+                'uri': self.fake.uri,
+                'password': self.fake.password
+            }
+            return string_generators.get(schema_format, self.fake.word)
         elif schema_type == 'integer':
-            return self.fake.random_int(min=1, max=100)
+            return lambda: self.fake.random_int(min=1, max=100)
         elif schema_type == 'number':
-            return self.fake.random_number(digits=2)
+            return lambda: self.fake.random_number(digits=2)
         elif schema_type == 'boolean':
-            return self.fake.boolean()
+            return self.fake.boolean
         else:
-            return None
-        
-    def generate_array(self, schema: Dict[str, Any]) -> List[Any]:
-        """Generate an array based on schema"""
+            return lambda: None
+    
+    def _compile_array(self, schema: Dict[str, Any]) -> Callable[[], List[Any]]:
         items_schema = schema.get('items', {})
         item_type = items_schema.get('type', 'string')
+        if item_type not in PRIMITIVE_TYPES + ('object', 'array'):
+            return lambda: []
+        generate_item = self._compile(items_schema, item_type)
+        
+        def generate() -> List[Any]:
+            # Generate 1-3 items for the array
+            return [generate_item() for _ in range(random.randint(1, 3))]
+        return generate
+    
+    def _compile_object(self, schema: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+        required = schema.get('required', [])
+        fields = []
+        for prop_name, prop_schema in schema.get('properties', {}).items():
+            prop_type = prop_schema.get('type', 'string')
+            if prop_type in PRIMITIVE_TYPES + ('object', 'array'):
+                fields.append((prop_name, prop_name in required, self._compile(prop_schema, prop_type)))
+        
+        def generate() -> Dict[str, Any]:
+            # Only generate required properties and some random optional ones
+            return {
+                prop_name: generate_value()
+                for prop_name, is_required, generate_value in fields
+                if is_required or random.random() > 0.5
+            }
+        return generate
+    
+    def _compile(self, schema: Dict[str, Any], kind: str) -> Callable[[], Any]:
+        if kind == 'object':
+            if schema.get('type') != 'object':
+                return dict
+            return self._compile_object(schema)
+        if kind == 'array':
+            return self._compile_array(schema)
+        return self._compile_primitive(kind, schema.get('format'), schema.get('enum'))
+    
+    def compile_schema(self, schema: Dict[str, Any], kind: Optional[str] = None) -> Callable[[], Any]:
+        """Compile a schema into a zero-argument function producing fake values.
         
-        # Generate 1-3 items for the array
-        count = random.randint(1, 3)
-        result = []
+        The schema is walked once and turned into nested closures, so generating a
+        value no longer looks anything up in the schema. kind forces 'object' or
+        'array' handling (as generate_object/generate_array do); by default the
+        schema's own type is used. Results are cached by schema content, so a schema
+        edited in place is compiled afresh.
+        """
+        kind = kind or schema.get('type', 'string')
+        content_key = (kind, json.dumps(schema, sort_keys=True, default=str))
+        compiled = self._compiled.get(content_key)
+        if compiled is None:
+            compiled = self._compile(schema, kind)
+            self._compiled[content_key] = compiled
+            if len(self._compiled) > MAX_COMPILED_SCHEMAS:
+                self._compiled.popitem(last=False)
+        else:
+            self._compiled.move_to_end(content_key)
+        return compiled
+    
+    def compile_request_data(self, schema: Dict[str, Any]) -> Callable[[], Dict[str, Any]]:
+        """Compile a request body schema; non-object schemas produce empty bodies"""
+        if not schema:
+            return dict
+        return self.compile_schema(schema, 'object')
+    
+    def generate_many(self, schema: Dict[str, Any], count: int, kind: Optional[str] = None) -> List[Any]:
+        """Generate count values for a schema, compiling it only once"""
+        generate = self.compile_schema(schema, kind)
+        return [generate() for _ in range(count)]
         
-        for _ in range(count):
-            if item_type in ('string', 'integer', 'number', 'boolean'):
-                item_format = items_schema.get('format')
-                item_enum = items_schema.get('enum')
-                result.append(self.generate_primitive(item_type, item_format, item_enum))
-            elif item_type == 'object':
-                result.append(self.generate_object(items_schema))
-            elif item_type == 'array':
-                # Handle nested arrays (with a depth limit for safety)
-                result.append(self.generate_array(items_schema))
-                
-        return result
+    def generate_array(self, schema: Dict[str, Any]) -> List[Any]:
+        """Generate an array based on schema"""
+        return self.compile_schema(schema, 'array')()
         
     def generate_object(self, schema: Dict[str, Any]) -> Dict[str, Any]:
         """Generate an object based on schema"""
         if not schema or schema.get('type') != 'object':
             return {}
-
-        result = {}
-        properties = schema.get('properties', {})
-        required = schema.get('required', [])
-        
-        for prop_name, prop_schema in properties.items():
-            # Only generate required properties and some random optional ones
-            if prop_name in required or random.random() > 0.5:
-                prop_type = prop_schema.get('type', 'string')
-                
-                if prop_type in ('string', 'integer', 'number', 'boolean'):
-                    prop_format = prop_schema.get('format')
-                    prop_enum = prop_schema.get('enum')
-                    result[prop_name] = self.generate_primitive(prop_type, prop_format, prop_enum)
-                elif prop_type == 'object':
-                    result[prop_name] = self.generate_object(prop_schema)
-                elif prop_type == 'array':
-                    result[prop_name] = self.generate_array(prop_schema)
-                    
-        return result
+        return self.compile_schema(schema, 'object')()
         
     def generate_request_data(self, schema: Dict[str, Any]) -> Dict[str, Any]:
         """Generate request data based on a schema"""
@@ -1,3 +1,4 @@
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
@@ -5,7 +6,7 @@ import uuid
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
-from database.models import User, Session as DBSession, SessionConfiguration
+from database.models import User, Session as DBSession, SessionConfiguration, TestRun, TestRunResult
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -183,6 +184,15 @@ def get_session_configs(db: Session, session_id: uuid.UUID) -> List[SessionConfi
     """Get all configurations for a session."""
     return db.query(SessionConfiguration).filter(SessionConfiguration.session_id == session_id).all()
 
+def get_target_session_configs(db: Session, target_url: str) -> List[SessionConfiguration]:
+    """Get all configurations whose endpoint URL is a target API's base URL or a path or query under it."""
+    base_url = target_url.rstrip('/')
+    return db.query(SessionConfiguration).filter(or_(
+        SessionConfiguration.endpoint_url == base_url,
+        SessionConfiguration.endpoint_url.startswith(base_url + '/', autoescape=True),
+        SessionConfiguration.endpoint_url.startswith(base_url + '?', autoescape=True)
+    )).all()
+
 def update_session_config(
     db: Session,
     config_id: uuid.UUID,
@@ -244,3 +254,52 @@ def delete_session_config(db: Session, config_id: uuid.UUID) -> bool:
             logger.error(f"Error deleting session configuration: {str(e)}")
             raise
     return False
+
+# TestRun operations
+def create_test_run(
+    db: Session,
+    test_id: str,
+    config: Dict[str, Any],
+    summary: Dict[str, Any],
+    results: List[Dict[str, Any]],
+    completed_requests: int = 0,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    session_config_id: Optional[uuid.UUID] = None
+) -> TestRun:
+    """Store a finished test run and its endpoint results, replacing any earlier copy.
+    
+    Each entry of results holds the endpoint, concurrent_requests, result and
+    histogram columns of a TestRunResult, in run order.
+    """
+    try:
+        existing = get_test_run(db, test_id)
+        if existing:
+            db.delete(existing)
+            db.flush()
+        db_run = TestRun(
+            id=test_id,
+            session_config_id=session_config_id,
+            config=config,
+            summary=summary,
+            completed_requests=completed_requests,
+            start_time=start_time,
+            end_time=end_time,
+            results=[TestRunResult(position=position, **result) for position, result in enumerate(results)]
+        )
+        db.add(db_run)
+        db.commit()
+        db.refresh(db_run)
+        return db_run
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Error creating test run: {str(e)}")
+        raise
+
+def get_test_run(db: Session, test_id: str) -> Optional[TestRun]:
+    """Get a test run by its test ID."""
+    return db.query(TestRun).filter(TestRun.id == test_id).first()
+
+def get_session_config_test_runs(db: Session, config_id: uuid.UUID) -> List[TestRun]:
+    """Get the test runs launched from a session configuration, newest first."""
+    return db.query(TestRun).filter(TestRun.session_config_id == config_id).order_by(TestRun.created_at.desc()).all()
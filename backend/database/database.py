@@ -8,13 +8,13 @@ from pathlib import Path
 db_dir = Path(__file__).parent.parent / "data"
 db_dir.mkdir(exist_ok=True)
 
-# Database URL
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_dir}/stress_api.db"
+# Database URL; STRESS_API_DATABASE_URL points the app at another database (tests use a temporary one)
+SQLALCHEMY_DATABASE_URL = os.getenv("STRESS_API_DATABASE_URL", f"sqlite:///{db_dir}/stress_api.db")
 
-# Create SQLite engine
+# Create engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}  # Needed for SQLite
 )
 
 # Create sessionmaker
@@ -74,8 +74,46 @@ class SessionConfiguration(Base):
     think_time = Column(Integer, nullable=False)  # seconds
     success_criteria = Column(JSON, nullable=True)
     
-    # Relationship
+    # Relationships
     session = relationship("Session", back_populates="configurations")
+    test_runs = relationship("TestRun", back_populates="session_config")
 
     def __repr__(self):
         return f"<SessionConfiguration(id={self.id}, session_id={self.session_id}, endpoint_url={self.endpoint_url})>"
+
+class TestRun(Base):
+    __tablename__ = 'test_runs'
+
+    id = Column(String, primary_key=True)  # the test_id handed out when the test started
+    session_config_id = Column(GUID(), ForeignKey('session_configurations.id'), nullable=True)
+    config = Column(JSON, nullable=False)
+    summary = Column(JSON, nullable=False)
+    completed_requests = Column(Integer, nullable=False, default=0)
+    start_time = Column(DateTime, nullable=True)
+    end_time = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    session_config = relationship("SessionConfiguration", back_populates="test_runs")
+    results = relationship("TestRunResult", back_populates="test_run", cascade="all, delete-orphan",
+                           order_by="TestRunResult.position")
+
+    def __repr__(self):
+        return f"<TestRun(id={self.id}, session_config_id={self.session_config_id})>"
+
+class TestRunResult(Base):
+    __tablename__ = 'test_run_results'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    test_run_id = Column(String, ForeignKey('test_runs.id'), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # order within the run, across endpoints
+    endpoint = Column(String, nullable=False)
+    concurrent_requests = Column(Integer, nullable=False)
+    result = Column(JSON, nullable=False)  # the EndpointResult fields
+    histogram = Column(JSON, nullable=True)  # LatencyHistogram.to_dict()
+    
+    # Relationship
+    test_run = relationship("TestRun", back_populates="results")
+
+    def __repr__(self):
+        return f"<TestRunResult(test_run_id={self.test_run_id}, endpoint={self.endpoint}, concurrent_requests={self.concurrent_requests})>"
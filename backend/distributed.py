@@ -0,0 +1,456 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+
+from api_models import ArrivalDistribution, DistributionStrategy, EndpointResult, LoadMode, LoadProfileDriver
+from latency_histogram import LatencyHistogram
+from stress_tester import MAX_RESPONSE_SAMPLES, StressTester
+from worker_pool import split_concurrency
+
+logger = logging.getLogger(__name__)
+
+# Agent states after which the coordinator stops polling an agent
+FINISHED_AGENT_STATES = ("completed", "failed", "lost", "unreachable")
+
+
+def serialize_results(results: Dict[str, List[EndpointResult]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Convert a test's EndpointResults to JSON, keeping the latency histograms"""
+    serialized = {}
+    for endpoint_key, endpoint_results in results.items():
+        serialized[endpoint_key] = []
+        for result in endpoint_results:
+            data = jsonable_encoder(result)
+            data["histogram"] = result.histogram.to_dict() if result.histogram else None
+            serialized[endpoint_key].append(data)
+    return serialized
+
+
+def deserialize_results(data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[EndpointResult]]:
+    """Rebuild EndpointResults (with histograms) from serialize_results output"""
+    results = {}
+    for endpoint_key, endpoint_results in data.items():
+        results[endpoint_key] = []
+        for result in endpoint_results:
+            histogram = result.pop("histogram", None)
+            results[endpoint_key].append(EndpointResult(
+                **result,
+                histogram=LatencyHistogram.from_dict(histogram) if histogram else None
+            ))
+    return results
+
+
+def merge_endpoint_results(endpoint_key: str, results: List[EndpointResult]) -> EndpointResult:
+    """Merge the results several agents reported for the same endpoint and level.
+
+    Counts add up and latency percentiles come from the merged histograms. Phase
+    timings are averaged weighted by each agent's request count.
+    """
+    histogram = LatencyHistogram()
+    for result in results:
+        if result.histogram is not None:
+            histogram.merge(result.histogram)
+
+    requests = [result.success_count + result.failure_count for result in results]
+    total_requests = sum(requests)
+
+    def weighted(field: str) -> float:
+        if not total_requests:
+            return 0.0
+        return sum(getattr(result, field) * count for result, count in zip(results, requests)) / total_requests
+
+    status_codes = {}
+    samples = []
+    for result in results:
+        for status_code, count in result.status_codes.items():
+            status_codes[status_code] = status_codes.get(status_code, 0) + count
+        samples.extend(result.response_samples)
+
+    percentiles = histogram.percentiles()
+    return EndpointResult(
+        endpoint=endpoint_key,
+        concurrent_requests=sum(result.concurrent_requests for result in results),
+        success_count=sum(result.success_count for result in results),
+        failure_count=sum(result.failure_count for result in results),
+        avg_response_time=histogram.mean,
+        min_response_time=histogram.min_value or 0,
+        max_response_time=histogram.max_value or 0,
+        p50_response_time=percentiles["p50"],
+        p90_response_time=percentiles["p90"],
+        p99_response_time=percentiles["p99"],
+        p999_response_time=percentiles["p999"],
+        avg_pool_wait_time=weighted("avg_pool_wait_time"),
+        max_pool_wait_time=max(result.max_pool_wait_time for result in results),
+        avg_connect_time=weighted("avg_connect_time"),
+        avg_tls_time=weighted("avg_tls_time"),
+        avg_time_to_first_byte=weighted("avg_time_to_first_byte"),
+        avg_download_time=weighted("avg_download_time"),
+        connections_opened=sum(result.connections_opened for result in results),
+        avg_response_size=weighted("avg_response_size"),
+        response_samples=samples[:MAX_RESPONSE_SAMPLES],
+        validation_failures=sum(result.validation_failures for result in results),
+        validation_error=next((result.validation_error for result in results if result.validation_error), None),
+        status_codes=status_codes,
+        error_message=next((result.error_message for result in results if result.error_message), None),
+        histogram=histogram,
+        phase=results[0].phase
+    )
+
+
+def merge_schedule_stats(schedules: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the open-loop schedule stats reported by several agents"""
+    sent = sum(schedule["sent_requests"] for schedule in schedules)
+    return {
+        "target_rate": sum(schedule["target_rate"] for schedule in schedules),
+        "arrival_distribution": schedules[0]["arrival_distribution"],
+        "scheduled_requests": sum(schedule["scheduled_requests"] for schedule in schedules),
+        "sent_requests": sent,
+        "dropped_requests": sum(schedule["dropped_requests"] for schedule in schedules),
+        "late_requests": sum(schedule["late_requests"] for schedule in schedules),
+        "avg_schedule_lag": (sum(schedule["avg_schedule_lag"] * schedule["sent_requests"] for schedule in schedules) / sent
+                             if sent else 0.0),
+        "max_schedule_lag": max(schedule["max_schedule_lag"] for schedule in schedules),
+        "achieved_rate": sum(schedule["achieved_rate"] for schedule in schedules)
+    }
+
+
+def apportion(total: float, weights: List[int]) -> List[int]:
+    """Split round(total) into whole parts proportional to weights (largest remainder method)"""
+    quotas = [total * weight / sum(weights) for weight in weights]
+    parts = [math.floor(quota) for quota in quotas]
+    by_remainder = sorted(range(len(weights)), key=lambda index: parts[index] - quotas[index])
+    for index in by_remainder[:round(total) - sum(parts)]:
+        parts[index] += 1
+    return parts
+
+
+def _shard_profiles(profile: Dict[str, Any], weights: List[int]) -> List[Dict[str, Any]]:
+    """Each agent's copy of a load profile: the same shape at its share of the load.
+
+    Virtual users are whole, so a users-driven profile's target and points are
+    apportioned and always add up to the original; arrival rates are scaled.
+    """
+    def split(value: float) -> List[float]:
+        if profile.get("driver", LoadProfileDriver.USERS) == LoadProfileDriver.USERS:
+            return apportion(value, weights)
+        return [value * weight / sum(weights) for weight in weights]
+
+    targets = split(profile.get("target", 1))
+    values = [split(point["value"]) for point in profile.get("points") or []]
+    shards = []
+    for index in range(len(weights)):
+        shard = dict(profile, target=targets[index])
+        if profile.get("points"):
+            shard["points"] = [dict(point, value=value[index]) for point, value in zip(profile["points"], values)]
+        shards.append(shard)
+    return shards
+
+
+def shard_config(config: Dict[str, Any], agent_count: int) -> List[Dict[str, Any]]:
+    """Split a test's load between agents; agents left without users get no shard"""
+    shards = []
+    users = split_concurrency(config["max_concurrent_users"], agent_count)
+    profiles = (_shard_profiles(config["load_profile"], [share for _, share in users])
+                if config.get("load_profile") else None)
+    for index, (_, share) in enumerate(users):
+        fraction = share / config["max_concurrent_users"]
+        shard = dict(config, max_concurrent_users=share)
+        shard["request_rate"] = max(1, round(config["request_rate"] * fraction))
+        for limit in ("max_connections", "max_keepalive_connections"):
+            if config.get(limit):
+                shard[limit] = max(1, math.ceil(config[limit] * fraction))
+        if profiles:
+            shard["load_profile"] = profiles[index]
+        shards.append(shard)
+    return shards
+
+
+class LoadAgent:
+    """Agent side of distributed mode: runs test shards handed out by a coordinator.
+
+    Each shard runs on this process's StressTester once the agreed start time is
+    reached on the local clock.
+    """
+
+    def __init__(self, stress_tester: StressTester):
+        self.stress_tester = stress_tester
+        self.tests: Dict[str, Dict[str, Any]] = {}
+
+    def start_test(self, test_id: str, start_at: float, config: Dict[str, Any]):
+        """Schedule a shard to start at start_at (seconds since the epoch, agent clock)"""
+        if config.get("strategy") == DistributionStrategy.ADAPTIVE:
+            raise ValueError("The adaptive strategy searches from one load generator and cannot run on an agent")
+        existing = self.tests.get(test_id)
+        if existing and not existing["task"].done():
+            raise ValueError(f"Test {test_id} is already running on this agent")
+        state = {"start_at": start_at, "started_at": None, "error": None}
+        state["task"] = asyncio.create_task(self._run(test_id, start_at, config, state))
+        self.tests[test_id] = state
+
+    async def _run(self, test_id: str, start_at: float, config: Dict[str, Any], state: Dict[str, Any]):
+        delay = start_at - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        state["started_at"] = time.time()
+        try:
+            await self.stress_tester.run_advanced_test(
+                test_id=test_id,
+                target_url=config["target_url"],
+                strategy=DistributionStrategy(config["strategy"]),
+                max_concurrent_users=config["max_concurrent_users"],
+                request_rate=config["request_rate"],
+                duration=config["duration"],
+                endpoints=config["endpoints"],
+                headers=config.get("headers"),
+                endpoint_schemas=config.get("endpoint_schemas"),
+                load_mode=LoadMode(config.get("load_mode", LoadMode.CLOSED_LOOP)),
+                arrival_distribution=ArrivalDistribution(config.get("arrival_distribution", ArrivalDistribution.FIXED)),
+                http2=config.get("http2", False),
+                max_connections=config.get("max_connections"),
+                max_keepalive_connections=config.get("max_keepalive_connections"),
+                worker_processes=config.get("worker_processes"),
+                record_samples=config.get("record_samples", False),
+                load_profile=config.get("load_profile")
+            )
+        except Exception as e:
+            logger.error(f"Agent shard {test_id} failed: {str(e)}")
+            state["error"] = str(e)
+
+    def status(self, test_id: str) -> Optional[Dict[str, Any]]:
+        state = self.tests.get(test_id)
+        if state is None:
+            return None
+        if state["error"]:
+            status = "failed"
+        elif state["task"].done():
+            status = "completed"
+        elif state["started_at"] is None:
+            status = "pending"
+        else:
+            status = "running"
+        return {
+            "test_id": test_id,
+            "status": status,
+            "started_at": state["started_at"],
+            "completed_requests": self.stress_tester.completed_requests.get(test_id, 0),
+            "error": state["error"]
+        }
+
+    def results(self, test_id: str) -> Optional[Dict[str, Any]]:
+        status = self.status(test_id)
+        if status is None:
+            return None
+        return dict(
+            status,
+            results=serialize_results(self.stress_tester.results.get(test_id, {})),
+            schedule=self.stress_tester.schedule_stats.get(test_id)
+        )
+
+    def stop(self, test_id: str) -> bool:
+        state = self.tests.get(test_id)
+        if state is None:
+            return False
+        if state["started_at"] is None:
+            state["task"].cancel()
+        self.stress_tester.stop_test(test_id)
+        return True
+
+
+class DistributedCoordinator:
+    """Coordinator side of distributed mode: fans an advanced test out to load agents.
+
+    Agents are other instances of this backend, reached over their /api/agent routes.
+    Before starting, each agent's clock offset is estimated from the round trip with
+    the lowest latency, so that every shard starts at the same instant (the start
+    barrier). While the test runs, agents are polled as a heartbeat for progress;
+    an agent that stays silent for heartbeat_timeout seconds is marked lost. At the
+    end, per-agent results are merged level by level into this process's
+    StressTester, so progress and results are served as for a local test.
+    """
+
+    def __init__(self,
+                 stress_tester: StressTester,
+                 heartbeat_interval: float = 1.0,
+                 heartbeat_timeout: float = 10.0,
+                 start_delay: float = 1.0,
+                 clock_samples: int = 3,
+                 client_factory: Optional[Callable[[], httpx.AsyncClient]] = None):
+        self.stress_tester = stress_tester
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.start_delay = start_delay
+        self.clock_samples = clock_samples
+        self.client_factory = client_factory or (lambda: httpx.AsyncClient(timeout=10.0))
+
+    async def probe_agent(self, client: httpx.AsyncClient, agent_url: str) -> Dict[str, float]:
+        """Estimate an agent's clock offset (agent minus coordinator) and round-trip time"""
+        best = None
+        for _ in range(self.clock_samples):
+            sent = time.time()
+            response = await client.get(f"{agent_url}/api/agent/clock")
+            received = time.time()
+            response.raise_for_status()
+            rtt = received - sent
+            offset = response.json()["agent_time"] - (sent + received) / 2
+            if best is None or rtt < best["rtt"]:
+                best = {"offset": offset, "rtt": rtt}
+        return best
+
+    async def run_advanced_test(self, test_id: str, agents: List[str], config: Dict[str, Any]) -> Dict[str, List[EndpointResult]]:
+        """Run an advanced test across agents; config holds run_advanced_test's arguments"""
+        tester = self.stress_tester
+        tester.active_tests[test_id] = True
+        tester.results[test_id] = {}
+        tester.completed_requests[test_id] = 0
+        tester.test_configs[test_id] = dict(config, agents=agents)
+        tester.test_start_times[test_id] = datetime.now()
+        agent_states = [{"url": url.rstrip('/'), "status": "pending", "completed_requests": 0} for url in agents]
+        tester.agent_stats[test_id] = agent_states
+
+        try:
+            async with self.client_factory() as client:
+                await self._start_agents(client, test_id, agent_states, config)
+                await self._monitor(client, test_id, agent_states)
+                await self._collect(client, test_id, agent_states)
+        except Exception as e:
+            logger.error(f"Distributed test {test_id} failed: {str(e)}")
+        finally:
+            for agent in agent_states:
+                agent.pop("last_seen", None)
+            tester.active_tests[test_id] = False
+            tester.test_end_times[test_id] = datetime.now()
+            results = tester.results[test_id]
+            await tester.finish_test(test_id)
+
+        return results
+
+    async def _start_agents(self, client: httpx.AsyncClient, test_id: str, agent_states: List[Dict[str, Any]], config: Dict[str, Any]):
+        probes = await asyncio.gather(
+            *(self.probe_agent(client, agent["url"]) for agent in agent_states),
+            return_exceptions=True
+        )
+        reachable = []
+        for agent, probe in zip(agent_states, probes):
+            if isinstance(probe, Exception):
+                logger.warning(f"Load agent {agent['url']} is unreachable: {str(probe)}")
+                agent["status"] = "unreachable"
+                agent["error"] = str(probe)
+            else:
+                agent.update(clock_offset=probe["offset"], rtt=probe["rtt"])
+                reachable.append(agent)
+        if not reachable:
+            raise RuntimeError("No load agents are reachable")
+
+        shards = shard_config(jsonable_encoder(config), len(reachable))
+        for agent in reachable[len(shards):]:
+            agent["status"] = "idle"
+
+        # Start barrier: one instant on our clock, converted to each agent's clock
+        start_at = time.time() + self.start_delay + max(agent["rtt"] for agent in reachable)
+        for agent, shard in zip(reachable, shards):
+            agent["shard"] = {"max_concurrent_users": shard["max_concurrent_users"], "request_rate": shard["request_rate"]}
+
+        responses = await asyncio.gather(
+            *(client.post(f"{agent['url']}/api/agent/tests", json={
+                "test_id": test_id,
+                "start_at": start_at + agent["clock_offset"],
+                "config": shard
+            }) for agent, shard in zip(reachable, shards)),
+            return_exceptions=True
+        )
+        for agent, response in zip(reachable, responses):
+            if isinstance(response, Exception) or response.status_code >= 400:
+                agent["status"] = "failed"
+                agent["error"] = str(response) if isinstance(response, Exception) else response.text
+            else:
+                agent["last_seen"] = time.monotonic()
+
+    async def _monitor(self, client: httpx.AsyncClient, test_id: str, agent_states: List[Dict[str, Any]]):
+        """Poll agents until every shard has finished, forwarding a stop if requested"""
+        stop_sent = False
+        while True:
+            running = [agent for agent in agent_states if agent["status"] not in FINISHED_AGENT_STATES + ("idle",)]
+            if not running:
+                return
+
+            if not self.stress_tester.active_tests.get(test_id, False) and not stop_sent:
+                await asyncio.gather(
+                    *(client.post(f"{agent['url']}/api/agent/tests/{test_id}/stop") for agent in running),
+                    return_exceptions=True
+                )
+                stop_sent = True
+
+            await asyncio.sleep(self.heartbeat_interval)
+            heartbeats = await asyncio.gather(
+                *(client.get(f"{agent['url']}/api/agent/tests/{test_id}") for agent in running),
+                return_exceptions=True
+            )
+            now = time.monotonic()
+            for agent, heartbeat in zip(running, heartbeats):
+                if isinstance(heartbeat, Exception) or heartbeat.status_code >= 400:
+                    if now - agent["last_seen"] > self.heartbeat_timeout:
+                        logger.warning(f"Lost heartbeat from load agent {agent['url']}")
+                        agent["status"] = "lost"
+                    continue
+                data = heartbeat.json()
+                agent["last_seen"] = now
+                agent["status"] = data["status"]
+                agent["completed_requests"] = data["completed_requests"]
+                if data.get("started_at") is not None:
+                    # Convert back to our clock to report how tightly the barrier held
+                    agent["start_time"] = data["started_at"] - agent["clock_offset"]
+
+            self.stress_tester.completed_requests[test_id] = sum(agent["completed_requests"] for agent in agent_states)
+
+    async def _collect(self, client: httpx.AsyncClient, test_id: str, agent_states: List[Dict[str, Any]]):
+        """Fetch each agent's results and merge them level by level"""
+        finished = [agent for agent in agent_states if agent["status"] in ("completed", "failed") and "last_seen" in agent]
+        responses = await asyncio.gather(
+            *(client.get(f"{agent['url']}/api/agent/tests/{test_id}/results") for agent in finished),
+            return_exceptions=True
+        )
+
+        agent_results = []
+        schedules = []
+        for agent, response in zip(finished, responses):
+            if isinstance(response, Exception) or response.status_code >= 400:
+                logger.warning(f"Could not fetch results from load agent {agent['url']}")
+                continue
+            data = response.json()
+            agent["error"] = data.get("error")
+            agent_results.append(deserialize_results(data["results"]))
+            if data.get("schedule"):
+                schedules.append(data["schedule"])
+
+        # Each agent runs its own share of every level, so a level's concurrency differs
+        # between agents (51 and 50 users of 101): rows are matched on the load profile
+        # phase, or else on the level's position in the agent's run
+        merged = {}
+        for results in agent_results:
+            for endpoint_key, endpoint_results in results.items():
+                levels = merged.setdefault(endpoint_key, {})
+                for index, result in enumerate(endpoint_results):
+                    levels.setdefault(result.phase or index, []).append(result)
+        merged = {
+            endpoint_key: [merge_endpoint_results(endpoint_key, level_results) for level_results in levels.values()]
+            for endpoint_key, levels in merged.items()
+        }
+
+        self.stress_tester.results[test_id] = merged
+        self.stress_tester.completed_requests[test_id] = sum(
+            result.success_count + result.failure_count
+            for endpoint_results in merged.values() for result in endpoint_results
+        )
+        if schedules:
+            self.stress_tester.schedule_stats[test_id] = merge_schedule_stats(schedules)
+
+        start_times = [agent["start_time"] for agent in agent_states if "start_time" in agent]
+        if start_times:
+            for agent in agent_states:
+                if "start_time" in agent:
+                    agent["start_skew"] = agent["start_time"] - min(start_times)
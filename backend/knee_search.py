@@ -0,0 +1,73 @@
+import math
+import statistics
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def is_stable(values: Sequence[float], tolerance: float) -> bool:
+    """Whether window latencies agree: coefficient of variation within tolerance.
+
+    Windows without a latency (None) never count as stable.
+    """
+    if len(values) < 2 or any(value is None for value in values):
+        return False
+    mean = statistics.fmean(values)
+    if mean <= 0:
+        return all(value == 0 for value in values)
+    return statistics.pstdev(values) / mean <= tolerance
+
+
+class KneeSearch:
+    """Chooses which concurrency to probe next while searching for the knee.
+
+    Load doubles from ``start`` until a level breaches the SLO (or max_level passes),
+    then the gap between the highest passing and lowest failing level is halved until
+    it is within ``resolution`` of the passing level, or one user. ``knee`` is the
+    highest level that met the SLO; it is 0 if even the first level breached it.
+    """
+
+    def __init__(self, max_level: int, resolution: float = 0.05, start: int = 1):
+        self.max_level = max(1, max_level)
+        self.resolution = resolution
+        self.passed = 0
+        self.failed: Optional[int] = None
+        self.probes: List[Dict[str, Any]] = []
+        self._next: Optional[int] = min(max(1, start), self.max_level)
+
+    def next_level(self) -> Optional[int]:
+        """The level to probe next, or None once the search is over"""
+        return self._next
+
+    def report(self, level: int, passed: bool, metrics: Optional[Dict[str, Any]] = None):
+        """Record the verdict for a probed level and pick the next one"""
+        self.probes.append(dict(metrics or {}, concurrency=level, passed=passed))
+        if passed:
+            self.passed = max(self.passed, level)
+        else:
+            self.failed = level if self.failed is None else min(self.failed, level)
+
+        if self.failed is None:
+            # Still growing: double until the top of the range
+            self._next = min(level * 2, self.max_level) if level < self.max_level else None
+            return
+        gap = self.failed - self.passed
+        if gap <= max(1, math.ceil(self.passed * self.resolution)):
+            self._next = None
+        else:
+            self._next = self.passed + gap // 2
+
+    @property
+    def knee(self) -> int:
+        return self.passed
+
+    def to_dict(self) -> Dict[str, Any]:
+        knee_probe = next((probe for probe in reversed(self.probes) if probe["concurrency"] == self.passed), None)
+        return {
+            "concurrency": self.passed,
+            "breached_at": self.failed,
+            # False when every level up to max_level passed, so the knee lies beyond it
+            "saturated": self.failed is not None,
+            "rps": knee_probe.get("rps") if knee_probe else None,
+            "latency": knee_probe.get("latency") if knee_probe else None,
+            "error_rate": knee_probe.get("error_rate") if knee_probe else None,
+            "probes": self.probes
+        }
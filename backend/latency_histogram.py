@@ -0,0 +1,123 @@
+import math
+from typing import Dict, Any, Optional
+
+
+class LatencyHistogram:
+    """Streaming log-linear latency histogram (HDR-style).
+
+    Latencies are recorded in whole microseconds. Values below ``sub_bucket_count``
+    get one bucket each; above that every power of two is split into
+    ``sub_bucket_count / 2`` equal-width buckets, so any recorded value is within
+    ``2 / sub_bucket_count`` of its bucket (under 1% with the default of 256).
+    Buckets are stored sparsely, so memory depends on the spread of latencies and
+    not on how many requests were recorded. Histograms with the same
+    ``sub_bucket_count`` can be merged exactly.
+    """
+
+    def __init__(self, sub_bucket_count: int = 256):
+        if sub_bucket_count < 2 or sub_bucket_count & (sub_bucket_count - 1):
+            raise ValueError("sub_bucket_count must be a power of two >= 2")
+        self.sub_bucket_count = sub_bucket_count
+        self._sub_bits = sub_bucket_count.bit_length() - 1
+        self._half = sub_bucket_count // 2
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+
+    def _bucket_index(self, micros: int) -> int:
+        """Map a value in microseconds to its bucket index"""
+        if micros < self.sub_bucket_count:
+            return micros
+        exponent = micros.bit_length() - self._sub_bits
+        sub_bucket = micros >> exponent
+        return self.sub_bucket_count + (exponent - 1) * self._half + (sub_bucket - self._half)
+
+    def _bucket_bounds(self, index: int):
+        """Return the [low, high) range in microseconds covered by a bucket"""
+        if index < self.sub_bucket_count:
+            return index, index + 1
+        offset = index - self.sub_bucket_count
+        exponent = offset // self._half + 1
+        sub_bucket = offset % self._half + self._half
+        return sub_bucket << exponent, (sub_bucket + 1) << exponent
+
+    def record(self, seconds: float, count: int = 1):
+        """Record a latency given in seconds"""
+        if seconds < 0:
+            seconds = 0.0
+        index = self._bucket_index(int(seconds * 1_000_000))
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        if self.min_value is None or seconds < self.min_value:
+            self.min_value = seconds
+        if self.max_value is None or seconds > self.max_value:
+            self.max_value = seconds
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add the contents of another histogram into this one"""
+        if other.sub_bucket_count != self.sub_bucket_count:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        if other.max_value is not None and (self.max_value is None or other.max_value > self.max_value):
+            self.max_value = other.max_value
+        return self
+
+    def copy(self) -> "LatencyHistogram":
+        return LatencyHistogram(self.sub_bucket_count).merge(self)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Return the latency in seconds at the given percentile (0-100)"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                low, high = self._bucket_bounds(index)
+                value = (low + high - 1) / 2 / 1_000_000
+                # Bucket midpoints can overshoot the exact extremes we track
+                return min(max(value, self.min_value), self.max_value)
+        return self.max_value
+
+    def percentiles(self) -> Dict[str, float]:
+        """Return the standard reporting percentiles in seconds"""
+        return {
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a compact JSON-friendly dict"""
+        return {
+            "sub_bucket_count": self.sub_bucket_count,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min_value,
+            "max": self.max_value
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(data.get("sub_bucket_count", 256))
+        histogram.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0.0)
+        histogram.min_value = data.get("min")
+        histogram.max_value = data.get("max")
+        return histogram
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Seconds covered by each published frame
+DEFAULT_WINDOW = 1.0
+# Frames buffered per subscriber before new frames are dropped for it
+SUBSCRIBER_QUEUE_SIZE = 16
+# Finished tests whose channel (and last frame) is kept for late subscribers
+MAX_FINISHED_CHANNELS = 32
+
+
+class LiveWindow:
+    """Aggregate of the requests one endpoint completed in the current window"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+        self.histogram = LatencyHistogram()
+
+    def record(self, result: Any):
+        """Fold one execute_request result (or the exception it raised) into the window"""
+        self.requests += 1
+        if isinstance(result, Exception):
+            self.errors += 1
+            self.status_codes["0"] = self.status_codes.get("0", 0) + 1
+            return
+        status_code = str(result.get("status_code", 0))
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if result.get("success", False):
+            if result.get("response_time") is not None:
+                self.histogram.record(result["response_time"])
+        else:
+            self.errors += 1
+
+    def merge_stats(self, stats):
+        """Fold an EndpointStats delta (as streamed by worker processes) into the window"""
+        self.requests += stats.success_count + stats.failure_count
+        self.errors += stats.failure_count
+        for status_code, count in stats.status_codes.items():
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + count
+        self.histogram.merge(stats.histogram)
+
+
+def _millis(seconds: Optional[float]) -> float:
+    return round((seconds or 0.0) * 1000, 2)
+
+
+class LiveChannel:
+    """Live metrics of one running test.
+
+    StressTester records results as they complete; every window the channel turns the
+    aggregates into a frame, hands it to subscribers and starts a new window, so
+    memory does not grow with the length of the run.
+    """
+
+    def __init__(self, test_id: str, window: float = DEFAULT_WINDOW, history=None, samples=None):
+        self.test_id = test_id
+        self.window = window
+        # Optional MetricsRing every frame is also recorded into
+        self.history = history
+        # Optional SampleRecorder every recorded result is also written to
+        self.samples = samples
+        # Load profile phase the test is in, if it follows a load profile
+        self.phase: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.window_started_at = self.started_at
+        self.windows: Dict[str, LiveWindow] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.total_requests = 0
+        self.total_errors = 0
+        self.frames = 0
+        self.running = True
+        self.last_frame: Optional[Dict[str, Any]] = None
+        self.subscribers: List[asyncio.Queue] = []
+        self._ticker: Optional[asyncio.Task] = None
+
+    def _window_for(self, endpoint_key: str) -> LiveWindow:
+        window = self.windows.get(endpoint_key)
+        if window is None:
+            window = self.windows[endpoint_key] = LiveWindow()
+        return window
+
+    def add_in_flight(self, endpoint_key: str, count: int):
+        self.in_flight[endpoint_key] = max(0, self.in_flight.get(endpoint_key, 0) + count)
+
+    def record(self, endpoint_key: str, result: Any):
+        self._window_for(endpoint_key).record(result)
+        if self.samples is not None:
+            self.samples.record(endpoint_key, result)
+
+    def merge(self, endpoint_key: str, stats):
+        self._window_for(endpoint_key).merge_stats(stats)
+
+    async def track(self, endpoint_key: str, request):
+        """Await a request coroutine, counting it as in flight and recording its result"""
+        self.add_in_flight(endpoint_key, 1)
+        try:
+            result = await request
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.record(endpoint_key, e)
+            raise
+        finally:
+            self.add_in_flight(endpoint_key, -1)
+        self.record(endpoint_key, result)
+        return result
+
+    def flush(self) -> Dict[str, Any]:
+        """Close the current window, returning its frame"""
+        now = time.monotonic()
+        elapsed = max(now - self.window_started_at, 1e-6)
+        windows, self.windows = self.windows, {}
+        self.window_started_at = now
+
+        total = LiveWindow()
+        endpoints = []
+        for endpoint_key in sorted(set(windows) | set(self.in_flight)):
+            window = windows.get(endpoint_key) or LiveWindow()
+            total.requests += window.requests
+            total.errors += window.errors
+            for status_code, count in window.status_codes.items():
+                total.status_codes[status_code] = total.status_codes.get(status_code, 0) + count
+            total.histogram.merge(window.histogram)
+            endpoints.append(self._series(endpoint_key, window, elapsed, self.in_flight.get(endpoint_key, 0)))
+
+        self.total_requests += total.requests
+        self.total_errors += total.errors
+        self.frames += 1
+        frame = self._series(None, total, elapsed, sum(self.in_flight.values()))
+        frame.update({
+            "type": "metrics",
+            "testId": self.test_id,
+            # Matches the window's sequence number in the test's MetricsRing
+            "seq": self.frames,
+            "timestamp": datetime.now().isoformat(),
+            "elapsed": round(now - self.started_at, 3),
+            "window": round(elapsed, 3),
+            "status": "running" if self.running else "completed",
+            "totalRequests": self.total_requests,
+            "totalErrors": self.total_errors,
+            "endpoints": endpoints
+        })
+        del frame["endpoint"]
+        if self.phase is not None:
+            frame["phase"] = self.phase
+        self.last_frame = frame
+        if self.history is not None:
+            self.history.append(frame)
+        return frame
+
+    @staticmethod
+    def _series(endpoint_key: Optional[str], window: LiveWindow, elapsed: float, in_flight: int) -> Dict[str, Any]:
+        histogram = window.histogram
+        percentiles = histogram.percentiles()
+        return {
+            "endpoint": endpoint_key,
+            "requests": window.requests,
+            "rps": round(window.requests / elapsed, 2),
+            "inFlight": in_flight,
+            "concurrentRequests": in_flight,
+            "errors": window.errors,
+            "errorsByStatus": {
+                status_code: count for status_code, count in window.status_codes.items()
+                if status_code == "0" or int(status_code) >= 400
+            },
+            "successRate": round(100 * (window.requests - window.errors) / window.requests, 2) if window.requests else 100.0,
+            "avgResponseTime": _millis(histogram.mean),
+            "minResponseTime": _millis(histogram.min_value),
+            "maxResponseTime": _millis(histogram.max_value),
+            "p50ResponseTime": _millis(percentiles["p50"]),
+            "p90ResponseTime": _millis(percentiles["p90"]),
+            "p99ResponseTime": _millis(percentiles["p99"])
+        }
+
+    def publish(self, frame: Optional[Dict[str, Any]]):
+        """Hand a frame (or None, meaning the stream ended) to every subscriber"""
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # A subscriber that is not keeping up misses frames rather than holding
+                # memory, but always learns that the stream ended
+                if frame is None:
+                    queue.get_nowait()
+                    queue.put_nowait(None)
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.window - (time.monotonic() - self.window_started_at))
+            self.publish(self.flush())
+
+    def start(self):
+        self._ticker = asyncio.create_task(self._tick())
+
+    def finish(self):
+        """Publish the final partial window and end every subscriber's stream"""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+        self.running = False
+        self.in_flight.clear()
+        self.publish(self.flush())
+        self.publish(None)
+
+
+class LiveMetricsHub:
+    """Per-test pub/sub of live metrics frames.
+
+    StressTester opens a channel when a test starts and closes it when the test ends;
+    MetricsManager subscribes WebSocket clients to it. Closed channels are kept (up to
+    MAX_FINISHED_CHANNELS) so a late subscriber still gets the final frame.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW):
+        self.window = window
+        self.channels: "OrderedDict[str, LiveChannel]" = OrderedDict()
+
+    def open(self, test_id: str, history=None, samples=None) -> LiveChannel:
+        """Create the channel for a test and start publishing its frames"""
+        channel = LiveChannel(test_id, self.window, history, samples)
+        self.channels[test_id] = channel
+        self.channels.move_to_end(test_id)
+        channel.start()
+        return channel
+
+    def channel(self, test_id: Optional[str]) -> Optional[LiveChannel]:
+        """The running channel for a test, if it has one"""
+        channel = self.channels.get(test_id) if test_id else None
+        return channel if channel is not None and channel.running else None
+
+    def close(self, test_id: str):
+        channel = self.channels.get(test_id)
+        if channel is None or not channel.running:
+            return
+        channel.finish()
+        finished = [key for key, value in self.channels.items() if not value.running]
+        for key in finished[:max(0, len(finished) - MAX_FINISHED_CHANNELS)]:
+            del self.channels[key]
+
+    def has_test(self, test_id: str) -> bool:
+        return test_id in self.channels
+
+    def history(self, test_id: str):
+        """The MetricsRing a test's frames are recorded into, if any"""
+        channel = self.channels.get(test_id)
+        return channel.history if channel is not None else None
+
+    def subscribe(self, test_id: str) -> asyncio.Queue:
+        """Queue receiving the test's frames, then None once the test has finished"""
+        channel = self.channels[test_id]
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if channel.running:
+            channel.subscribers.append(queue)
+        else:
+            if channel.last_frame is not None:
+                queue.put_nowait(channel.last_frame)
+            queue.put_nowait(None)
+        return queue
+
+    def unsubscribe(self, test_id: str, queue: asyncio.Queue):
+        channel = self.channels.get(test_id)
+        if channel is not None and queue in channel.subscribers:
+            channel.subscribers.remove(queue)
+
+
+# Global live metrics hub shared by the stress tester and the metrics WebSocket
+live_metrics_hub = LiveMetricsHub()
@@ -0,0 +1,107 @@
+import asyncio
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 support in httpx needs the optional 'h2' package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _PooledClient:
+    """An httpx client plus the number of tests currently using it"""
+    def __init__(self, client: httpx.AsyncClient, key: Tuple):
+        self.client = client
+        self.key = key
+        self.leases = 0
+        # Connections belong to the event loop that opened them
+        self.loop = asyncio.get_running_loop()
+
+
+class LoadClientPool:
+    """Shared, reusable httpx clients for load generation.
+
+    One client is kept per target origin (scheme, host and port), so the connection
+    limits of that client act as per-host limits. The pool is sized from the test's
+    concurrency instead of httpx's defaults (100 connections, 20 keep-alive), so
+    virtual users do not queue inside httpx before reaching the target. Clients stay
+    open between tests and are reused while their settings match.
+    """
+
+    def __init__(self, keepalive_expiry: float = 30.0):
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: Dict[str, _PooledClient] = {}
+
+    @staticmethod
+    def origin(target_url: str) -> str:
+        parts = urlsplit(str(target_url))
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def limits_for(self,
+                   concurrency: int,
+                   max_connections: Optional[int] = None,
+                   max_keepalive_connections: Optional[int] = None) -> httpx.Limits:
+        """Build connection limits that let every virtual user hold a connection"""
+        connections = max_connections or max(1, concurrency)
+        keepalive = max_keepalive_connections if max_keepalive_connections is not None else connections
+        return httpx.Limits(
+            max_connections=connections,
+            max_keepalive_connections=min(keepalive, connections),
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    @asynccontextmanager
+    async def lease(self,
+                    target_url: str,
+                    concurrency: int,
+                    http2: bool = False,
+                    max_connections: Optional[int] = None,
+                    max_keepalive_connections: Optional[int] = None):
+        """Borrow the shared client for a target, creating or resizing it as needed"""
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+            http2 = False
+
+        limits = self.limits_for(concurrency, max_connections, max_keepalive_connections)
+        origin = self.origin(target_url)
+        key = (limits.max_connections, limits.max_keepalive_connections, http2)
+
+        # Pick or create the client without awaiting, so concurrent leases see a consistent pool
+        stale = None
+        pooled = self._clients.get(origin)
+        if pooled is not None and pooled.loop is not asyncio.get_running_loop():
+            # Left over from another event loop; its connections cannot be reused here
+            del self._clients[origin]
+            pooled = None
+        if pooled is not None and pooled.key != key and pooled.leases == 0:
+            # Idle client with the wrong size; replace it
+            stale = pooled.client
+            pooled = None
+        if pooled is None:
+            pooled = _PooledClient(httpx.AsyncClient(limits=limits, http2=http2), key)
+            self._clients[origin] = pooled
+        elif pooled.key != key:
+            # The shared client is busy with other settings; use a private one for this test
+            pooled = _PooledClient(httpx.AsyncClient(limits=limits, http2=http2), key)
+        pooled.leases += 1
+        if stale is not None:
+            await stale.aclose()
+
+        try:
+            yield pooled.client
+        finally:
+            pooled.leases -= 1
+            if pooled.leases == 0 and self._clients.get(origin) is not pooled:
+                await pooled.client.aclose()
+
+    async def aclose(self):
+        """Close every idle client"""
+        for origin, pooled in list(self._clients.items()):
+            if pooled.leases == 0:
+                del self._clients[origin]
+                await pooled.client.aclose()
@@ -0,0 +1,115 @@
+from bisect import bisect_right
+from typing import Any, Dict, List, Tuple, Union
+
+from api_models import LoadProfileConfig, LoadProfileDriver, LoadProfileShape
+
+# Phase names used by the built-in shapes
+RAMP_UP = "ramp_up"
+STEADY = "steady"
+SPIKE = "spike"
+RAMP_DOWN = "ramp_down"
+SOAK = "soak"
+
+# A schedule point: seconds since the start, target value, phase of the segment that starts there
+Point = Tuple[float, float, str]
+
+
+class LoadProfile:
+    """Piecewise-linear target (virtual users or requests per second) over time.
+
+    Built-in shapes are expanded into points when the profile is created; a custom
+    profile gives its points directly. Between two points the target changes
+    linearly, and two points at the same time make an instant step.
+    """
+
+    def __init__(self, points: List[Point], driver: LoadProfileDriver = LoadProfileDriver.USERS, think_time: float = 0.0):
+        if len(points) < 2 or points[-1][0] <= points[0][0]:
+            raise ValueError("A load profile must last longer than zero seconds")
+        if any(later[0] < earlier[0] for earlier, later in zip(points, points[1:])):
+            raise ValueError("Load profile points must be in time order")
+        self.points = points
+        self.times = [point[0] for point in points]
+        self.driver = driver
+        self.think_time = think_time
+
+    @classmethod
+    def from_config(cls, config: Union[LoadProfileConfig, Dict[str, Any]]) -> "LoadProfile":
+        if isinstance(config, dict):
+            config = LoadProfileConfig(**config)
+        target = config.target
+        up_end = config.ramp_up
+        steady_end = up_end + config.steady
+        end = steady_end + config.ramp_down
+
+        if config.shape == LoadProfileShape.CUSTOM:
+            if not config.points:
+                raise ValueError("A custom load profile needs points")
+            points = []
+            phase = "custom"
+            for point in config.points:
+                phase = point.phase or phase
+                points.append((point.at, point.value, phase))
+        elif config.shape == LoadProfileShape.STEP:
+            points = []
+            for step in range(config.steps):
+                at = up_end * step / config.steps
+                points.append((at, target * (step + 1) / config.steps, RAMP_UP))
+                points.append((up_end * (step + 1) / config.steps, target * (step + 1) / config.steps, RAMP_UP))
+            points += [(up_end, target, STEADY), (steady_end, target, RAMP_DOWN), (end, 0.0, RAMP_DOWN)]
+        elif config.shape == LoadProfileShape.SPIKE:
+            spike_start = up_end + max(0.0, config.steady - config.spike_duration) / 2
+            spike_end = min(spike_start + config.spike_duration, steady_end)
+            spike = target * config.spike_multiplier
+            points = [
+                (0.0, 0.0, RAMP_UP),
+                (up_end, target, STEADY),
+                (spike_start, target, STEADY),
+                (spike_start, spike, SPIKE),
+                (spike_end, spike, SPIKE),
+                (spike_end, target, STEADY),
+                (steady_end, target, RAMP_DOWN),
+                (end, 0.0, RAMP_DOWN)
+            ]
+        else:
+            hold = SOAK if config.shape == LoadProfileShape.SOAK else STEADY
+            points = [(0.0, 0.0, RAMP_UP), (up_end, target, hold), (steady_end, target, RAMP_DOWN), (end, 0.0, RAMP_DOWN)]
+
+        # Zero-length phases (no ramp, no hold) leave a point the same time as the next
+        points = [point for index, point in enumerate(points)
+                  if index + 1 == len(points) or point[0] < points[index + 1][0] or point[1] != points[index + 1][1]]
+        return cls(points, config.driver, config.think_time)
+
+    @property
+    def duration(self) -> float:
+        return self.points[-1][0]
+
+    def _segment(self, elapsed: float) -> int:
+        return max(0, bisect_right(self.times, elapsed) - 1)
+
+    def value_at(self, elapsed: float) -> float:
+        """Target at elapsed seconds into the run; zero once the profile has ended"""
+        if elapsed >= self.duration:
+            return 0.0
+        index = self._segment(elapsed)
+        start_at, start_value, _ = self.points[index]
+        end_at, end_value, _ = self.points[index + 1]
+        if end_at <= start_at:
+            return end_value
+        return start_value + (end_value - start_value) * (elapsed - start_at) / (end_at - start_at)
+
+    def phase_at(self, elapsed: float) -> str:
+        """Phase of the segment elapsed seconds into the run; the last phase once it has ended"""
+        if elapsed >= self.duration:
+            return self.phases()[-1]
+        return self.points[self._segment(elapsed)][2]
+
+    def phases(self) -> List[str]:
+        """Phase names in the order they first occur, skipping zero-length segments"""
+        phases: List[str] = []
+        for (at, _, phase), (next_at, _, _) in zip(self.points, self.points[1:]):
+            if next_at > at and phase not in phases:
+                phases.append(phase)
+        return phases
+
+    def peak(self) -> float:
+        return max(point[1] for point in self.points)
@@ -1,22 +1,33 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, status
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, File, Form, Query, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import uvicorn
 import uuid
+import time
 from datetime import datetime
-import httpx
 import asyncio
+import functools
 import logging
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 import random
 import json
+from urllib.parse import urlsplit
+import httpx
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 from stress_tester import StressTester
+from distributed import DistributedCoordinator, LoadAgent
+from results_store import ResultsStore
+from sample_recorder import SampleFile, sample_paths
+from load_profile import LoadProfile
+from results_export import MEDIA_TYPES, export_stream, result_batches, sample_batches
 from openapi_parser import OpenAPIParser
+from spec_cache import ParsedSpec
+from spec_loader import load_spec, load_spec_file
 from data_generator import RequestDataGenerator
 from api_models import (
     HealthResponse,
@@ -29,11 +40,20 @@ from api_models import (
     TestStatus,
     OpenAPIEndpointsRequest,
     OpenAPIEndpointsResponse,
+    SpecChanges,
     EndpointSchema,
     StressTestConfig,
     StressTestEndpointConfig,
+    LoadProfileConfig,
+    LoadProfileDriver,
+    LoadProfileShape,
     StressTestResultsResponse,
     StressTestProgressResponse,
+    MetricsHistoryResponse,
+    SamplePercentilesResponse,
+    SampleWindowsResponse,
+    ExportFormat,
+    ExportRows,
     EndpointResult,
     DistributionStrategy,
     DistributionRequirementsResponse,
@@ -43,11 +63,14 @@ from api_models import (
     TestScenarioGenerationRequest,
     TestScenario,
     EndpointTestDataRequest,
-    EndpointTestDataResponse
+    EndpointTestDataResponse,
+    AgentTestRequest
 )
 from metrics_generator import metrics_manager
-from database.database import get_db
-from database.crud import get_user_by_email, get_user_sessions as get_db_user_sessions, get_session_configs, create_session, create_session_config, get_session
+from database.database import engine, get_db
+from database.models import Base
+from database.crud import get_user_by_email, get_user_sessions as get_db_user_sessions, get_session_configs, get_session_config, create_session, create_session_config, get_session, get_target_session_configs
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 # Session configuration models
@@ -106,8 +129,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize stress tester
+# Initialize stress tester; finished advanced runs are stored in the database
 stress_tester = StressTester()
+stress_tester.results_store = ResultsStore()
+
+# Shared data generator; it caches compiled schemas across requests
+data_generator = RequestDataGenerator()
+
+# Distributed mode: this instance can coordinate remote agents and act as one
+coordinator = DistributedCoordinator(stress_tester)
+load_agent = LoadAgent(stress_tester)
+
+@app.on_event("startup")
+def create_database_tables():
+    """Create any missing tables; the database file is not kept in the repository"""
+    try:
+        Base.metadata.create_all(bind=engine)
+    except SQLAlchemyError as e:
+        # Another instance sharing the database (e.g. a local load agent) may have
+        # created the same tables at the same moment
+        logger.warning(f"Could not create database tables: {e}")
+
+@app.on_event("shutdown")
+async def close_load_clients():
+    """Close the shared load-generation HTTP clients"""
+    await stress_tester.client_pool.aclose()
 
 # Distribution strategies requirements - can be moved to a separate file for better organization
 class RequirementField(BaseModel):
@@ -188,6 +234,36 @@ distribution_requirements = {
             )
         },
         endpoint_specific_requirements=False
+    ),
+    "adaptive": StrategyRequirements(
+        name="Adaptive Knee Search",
+        description="Concurrency doubles until a latency or error-rate SLO is breached, then a binary search finds the highest level that meets it",
+        general_requirements={
+            "percentile": RequirementField(
+                type="number",
+                label="Latency percentile",
+                description="Latency percentile the SLO applies to",
+                default_value=99,
+                min=1,
+                max=100
+            ),
+            "max_latency": RequirementField(
+                type="number",
+                label="Max latency (s)",
+                description="Highest acceptable latency at that percentile, in seconds",
+                default_value=1.0,
+                min=0
+            ),
+            "max_error_rate": RequirementField(
+                type="number",
+                label="Max error rate (%)",
+                description="Highest acceptable percentage of failed requests",
+                default_value=1.0,
+                min=0,
+                max=100
+            )
+        },
+        endpoint_specific_requirements=False
     )
 }
 
@@ -206,12 +282,15 @@ async def validate_target(request: TargetValidationRequest):
     try:
         # Implement actual validation logic
         try:
-            # Convert HttpUrl to string before using rstrip
-            target_url_str = str(request.target_url)
-            openapi_url = f"{target_url_str.rstrip('/')}/openapi.json"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(openapi_url, timeout=10.0)
-                openapi_available = response.status_code == 200
+            # Discovery caches where the spec lives, so listing endpoints next is one round trip
+            try:
+                await OpenAPIParser.fetch_openapi_spec(str(request.target_url))
+                openapi_available = True
+            except OpenAPIParser.OpenAPIError as e:
+                if e.status_code == status.HTTP_502_BAD_GATEWAY:
+                    # The target itself could not be reached
+                    raise
+                openapi_available = False
             
             return TargetValidationResponse(
                 status="valid",
@@ -230,17 +309,42 @@ async def validate_target(request: TargetValidationRequest):
             detail=str(e)
         )
 
+def _openapi_endpoints_response(target_url: str, parsed: ParsedSpec, db: Session) -> OpenAPIEndpointsResponse:
+    """List a parsed spec's endpoints with its changes since the previous version"""
+    changes = None
+    if parsed.diff is not None:
+        changes = SpecChanges(**parsed.diff.to_dict())
+        if parsed.diff.removed or parsed.diff.changed:
+            # Flag saved configurations that call an operation which is gone or different
+            for session_config in get_target_session_configs(db, parsed.target_url):
+                path = session_config.endpoint_url[len(parsed.target_url):].split('?', 1)[0] or "/"
+                if parsed.diff.affects(session_config.http_method, path):
+                    changes.affected_configurations.append(str(session_config.id))
+    
+    return OpenAPIEndpointsResponse(
+        target_url=target_url,
+        endpoints=parsed.endpoints,
+        timestamp=datetime.now(),
+        changes=changes
+    )
+
 # New endpoint to get API endpoints from OpenAPI
 @app.post("/api/openapi-endpoints", response_model=OpenAPIEndpointsResponse)
-async def get_openapi_endpoints(request: OpenAPIEndpointsRequest):
+async def get_openapi_endpoints(request: OpenAPIEndpointsRequest, db: Session = Depends(get_db)):
     try:
-        # Fetch and parse OpenAPI endpoints 
-        endpoints = await OpenAPIParser.get_endpoints(str(request.target_url))
+        if request.spec_path:
+            # A spec file on the server replaces probing the target
+            schema = await asyncio.get_running_loop().run_in_executor(None, load_spec_file, request.spec_path)
+            parsed = OpenAPIParser.ingest_spec(str(request.target_url), schema)
+        else:
+            # Fetch the spec; only operations changed since the last fetch are parsed again
+            parsed = await OpenAPIParser.get_parsed_spec(str(request.target_url), refresh=True)
         
-        return OpenAPIEndpointsResponse(
-            target_url=request.target_url,
-            endpoints=endpoints,
-            timestamp=datetime.now()
+        return _openapi_endpoints_response(str(request.target_url), parsed, db)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
         )
     except OpenAPIParser.OpenAPIError as e:
         # Handle specific OpenAPI errors with appropriate status codes
@@ -264,12 +368,33 @@ async def get_openapi_endpoints(request: OpenAPIEndpointsRequest):
             detail=f"Error processing request: {str(e)}"
         )
 
+# Upload a JSON or YAML spec for a target that does not serve one
+@app.post("/api/openapi-endpoints/upload", response_model=OpenAPIEndpointsResponse)
+async def upload_openapi_spec(target_url: str = Form(...), spec: UploadFile = File(...), db: Session = Depends(get_db)):
+    try:
+        target_url = str(OpenAPIEndpointsRequest(target_url=target_url).target_url)
+        schema = await asyncio.get_running_loop().run_in_executor(None, load_spec, spec.file, spec.filename)
+        parsed = OpenAPIParser.ingest_spec(target_url, schema)
+        return _openapi_endpoints_response(target_url, parsed, db)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    finally:
+        await spec.close()
+
+# Drop cached spec locations and parses, e.g. after redeploying a target
+@app.post("/api/openapi-endpoints/invalidate")
+async def invalidate_openapi_cache(target_url: Optional[str] = None):
+    OpenAPIParser.invalidate(target_url)
+    return {"invalidated": target_url or "all"}
+
 # Endpoint to generate sample request data for an endpoint
 @app.post("/api/generate-sample-data")
 async def generate_sample_data(endpoint: EndpointSchema):
     try:
         # Generate sample request data based on schema
-        data_generator = RequestDataGenerator()
         
         # Result structure
         result = {
@@ -446,17 +571,17 @@ async def start_advanced_test(config: StressTestConfig):
     try:
         test_id = str(uuid.uuid4())
         
+        # Reject a malformed load profile before the test starts
+        if config.load_profile:
+            LoadProfile.from_config(config.load_profile)
+        if config.strategy == DistributionStrategy.ADAPTIVE and config.agents:
+            raise ValueError("The adaptive strategy searches from one load generator and cannot be spread across agents")
+        
         # Fetch endpoint schemas if they exist
         endpoint_schemas = {}
         try:
-            schema = await OpenAPIParser.fetch_openapi_spec(str(config.target_url))
-            # Build a dictionary of endpoint schemas for easy lookup
-            for endpoint_info in OpenAPIParser.parse_schema(schema):
-                endpoint_key = f"{endpoint_info.method} {endpoint_info.path}"
-                endpoint_schemas[endpoint_key] = {
-                    "parameters": [param.dict() for param in endpoint_info.parameters],
-                    "requestBody": endpoint_info.request_body
-                }
+            # Usually parsed moments ago by /api/openapi-endpoints, so no discovery traffic hits the target
+            endpoint_schemas = (await OpenAPIParser.get_parsed_spec(str(config.target_url))).endpoint_schemas
         except Exception as e:
             logger.warning(f"Could not fetch OpenAPI schema: {e}. Will proceed without schema validation.")
         
@@ -467,12 +592,14 @@ async def start_advanced_test(config: StressTestConfig):
                 "path": endpoint.path,
                 "method": endpoint.method,
                 "weight": endpoint.weight,
-                "custom_parameters": endpoint.custom_parameters
+                "custom_parameters": endpoint.custom_parameters,
+                "data_strategy": endpoint.data_strategy,
+                "test_data_samples": endpoint.test_data_samples,
+                "body_mode": endpoint.body_mode,
+                "body_sample_percent": endpoint.body_sample_percent
             })
         
-        # Start the test asynchronously
-        asyncio.create_task(stress_tester.run_advanced_test(
-            test_id=test_id,
+        test_config = dict(
             target_url=str(config.target_url),
             strategy=config.strategy,
             max_concurrent_users=config.max_concurrent_users,
@@ -480,8 +607,26 @@ async def start_advanced_test(config: StressTestConfig):
             duration=config.duration,
             endpoints=endpoint_configs,
             headers=config.headers,
-            endpoint_schemas=endpoint_schemas
-        ))
+            endpoint_schemas=endpoint_schemas,
+            load_mode=config.load_mode,
+            arrival_distribution=config.arrival_distribution,
+            http2=config.http2,
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            worker_processes=config.worker_processes,
+            record_samples=config.record_samples,
+            load_profile=config.load_profile.model_dump(mode="json") if config.load_profile else None,
+            adaptive=config.adaptive.model_dump(mode="json") if config.adaptive else None
+        )
+        
+        if config.session_config_id:
+            stress_tester.session_config_ids[test_id] = str(config.session_config_id)
+        
+        # Start the test asynchronously, spreading it across load agents if any were given
+        if config.agents:
+            asyncio.create_task(coordinator.run_advanced_test(test_id, config.agents, test_config))
+        else:
+            asyncio.create_task(stress_tester.run_advanced_test(test_id=test_id, **test_config))
         
         return TestStartResponse(
             test_id=test_id,
@@ -506,7 +651,7 @@ async def start_advanced_test(config: StressTestConfig):
 @app.get("/api/advanced-test/{test_id}/progress", response_model=StressTestProgressResponse)
 async def get_advanced_test_progress(test_id: str):
     try:
-        progress = stress_tester.get_test_progress(test_id)
+        progress = await stress_tester.load_test_progress(test_id)
         
         if progress["status"] == "not_found":
             raise HTTPException(
@@ -534,10 +679,112 @@ async def get_advanced_test_progress(test_id: str):
         )
 
 # Endpoint to get advanced test results
+@app.get("/api/advanced-test/{test_id}/metrics", response_model=MetricsHistoryResponse)
+async def get_advanced_test_metrics(test_id: str, since: int = 0, limit: Optional[int] = None):
+    """
+    Returns the per-second live metrics windows recorded for a test after `since`.
+    
+    Windows come back as columns. Pass the returned cursor as `since` to fetch only
+    newer windows; the server keeps the most recent hour of windows per test.
+    """
+    history = stress_tester.metrics_history.get(test_id)
+    if history is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Test {test_id} not found"
+        )
+    return MetricsHistoryResponse(test_id=test_id, **history.since(since, limit))
+
+def _sample_file(test_id: str) -> SampleFile:
+    try:
+        return SampleFile(test_id)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No samples recorded for test {test_id}"
+        )
+
+@app.get("/api/advanced-test/{test_id}/samples/percentiles", response_model=SamplePercentilesResponse)
+async def get_advanced_test_sample_percentiles(test_id: str,
+                                               percentiles: str = "50,90,99,99.9",
+                                               endpoint: Optional[str] = None,
+                                               start_ns: Optional[int] = None,
+                                               end_ns: Optional[int] = None):
+    """
+    Returns exact latency percentiles computed from the raw samples of a test run
+    with record_samples enabled, optionally for one endpoint ('METHOD path') and a
+    [start_ns, end_ns) range of request start times.
+    """
+    try:
+        percents = [float(value) for value in percentiles.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="percentiles must be a comma-separated list of numbers"
+        )
+    samples = _sample_file(test_id)
+    summary = await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(samples.percentiles, percents, endpoint, start_ns, end_ns)
+    )
+    return SamplePercentilesResponse(test_id=test_id, **summary)
+
+@app.get("/api/advanced-test/{test_id}/samples/windows", response_model=SampleWindowsResponse)
+async def get_advanced_test_sample_windows(test_id: str,
+                                           width: float = Query(1.0, gt=0),
+                                           endpoint: Optional[str] = None,
+                                           start_ns: Optional[int] = None,
+                                           end_ns: Optional[int] = None):
+    """
+    Returns request counts and latency per time window computed from the raw
+    samples of a test run with record_samples enabled.
+    """
+    samples = _sample_file(test_id)
+    windows = await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(samples.time_windows, width, endpoint, start_ns, end_ns)
+    )
+    return SampleWindowsResponse(test_id=test_id, width=width, **windows)
+
+@app.get("/api/advanced-test/{test_id}/export")
+async def export_advanced_test(test_id: str, format: ExportFormat = ExportFormat.NDJSON, rows: Optional[ExportRows] = None):
+    """
+    Streams a test's rows as NDJSON, CSV or Parquet with chunked encoding.
+    
+    `rows=samples` exports one row per request from the raw samples of a run with
+    record_samples enabled, `rows=results` one row per endpoint and concurrency
+    level. By default samples are exported when they were recorded. Rows are read
+    and serialised in batches, so memory use does not grow with the size of the run.
+    """
+    if rows is None:
+        rows = ExportRows.SAMPLES if sample_paths(test_id)[0].exists() else ExportRows.RESULTS
+    
+    if rows == ExportRows.SAMPLES:
+        batches = sample_batches(_sample_file(test_id))
+    else:
+        results = await stress_tester.load_advanced_results(test_id)
+        if not results:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Test {test_id} not found or has no results"
+            )
+        batches = result_batches(results)
+    
+    try:
+        body = export_stream(batches, format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{test_id}-{rows.value}.{format.value}"'}
+    )
+
 @app.get("/api/advanced-test/{test_id}/results", response_model=StressTestResultsResponse)
 async def get_advanced_test_results(test_id: str):
     try:
-        results = stress_tester.get_advanced_results(test_id)
+        results = await stress_tester.load_advanced_results(test_id)
         
         if not results:
             raise HTTPException(
@@ -590,6 +837,39 @@ async def stop_advanced_test(test_id: str):
             detail=str(e)
         )
 
+# Load agent endpoints, used by a coordinator running a distributed test
+@app.get("/api/agent/clock")
+async def get_agent_clock():
+    return {"agent_time": time.time()}
+
+@app.post("/api/agent/tests")
+async def start_agent_test(request: AgentTestRequest):
+    try:
+        load_agent.start_test(request.test_id, request.start_at, request.config)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return load_agent.status(request.test_id)
+
+@app.get("/api/agent/tests/{test_id}")
+async def get_agent_test_status(test_id: str):
+    agent_status = load_agent.status(test_id)
+    if agent_status is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Test {test_id} not found on this agent")
+    return agent_status
+
+@app.get("/api/agent/tests/{test_id}/results")
+async def get_agent_test_results(test_id: str):
+    agent_results = load_agent.results(test_id)
+    if agent_results is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Test {test_id} not found on this agent")
+    return agent_results
+
+@app.post("/api/agent/tests/{test_id}/stop")
+async def stop_agent_test(test_id: str):
+    if not load_agent.stop(test_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Test {test_id} not found on this agent")
+    return load_agent.status(test_id)
+
 # Endpoint to get available distribution strategies
 @app.get("/api/distribution-strategies", response_model=List[str])
 async def get_distribution_strategies():
@@ -616,17 +896,35 @@ async def get_distribution_requirements():
     return DistributionRequirementsResponse(strategies=distribution_requirements)
 
 @app.websocket("/ws/metrics/{test_id}")
-async def metrics_websocket(websocket: WebSocket, test_id: str):
-    await metrics_manager.connect_client(test_id, websocket)
+async def metrics_websocket(websocket: WebSocket,
+                            test_id: str,
+                            protocol: Optional[int] = None,
+                            encoding: str = "json",
+                            interval: float = 1.0):
+    """
+    Streams a test's metrics.
+    
+    Without query parameters every frame is sent as a JSON text message holding
+    the list of per-endpoint metrics. With `?protocol=1` the client gets the full
+    frames (totals, status, phase) over the versioned snapshot/delta protocol,
+    optionally as binary messages (`encoding=binary`) and downsampled to one
+    message per `interval` seconds.
+    """
+    try:
+        profile = metrics_manager.stream_profile(protocol, encoding, interval)
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await metrics_manager.connect_client(test_id, websocket, profile)
     
     try:
-        while True:
-            await metrics_manager.broadcast_metrics(test_id)
-            await asyncio.sleep(1)  # Update every second
+        # One producer per test fills this client's queue; this loop only sends
+        await metrics_manager.serve_client(test_id, websocket)
     except WebSocketDisconnect:
-        await metrics_manager.disconnect_client(test_id, websocket)
+        pass
     except Exception as e:
         print(f"Error in metrics websocket: {e}")
+    finally:
         await metrics_manager.disconnect_client(test_id, websocket)
 
 # Add a dictionary to store the current state of each test
@@ -926,56 +1224,83 @@ async def create_session_configuration(config: SessionConfigRequest, user_email:
         # Raise an HTTP exception
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+# Endpoint 3: Run a saved session configuration
+@app.post("/api/sessions/configuration/{config_id}/run", response_model=TestStartResponse)
+async def run_session_configuration(config_id: str, db: Session = Depends(get_db)):
+    """
+    Starts an advanced test from a saved session configuration.
+    
+    Virtual users ramp up linearly to concurrent_users over ramp_up_time, then hold
+    for the rest of test_duration, each waiting think_time between requests. The
+    run is stored under the configuration.
+    """
+    try:
+        config_uuid = uuid.UUID(config_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid configuration ID format")
+    
+    session_config = get_session_config(db, config_uuid)
+    if not session_config:
+        raise HTTPException(status_code=404, detail=f"Session configuration {config_id} not found")
+    
+    url = urlsplit(session_config.endpoint_url)
+    if not url.scheme or not url.netloc:
+        raise HTTPException(status_code=400, detail="Session configuration endpoint_url must be an absolute URL")
+    if session_config.test_duration <= 0:
+        raise HTTPException(status_code=400, detail="Session configuration test_duration must be positive")
+    
+    # Saved request parameters join any query string already in the endpoint URL
+    path = httpx.URL(url.path or "/", query=url.query.encode()).copy_merge_params(session_config.request_params or {})
+    custom_parameters = {}
+    if session_config.request_body is not None:
+        custom_parameters["__request_body"] = session_config.request_body
+    ramp_up = min(session_config.ramp_up_time, session_config.test_duration)
+    
+    return await start_advanced_test(StressTestConfig(
+        target_url=f"{url.scheme}://{url.netloc}",
+        strategy=DistributionStrategy.SEQUENTIAL,
+        max_concurrent_users=session_config.concurrent_users,
+        request_rate=max(1, session_config.concurrent_users),
+        duration=session_config.test_duration,
+        endpoints=[StressTestEndpointConfig(
+            path=str(path),
+            method=session_config.http_method.upper(),
+            custom_parameters=custom_parameters or None
+        )],
+        headers={name: str(value) for name, value in (session_config.request_headers or {}).items()} or None,
+        session_config_id=session_config.id,
+        load_profile=LoadProfileConfig(
+            shape=LoadProfileShape.RAMP,
+            driver=LoadProfileDriver.USERS,
+            target=session_config.concurrent_users,
+            ramp_up=ramp_up,
+            steady=session_config.test_duration - ramp_up,
+            think_time=session_config.think_time
+        )
+    ))
+
 # Endpoint to generate data based on schema
 @app.post("/api/generate-data", response_model=DataGenerationResponse)
 async def generate_data(request: DataGenerationRequest):
     """Generate sample data based on the provided schema definition."""
     try:
-        # Initialize the data generator
-        data_generator = RequestDataGenerator()
-        generated_data = None
-        
-        # Generate data based on the schema type
+        # Generate data based on the schema type; the schema is compiled once per batch
         if request.schema_type in ['string', 'integer', 'number', 'boolean']:
             # For primitive types
-            if request.count == 1:
-                generated_data = data_generator.generate_primitive(
-                    request.schema_type, 
-                    request.schema_format, 
-                    request.enum
-                )
-            else:
-                # Generate multiple samples if requested
-                generated_data = [
-                    data_generator.generate_primitive(
-                        request.schema_type, 
-                        request.schema_format, 
-                        request.enum
-                    ) for _ in range(request.count)
-                ]
+            primitive_schema = {"type": request.schema_type, "format": request.schema_format, "enum": request.enum}
+            samples = data_generator.generate_many(primitive_schema, request.count)
         elif request.schema_type == 'object' and request.schema:
             # For object types
-            if request.count == 1:
-                generated_data = data_generator.generate_object(request.schema)
-            else:
-                generated_data = [
-                    data_generator.generate_object(request.schema)
-                    for _ in range(request.count)
-                ]
+            samples = data_generator.generate_many(request.schema, request.count, kind='object')
         elif request.schema_type == 'array' and request.schema:
             # For array types
-            if request.count == 1:
-                generated_data = data_generator.generate_array(request.schema)
-            else:
-                generated_data = [
-                    data_generator.generate_array(request.schema)
-                    for _ in range(request.count)
-                ]
+            samples = data_generator.generate_many(request.schema, request.count, kind='array')
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid schema type or missing schema definition"
             )
+        generated_data = samples[0] if request.count == 1 else samples
             
         return DataGenerationResponse(
             generated_data=generated_data,
@@ -994,7 +1319,17 @@ async def generate_data(request: DataGenerationRequest):
 async def generate_endpoint_data(request: EndpointDataGenerationRequest):
     """Generate sample data for a specific API endpoint."""
     try:
-        data_generator = RequestDataGenerator()
+        
+        # Compile the parameter and body generators once for all samples
+        param_generators = {
+            location: [
+                (param.name, data_generator.compile_schema(param.param_schema))
+                for param in request.endpoint_schema.parameters
+                if param.location == location and param.param_schema
+            ]
+            for location in ('path', 'query', 'header')
+        }
+        body_generator = data_generator.compile_request_data(request.endpoint_schema.request_body)
         
         # Result data structure
         result_samples = []
@@ -1007,43 +1342,25 @@ async def generate_endpoint_data(request: EndpointDataGenerationRequest):
             
             # Generate path parameters
             if request.include_path:
-                path_params = {}
-                for param in request.endpoint_schema.parameters:
-                    if param.location == 'path' and param.param_schema:
-                        param_type = param.param_schema.get('type', 'string')
-                        param_format = param.param_schema.get('format')
-                        param_enum = param.param_schema.get('enum')
-                        path_params[param.name] = data_generator.generate_primitive(param_type, param_format, param_enum)
+                path_params = {name: generate() for name, generate in param_generators['path']}
                 if path_params:
                     sample["data"]["path_parameters"] = path_params
             
             # Generate query parameters
             if request.include_query:
-                query_params = {}
-                for param in request.endpoint_schema.parameters:
-                    if param.location == 'query' and param.param_schema:
-                        param_type = param.param_schema.get('type', 'string')
-                        param_format = param.param_schema.get('format')
-                        param_enum = param.param_schema.get('enum')
-                        query_params[param.name] = data_generator.generate_primitive(param_type, param_format, param_enum)
+                query_params = {name: generate() for name, generate in param_generators['query']}
                 if query_params:
                     sample["data"]["query_parameters"] = query_params
             
             # Generate header parameters
             if request.include_headers:
-                headers = {}
-                for param in request.endpoint_schema.parameters:
-                    if param.location == 'header' and param.param_schema:
-                        param_type = param.param_schema.get('type', 'string')
-                        param_format = param.param_schema.get('format')
-                        param_enum = param.param_schema.get('enum')
-                        headers[param.name] = data_generator.generate_primitive(param_type, param_format, param_enum)
+                headers = {name: generate() for name, generate in param_generators['header']}
                 if headers:
                     sample["data"]["headers"] = headers
             
             # Generate request body
             if request.include_body and request.endpoint_schema.request_body:
-                sample["data"]["body"] = data_generator.generate_request_data(request.endpoint_schema.request_body)
+                sample["data"]["body"] = body_generator()
             
             # Generate example URL with path parameters filled in
             path_with_params = request.endpoint_schema.path
@@ -1096,7 +1413,17 @@ async def generate_endpoint_data(request: EndpointDataGenerationRequest):
 async def generate_endpoint_test_data(request: EndpointTestDataRequest):
     """Generate test data samples for a specific endpoint in the format needed by the UI."""
     try:
-        data_generator = RequestDataGenerator()
+        
+        # Compile the parameter and body generators once for all samples
+        param_generators = {
+            location: [
+                (param.name, data_generator.compile_schema(param.param_schema))
+                for param in request.endpoint_schema.parameters
+                if param.location == location and param.param_schema
+            ]
+            for location in ('path', 'query', 'header')
+        }
+        body_generator = data_generator.compile_request_data(request.endpoint_schema.request_body)
         
         # Result data samples
         data_samples = []
@@ -1109,41 +1436,23 @@ async def generate_endpoint_test_data(request: EndpointTestDataRequest):
             sample = {}
             
             # Generate path parameters
-            path_params = {}
-            for param in request.endpoint_schema.parameters:
-                if param.location == 'path' and param.param_schema:
-                    param_type = param.param_schema.get('type', 'string')
-                    param_format = param.param_schema.get('format')
-                    param_enum = param.param_schema.get('enum')
-                    path_params[param.name] = data_generator.generate_primitive(param_type, param_format, param_enum)
+            path_params = {name: generate() for name, generate in param_generators['path']}
             if path_params:
                 sample["path_parameters"] = path_params
             
             # Generate query parameters
-            query_params = {}
-            for param in request.endpoint_schema.parameters:
-                if param.location == 'query' and param.param_schema:
-                    param_type = param.param_schema.get('type', 'string')
-                    param_format = param.param_schema.get('format')
-                    param_enum = param.param_schema.get('enum')
-                    query_params[param.name] = data_generator.generate_primitive(param_type, param_format, param_enum)
+            query_params = {name: generate() for name, generate in param_generators['query']}
             if query_params:
                 sample["query_parameters"] = query_params
             
             # Generate header parameters
-            headers = {}
-            for param in request.endpoint_schema.parameters:
-                if param.location == 'header' and param.param_schema:
-                    param_type = param.param_schema.get('type', 'string')
-                    param_format = param.param_schema.get('format')
-                    param_enum = param.param_schema.get('enum')
-                    headers[param.name] = data_generator.generate_primitive(param_type, param_format, param_enum)
+            headers = {name: generate() for name, generate in param_generators['header']}
             if headers:
                 sample["headers"] = headers
             
             # Generate request body
             if request.endpoint_schema.request_body:
-                sample["body"] = data_generator.generate_request_data(request.endpoint_schema.request_body)
+                sample["body"] = body_generator()
             
             # Add the sample to the result
             data_samples.append(sample)
@@ -1165,7 +1474,6 @@ async def generate_endpoint_test_data(request: EndpointTestDataRequest):
 async def generate_test_scenarios(request: TestScenarioGenerationRequest):
     """Generate complete test scenarios for the provided API endpoints."""
     try:
-        data_generator = RequestDataGenerator()
         scenarios = []
         
         # Common API patterns for scenario generation
@@ -1,10 +1,19 @@
 import asyncio
+import json
 import random
 import time
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from fastapi import WebSocket
 
+from live_metrics import LiveMetricsHub, live_metrics_hub
+from metrics_protocol import ENCODINGS, PROTOCOL_VERSION, StreamEncoder, encode_backfill
+
+# Encoded frames buffered per client; when a client falls behind its oldest frame is dropped
+CLIENT_QUEUE_SIZE = 8
+# Longest downsampling interval a protocol client may ask for, in seconds
+MAX_STREAM_INTERVAL = 300.0
+
 @dataclass
 class EndpointMetrics:
     endpoint: str
@@ -90,38 +99,205 @@ class MetricsGenerator:
         return metrics
 
 class MetricsManager:
-    def __init__(self):
+    """Streams metrics to WebSocket clients.
+
+    Each test has a single producer task that builds a frame and fans it out to every
+    client's bounded queue; each client's own send loop drains its queue, so a
+    stalled browser only loses its oldest frames and never holds up the others.
+    Tests run by the StressTester produce the real per-second frames of the live
+    metrics hub; other test ids (demo dashboards) fall back to the simulated
+    MetricsGenerator.
+
+    Clients that do not ask for a protocol get every frame as a plain JSON list of
+    per-endpoint metrics (the frontend's EndpointMetric); test-wide totals, status
+    and phase are only sent over the versioned protocol (see metrics_protocol),
+    whose clients get a snapshot and then deltas, in JSON or binary and at the
+    interval they chose. Each frame is encoded once per (encoding, interval)
+    profile, not once per client. Protocol clients joining a running or finished
+    test first get a backfill of its recorded windows (see MetricsRing).
+    """
+    def __init__(self, hub: Optional[LiveMetricsHub] = None, interval: float = 1.0):
         self.generator = MetricsGenerator()
+        self.hub = hub or live_metrics_hub
+        self.interval = interval
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        self.client_queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.client_profiles: Dict[WebSocket, Optional[Tuple[str, float]]] = {}
+        self.encoders: Dict[str, Dict[Tuple[str, float], StreamEncoder]] = {}
+        self.producers: Dict[str, asyncio.Task] = {}
+        self.dropped_frames = 0
+
+    def is_live(self, test_id: str) -> bool:
+        """Whether a test has real metrics in the live hub"""
+        return self.hub.has_test(test_id)
+
+    @staticmethod
+    def stream_profile(protocol: Optional[int] = None,
+                       encoding: str = "json",
+                       interval: float = 1.0) -> Optional[Tuple[str, float]]:
+        """Validate a client's requested protocol options; None selects plain JSON frames"""
+        if protocol is None:
+            return None
+        if protocol != PROTOCOL_VERSION:
+            raise ValueError(f"Unsupported metrics protocol version: {protocol}")
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+        if not 0 <= interval <= MAX_STREAM_INTERVAL:
+            raise ValueError(f"interval must be between 0 and {MAX_STREAM_INTERVAL} seconds")
+        return encoding, interval
 
     def start_test(self, test_id: str, num_endpoints: Optional[int] = None):
         """Start a new test and initialize its connections list."""
-        self.generator.start_test(test_id, num_endpoints)
+        if not self.is_live(test_id):
+            self.generator.start_test(test_id, num_endpoints)
         self.active_connections[test_id] = []
 
     def stop_test(self, test_id: str):
-        """Stop a test and clean up its connections."""
+        """Stop a test, its producer and clean up its connections."""
+        producer = self.producers.pop(test_id, None)
+        if producer is not None:
+            producer.cancel()
+        self.encoders.pop(test_id, None)
         self.generator.stop_test(test_id)
         if test_id in self.active_connections:
             del self.active_connections[test_id]
 
-    async def connect_client(self, test_id: str, websocket: WebSocket):
+    async def connect_client(self, test_id: str, websocket: WebSocket, profile: Optional[Tuple[str, float]] = None):
         """Connect a new client to a test's metrics stream."""
         await websocket.accept()
         if test_id not in self.active_connections:
             self.start_test(test_id)
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.client_queues[websocket] = queue
+        self.client_profiles[websocket] = profile
         self.active_connections[test_id].append(websocket)
 
+        if profile is not None:
+            history = self.hub.history(test_id)
+            if history is not None and history.seq:
+                # Windows the client missed, before any live frame
+                queue.put_nowait(encode_backfill(history.since(), profile[0]))
+
+            encoders = self.encoders.setdefault(test_id, {})
+            encoder = encoders.get(profile)
+            if encoder is None:
+                encoders[profile] = StreamEncoder(*profile)
+            elif encoder.state:
+                # Join the profile's shared deltas from a snapshot of where they are now
+                queue.put_nowait(encoder.snapshot())
+
+        producer = self.producers.get(test_id)
+        if producer is None or producer.done():
+            produce = self._produce_live if self.is_live(test_id) else self._produce_simulated
+            self.producers[test_id] = asyncio.create_task(produce(test_id))
+
     async def disconnect_client(self, test_id: str, websocket: WebSocket):
         """Disconnect a client from a test's metrics stream."""
-        if test_id in self.active_connections:
+        self.client_queues.pop(websocket, None)
+        profile = self.client_profiles.pop(websocket, None)
+        if test_id in self.active_connections and websocket in self.active_connections[test_id]:
             self.active_connections[test_id].remove(websocket)
             if not self.active_connections[test_id]:
                 self.stop_test(test_id)
+            elif profile is not None and profile not in (
+                self.client_profiles.get(other) for other in self.active_connections[test_id]
+            ):
+                self.encoders.get(test_id, {}).pop(profile, None)
+        try:
+            await websocket.close()
+        except Exception:
+            # The client may already have gone away
+            pass
+
+    async def serve_client(self, test_id: str, websocket: WebSocket):
+        """Send a client its test's encoded frames until the stream ends."""
+        queue = self.client_queues.get(websocket)
+        if queue is None:
+            return
+        while True:
+            payload = await queue.get()
+            if payload is None:
+                break
+            if isinstance(payload, bytes):
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload)
+
+    def _enqueue(self, test_id: str, websocket: WebSocket, payload):
+        queue = self.client_queues.get(websocket)
+        if queue is None:
+            return
+        if queue.full():
+            profile = self.client_profiles.get(websocket)
+            if profile is None:
+                queue.get_nowait()
+                self.dropped_frames += 1
+            else:
+                # Deltas only apply in order, so a protocol client that fell behind
+                # restarts from a snapshot, which already includes this payload
+                self.dropped_frames += queue.qsize()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.encoders[test_id][profile].snapshot())
+                if payload is not None:
+                    return
+        queue.put_nowait(payload)
+
+    def _fan_out(self, test_id: str, frame: Any):
+        """Encode a frame once per client profile and queue it for every client of a test"""
+        payloads = {
+            profile: encoder.push(frame)
+            for profile, encoder in self.encoders.get(test_id, {}).items()
+        }
+        for websocket in self.active_connections.get(test_id, []):
+            profile = self.client_profiles.get(websocket)
+            if profile is None and None not in payloads:
+                payloads[None] = self._encode(self._legacy_frame(frame))
+            if payloads.get(profile) is not None:
+                self._enqueue(test_id, websocket, payloads[profile])
+
+    def _end_stream(self, test_id: str):
+        """Send any frames held back for downsampling, then end every client's stream"""
+        payloads = {
+            profile: encoder.flush()
+            for profile, encoder in self.encoders.get(test_id, {}).items()
+        }
+        for websocket in self.active_connections.get(test_id, []):
+            payload = payloads.get(self.client_profiles.get(websocket))
+            if payload is not None:
+                self._enqueue(test_id, websocket, payload)
+            self._enqueue(test_id, websocket, None)
+
+    @staticmethod
+    def _encode(frame) -> str:
+        return json.dumps(frame, separators=(",", ":"))
+
+    @staticmethod
+    def _legacy_frame(frame) -> List[Dict[str, Any]]:
+        """The list of per-endpoint metrics plain JSON clients have always received"""
+        return frame["endpoints"] if isinstance(frame, dict) else frame
+
+    async def _produce_live(self, test_id: str):
+        """Relay a real test's frames from the live metrics hub until it finishes"""
+        queue = self.hub.subscribe(test_id)
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    self._end_stream(test_id)
+                    break
+                self._fan_out(test_id, frame)
+        finally:
+            self.hub.unsubscribe(test_id, queue)
+
+    async def _produce_simulated(self, test_id: str):
+        while test_id in self.active_connections:
+            await self.broadcast_metrics(test_id)
+            await asyncio.sleep(self.interval)
 
     async def broadcast_metrics(self, test_id: str):
-        """Broadcast metrics to all clients connected to a test."""
-        if test_id not in self.active_connections:
+        """Generate one simulated frame and fan it out to all clients connected to a test."""
+        if test_id not in self.active_connections or self.is_live(test_id):
             return
 
         metrics = self.generator.generate_metrics(test_id)
@@ -141,13 +317,8 @@ class MetricsManager:
             for m in metrics
         ]
 
-        # Send to all connected clients
-        for websocket in self.active_connections[test_id][:]:  # Copy list to avoid modification during iteration
-            try:
-                await websocket.send_json(metrics_data)
-            except:
-                # If sending fails, remove the connection
-                await self.disconnect_client(test_id, websocket)
+        # Encoded once per client profile, however many clients are watching
+        self._fan_out(test_id, metrics_data)
 
 # Global metrics manager instance
 metrics_manager = MetricsManager()
@@ -0,0 +1,92 @@
+import math
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+from metrics_protocol import TOTAL_SERIES
+
+# Per-second windows kept per test (one hour)
+DEFAULT_HISTORY_SIZE = 3600
+
+# Values kept for every series in each window
+HISTORY_FIELDS = (
+    "requests",
+    "errors",
+    "rps",
+    "inFlight",
+    "successRate",
+    "avgResponseTime",
+    "p50ResponseTime",
+    "p90ResponseTime",
+    "p99ResponseTime",
+    "maxResponseTime"
+)
+
+
+class MetricsRing:
+    """Fixed-size time series of a test's live metrics windows.
+
+    Each series (the test totals and every endpoint) is a set of preallocated
+    ``array('d')`` columns, one per HISTORY_FIELDS entry, written in a ring; a
+    window where a series had no data holds NaN. Windows are numbered from 1 in
+    the order they were appended, so ``since`` cursors stay valid as old windows
+    are overwritten. Memory depends only on capacity and the number of series.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_SIZE):
+        self.capacity = max(1, capacity)
+        self.seq = 0
+        self.timestamps = array("d", [math.nan]) * self.capacity
+        self.series: Dict[str, List[array]] = {}
+
+    def _columns(self, key: str) -> List[array]:
+        columns = self.series.get(key)
+        if columns is None:
+            columns = self.series[key] = [array("d", [math.nan]) * self.capacity for _ in HISTORY_FIELDS]
+        return columns
+
+    def append(self, frame: Dict[str, Any], timestamp: Optional[float] = None):
+        """Record one live metrics frame (see LiveChannel.flush)"""
+        slot = self.seq % self.capacity
+        self.seq += 1
+        self.timestamps[slot] = time.time() if timestamp is None else timestamp
+
+        values = {TOTAL_SERIES: frame}
+        for endpoint in frame.get("endpoints", []):
+            values[endpoint["endpoint"]] = endpoint
+        for key in values:
+            self._columns(key)
+        for key, columns in self.series.items():
+            series = values.get(key)
+            for field, column in zip(HISTORY_FIELDS, columns):
+                value = series.get(field) if series is not None else None
+                column[slot] = math.nan if value is None else value
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest window still held"""
+        return max(1, self.seq - self.capacity + 1)
+
+    def since(self, cursor: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Windows after cursor, oldest first, as columns.
+
+        Pass the returned ``cursor`` back to fetch only newer windows. Windows that
+        have been overwritten are skipped; ``start`` is the first one returned.
+        """
+        start = max(cursor + 1, self.first_seq)
+        end = self.seq if limit is None else min(self.seq, start + max(0, limit) - 1)
+        slots = [(seq - 1) % self.capacity for seq in range(start, end + 1)]
+
+        def column_values(column: array) -> List[Optional[float]]:
+            return [None if math.isnan(column[slot]) else column[slot] for slot in slots]
+
+        return {
+            "cursor": max(end, cursor),
+            "start": start,
+            "fields": list(HISTORY_FIELDS),
+            "timestamps": column_values(self.timestamps),
+            "series": {
+                key: {field: column_values(column) for field, column in zip(HISTORY_FIELDS, columns)}
+                for key, columns in self.series.items()
+            }
+        }
@@ -0,0 +1,286 @@
+import json
+import math
+import struct
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Version of the streaming metrics protocol spoken on /ws/metrics when a client asks for it
+PROTOCOL_VERSION = 1
+ENCODINGS = ("json", "binary")
+
+# Series holding a live frame's test-wide aggregates
+TOTAL_SERIES = "*"
+# Fields summed when consecutive frames are downsampled into one message
+ADDITIVE_FIELDS = ("requests", "errors", "window")
+# A full snapshot is sent after this many deltas so clients can resynchronise
+KEYFRAME_EVERY = 60
+
+# Binary messages: magic, version, message type and sequence number, then a length-prefixed
+# JSON section for names and metadata and a count-prefixed array of (series, field, value)
+_HEADER = struct.Struct("<2sBBI")
+_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<HHd")
+_MAGIC = b"TM"
+_MESSAGE_TYPES = ("snapshot", "delta", "backfill")
+
+Payload = Union[str, bytes]
+
+
+def flatten_frame(frame: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]:
+    """Split a metrics frame into string metadata and numeric series.
+
+    Live hub frames give a TOTAL_SERIES entry plus one series per endpoint; simulated
+    frames (a list of endpoint dicts) give one series per endpoint. Nested counters
+    such as errorsByStatus are flattened to dotted field names.
+    """
+    if isinstance(frame, list):
+        meta, totals, endpoints = {}, None, frame
+    else:
+        meta, totals = {}, {}
+        for key, value in frame.items():
+            if key == "endpoints":
+                continue
+            if isinstance(value, str) or value is None:
+                meta[key] = value
+            else:
+                totals[key] = value
+        endpoints = frame.get("endpoints", [])
+
+    series = {}
+    if totals is not None:
+        series[TOTAL_SERIES] = _flatten(totals)
+    for item in endpoints:
+        series[item["endpoint"]] = _flatten({key: value for key, value in item.items() if key != "endpoint"})
+    return meta, series
+
+
+def _flatten(values: Dict[str, Any]) -> Dict[str, float]:
+    flat = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}.{sub_key}"] = sub_value
+        elif isinstance(value, (int, float)):
+            flat[key] = value
+    return flat
+
+
+def _merge_series(pending: Dict[str, Dict[str, float]], series: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Fold a newer frame into frames awaiting a downsampled send"""
+    merged = {}
+    for key, fields in series.items():
+        previous = pending.get(key, {})
+        values = dict(fields)
+        for field, value in previous.items():
+            if field in ADDITIVE_FIELDS or field.startswith("errorsByStatus."):
+                values[field] = value + fields.get(field, 0)
+        if values.get("window"):
+            values["rps"] = round(values.get("requests", 0) / values["window"], 2)
+        merged[key] = values
+    return merged
+
+
+class StreamEncoder:
+    """Encodes a test's frames for clients sharing one (encoding, interval) profile.
+
+    The first message is a snapshot of every series; later messages are deltas with
+    only the series and fields that changed. Series and field names are sent once
+    and then referred to by index. With an interval above the producer's rate,
+    frames are merged (counters summed, gauges take the newest value) and sent at
+    most once per interval.
+    """
+
+    def __init__(self, encoding: str = "json", interval: float = 0.0):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
+        self.encoding = encoding
+        self.interval = interval
+        self.seq = 0
+        self.meta: Dict[str, Any] = {}
+        self.state: Dict[str, Dict[str, float]] = {}
+        self.series_names: List[str] = []
+        self.field_names: List[str] = []
+        self._series_index: Dict[str, int] = {}
+        self._field_index: Dict[str, int] = {}
+        self._pending: Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]] = None
+        self._last_sent: Optional[float] = None
+        self._since_keyframe = 0
+
+    def push(self, frame, now: Optional[float] = None) -> Optional[Payload]:
+        """Take the producer's next frame; returns a message when one is due"""
+        now = time.monotonic() if now is None else now
+        meta, series = flatten_frame(frame)
+        if self._pending is not None:
+            meta = dict(self._pending[0], **meta)
+            series = _merge_series(self._pending[1], series)
+        self._pending = (meta, series)
+        # Small tolerance so a 1s producer is not pushed to every other tick by jitter
+        if self._last_sent is not None and now - self._last_sent < self.interval * 0.95:
+            return None
+        self._last_sent = now
+        return self.flush()
+
+    def flush(self) -> Optional[Payload]:
+        """Send whatever is waiting on the downsampling interval"""
+        if self._pending is None:
+            return None
+        meta, series = self._pending
+        self._pending = None
+        first = not self.state and not self.meta
+        new_series, new_fields = len(self.series_names), len(self.field_names)
+
+        values = []
+        for key, fields in series.items():
+            previous = self.state.get(key, {})
+            for field, value in fields.items():
+                if previous.get(field) != value:
+                    values.append((self._index(key, self._series_index, self.series_names),
+                                   self._index(field, self._field_index, self.field_names),
+                                   value))
+            for field in previous.keys() - fields.keys():
+                values.append((self._series_index[key], self._field_index[field], None))
+        removed = [self._series_index[key] for key in self.state.keys() - series.keys()]
+        changed_meta = {key: value for key, value in meta.items() if self.meta.get(key) != value}
+        self.state, self.meta = series, meta
+
+        self._since_keyframe += 1
+        if first or self._since_keyframe >= KEYFRAME_EVERY:
+            return self.snapshot(advance=True)
+        message = {
+            "meta": changed_meta,
+            "series": self.series_names[new_series:],
+            "fields": self.field_names[new_fields:],
+            "values": values,
+            "removed": removed
+        }
+        self.seq += 1
+        return self._encode("delta", message)
+
+    def snapshot(self, advance: bool = False) -> Payload:
+        """Message carrying the complete current state, for new or resynchronising clients
+
+        Snapshots sent to a single client keep the current sequence number, so the
+        deltas every client shares continue from it.
+        """
+        if advance:
+            self.seq += 1
+            self._since_keyframe = 0
+        values = [
+            (self._series_index[key], self._field_index[field], value)
+            for key, fields in self.state.items()
+            for field, value in fields.items()
+        ]
+        message = {
+            "meta": self.meta,
+            "series": self.series_names,
+            "fields": self.field_names,
+            "values": values,
+            "removed": []
+        }
+        return self._encode("snapshot", message)
+
+    @staticmethod
+    def _index(name: str, index: Dict[str, int], names: List[str]) -> int:
+        position = index.get(name)
+        if position is None:
+            position = index[name] = len(names)
+            names.append(name)
+        return position
+
+    def _encode(self, message_type: str, message: Dict[str, Any]) -> Payload:
+        if self.encoding == "json":
+            message = dict(message, v=PROTOCOL_VERSION, type=message_type, seq=self.seq,
+                           values=[list(value) for value in message["values"]])
+            return json.dumps(message, separators=(",", ":"))
+
+        names = json.dumps({key: message[key] for key in ("meta", "series", "fields", "removed")},
+                           separators=(",", ":")).encode()
+        parts = [
+            _HEADER.pack(_MAGIC, PROTOCOL_VERSION, _MESSAGE_TYPES.index(message_type), self.seq),
+            _LENGTH.pack(len(names)),
+            names,
+            _LENGTH.pack(len(message["values"]))
+        ]
+        parts.extend(_VALUE.pack(series, field, math.nan if value is None else value)
+                     for series, field, value in message["values"])
+        return b"".join(parts)
+
+
+def encode_backfill(history: Dict[str, Any], encoding: Optional[str] = "json") -> Payload:
+    """Encode a MetricsRing.since() result sent to a client before live messages.
+
+    JSON clients get the columns as a plain text message, left uncompressed on
+    purpose so any client can read it; the WebSocket's permessage-deflate extension
+    compresses it on the wire when the client negotiates it. Binary clients get the
+    columns zlib-compressed. Backfill does not take part in the snapshot/delta
+    sequence.
+    """
+    message = dict(history, v=PROTOCOL_VERSION, type="backfill")
+    if encoding != "binary":
+        return json.dumps(message, separators=(",", ":"))
+    body = zlib.compress(json.dumps(history, separators=(",", ":")).encode())
+    return _HEADER.pack(_MAGIC, PROTOCOL_VERSION, _MESSAGE_TYPES.index("backfill"), 0) + body
+
+
+def decode_message(payload: Payload) -> Dict[str, Any]:
+    """Decode a JSON or binary protocol message into its JSON form"""
+    if isinstance(payload, str):
+        return json.loads(payload)
+    magic, version, message_type, seq = _HEADER.unpack_from(payload)
+    if magic != _MAGIC:
+        raise ValueError("Not a metrics protocol message")
+    if _MESSAGE_TYPES[message_type] == "backfill":
+        message = json.loads(zlib.decompress(payload[_HEADER.size:]))
+        message.update(v=version, type="backfill")
+        return message
+    offset = _HEADER.size
+    (length,) = _LENGTH.unpack_from(payload, offset)
+    offset += _LENGTH.size
+    message = json.loads(payload[offset:offset + length])
+    offset += length
+    (count,) = _LENGTH.unpack_from(payload, offset)
+    offset += _LENGTH.size
+    values = []
+    for series, field, value in _VALUE.iter_unpack(payload[offset:offset + count * _VALUE.size]):
+        values.append([series, field, None if math.isnan(value) else value])
+    message.update(v=version, type=_MESSAGE_TYPES[message_type], seq=seq, values=values)
+    return message
+
+
+class StreamDecoder:
+    """Rebuilds series state from protocol messages (the reference client implementation)"""
+
+    def __init__(self):
+        self.seq = 0
+        self.meta: Dict[str, Any] = {}
+        self.series: Dict[str, Dict[str, float]] = {}
+        self.series_names: List[str] = []
+        self.field_names: List[str] = []
+        self.backfill: Optional[Dict[str, Any]] = None
+
+    def apply(self, payload: Payload) -> Dict[str, Any]:
+        message = decode_message(payload)
+        if message["type"] == "backfill":
+            self.backfill = message
+            return message
+        if message["type"] == "snapshot":
+            self.series, self.meta = {}, {}
+            self.series_names = list(message["series"])
+            self.field_names = list(message["fields"])
+        else:
+            if message["seq"] != self.seq + 1:
+                raise ValueError(f"Missed messages between {self.seq} and {message['seq']}")
+            self.series_names.extend(message["series"])
+            self.field_names.extend(message["fields"])
+        self.seq = message["seq"]
+        self.meta.update(message["meta"])
+        for series_index in message["removed"]:
+            self.series.pop(self.series_names[series_index], None)
+        for series_index, field_index, value in message["values"]:
+            fields = self.series.setdefault(self.series_names[series_index], {})
+            if value is None:
+                fields.pop(self.field_names[field_index], None)
+            else:
+                fields[self.field_names[field_index]] = value
+        return message
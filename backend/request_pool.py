@@ -0,0 +1,246 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from api_models import DataGenerationStrategy
+
+# Distinct requests kept per endpoint when the caller does not bound the ring
+DEFAULT_POOL_SIZE = 256
+
+# Generators are not shared between threads; each thread (or process) gets its own
+_local = threading.local()
+
+
+def _get_generator():
+    if not hasattr(_local, "generator"):
+        from data_generator import RequestDataGenerator
+        _local.generator = RequestDataGenerator()
+    return _local.generator
+
+
+class PreparedRequest:
+    """A request encoded ahead of time: final path and query string, headers and body bytes"""
+    __slots__ = ("base_url", "path", "headers", "content")
+
+    def __init__(self, base_url: str, path: str, headers: Dict[str, str], content: Optional[bytes] = None):
+        self.base_url = base_url
+        self.path = path
+        self.headers = headers
+        self.content = content
+
+
+def parameter_parts(param: Dict[str, Any]) -> Tuple[Optional[str], str, Dict[str, Any]]:
+    """Name, location ('path', 'query', 'header', ...) and schema of a parameter
+
+    Accepts raw OpenAPI parameters ('in'/'schema') as well as ParameterSchema dumps
+    ('location'/'param_schema').
+    """
+    location = param.get('in', param.get('location')) or ''
+    schema = param.get('schema', param.get('param_schema')) or {}
+    return param.get('name'), location, schema
+
+
+def prepare_request_parts(generator,
+                          base_url: str,
+                          endpoint_path: str,
+                          method: str,
+                          endpoint_schema: Optional[Dict[str, Any]] = None,
+                          custom_params: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any], Dict[str, Any], Any, Dict[str, Any]]:
+    """Build the URL, path/query parameters, JSON body and headers for one request.
+
+    Values in custom_params win; anything else described by the endpoint schema is
+    generated with the given RequestDataGenerator.
+    """
+    # Convert base_url to string if it's not already
+    base_url_str = str(base_url)
+
+    url = f"{base_url_str.rstrip('/')}/{endpoint_path.lstrip('/')}"
+    headers = {}
+    path_params = {}
+    query_params = {}
+    json_data = None
+
+    # If we have schema and the data generator, create realistic test data
+    if endpoint_schema:
+        # Process parameters based on schema
+        for param in endpoint_schema.get('parameters', []):
+            param_name, param_location, param_schema = parameter_parts(param)
+
+            # Use custom value if provided
+            custom_value = None
+            if custom_params and param_name in custom_params:
+                custom_value = custom_params[param_name]
+
+            # Generate or use the parameter value
+            if custom_value is not None:
+                param_value = custom_value
+            else:
+                # Compiled once per schema and cached by the generator
+                param_value = generator.compile_schema(param_schema)()
+
+            # Assign to appropriate parameter location
+            if param_location == 'path':
+                path_params[param_name] = param_value
+            elif param_location == 'query':
+                query_params[param_name] = param_value
+            elif param_location == 'header':
+                headers[param_name] = str(param_value)
+
+        # Generate request body for methods that support it
+        if method.lower() in ['post', 'put', 'patch'] and 'requestBody' in endpoint_schema:
+            request_body = endpoint_schema.get('requestBody', {})
+
+            # Use custom request body if provided
+            if custom_params and '__request_body' in custom_params:
+                json_data = custom_params['__request_body']
+            else:
+                # Generate data based on schema
+                json_data = generator.generate_request_data(request_body)
+
+    return url, path_params, query_params, json_data, headers
+
+
+def encode_request(spec: Dict[str, Any], overrides: Optional[Dict[str, Any]], generator) -> PreparedRequest:
+    """Generate and encode one request for the endpoint described by spec"""
+    _, path_params, query_params, json_data, headers = prepare_request_parts(
+        generator,
+        base_url=spec["base_url"],
+        endpoint_path=spec["path"],
+        method=spec["method"],
+        endpoint_schema=spec.get("endpoint_schema"),
+        custom_params=overrides
+    )
+
+    path = spec["path"]
+    for name, value in path_params.items():
+        path = path.replace(f"{{{name}}}", quote(str(value), safe=""))
+    if query_params:
+        # Merged so a query string already in the endpoint path is kept
+        path = str(httpx.URL(path).copy_merge_params(query_params))
+
+    # Test-wide headers override generated header parameters
+    if spec.get("headers"):
+        headers.update(spec["headers"])
+
+    content = None
+    if json_data is not None:
+        content = json.dumps(json_data, separators=(",", ":")).encode()
+        headers["Content-Type"] = "application/json"
+
+    return PreparedRequest(spec["base_url"], path, headers, content)
+
+
+def build_requests(spec: Dict[str, Any], count: int) -> List[PreparedRequest]:
+    """Build the requests an endpoint's data strategy calls for.
+
+    RANDOM_EACH_TIME (the default) generates count distinct requests. CONSISTENT_RANDOM
+    and USER_DEFINED build one request per test_data_samples entry (sample values
+    override custom parameters), or a single request when there are no samples;
+    values not supplied are generated once. Module-level so it can run in a
+    process pool.
+    """
+    generator = _get_generator()
+    strategy = DataGenerationStrategy(spec.get("data_strategy") or DataGenerationStrategy.RANDOM_EACH_TIME)
+    custom_params = spec.get("custom_params") or {}
+    samples = spec.get("test_data_samples") or []
+
+    if strategy == DataGenerationStrategy.RANDOM_EACH_TIME:
+        overrides = [custom_params] * max(1, count)
+    elif samples:
+        overrides = [dict(custom_params, **sample) for sample in samples]
+    else:
+        overrides = [custom_params]
+
+    return [encode_request(spec, override, generator) for override in overrides]
+
+
+class RequestPool:
+    """Ring buffer of pre-encoded requests for one endpoint.
+
+    Requests are generated ahead of a concurrency level (off the event loop) so
+    the hot path only picks the next entry. Pools for RANDOM_EACH_TIME (the default)
+    are rebuilt on every prepare() so each request in a level carries fresh data,
+    and a ring that wraps during a long run is regenerated in the background; only
+    CONSISTENT_RANDOM and USER_DEFINED reuse requests, built once per test. Pools
+    are picklable so they can be shipped to worker processes.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.method = spec["method"]
+        self.strategy = DataGenerationStrategy(spec.get("data_strategy") or DataGenerationStrategy.RANDOM_EACH_TIME)
+        self.requests: List[PreparedRequest] = []
+        self._cursor = 0
+        self._executor: Optional[Executor] = None
+        self._refill: Optional[asyncio.Future] = None
+
+    def __getstate__(self):
+        # Executors and pending futures stay with the process that created them
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_refill"] = None
+        return state
+
+    @classmethod
+    def for_endpoint(cls,
+                     target_url: str,
+                     endpoint: Dict[str, Any],
+                     endpoint_schema: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None) -> "RequestPool":
+        """Create a pool from an advanced-test endpoint config dict"""
+        return cls({
+            "base_url": str(target_url),
+            "path": endpoint["path"],
+            "method": endpoint["method"],
+            "endpoint_schema": endpoint_schema,
+            "custom_params": endpoint.get("custom_parameters"),
+            "headers": headers,
+            "data_strategy": endpoint.get("data_strategy"),
+            "test_data_samples": endpoint.get("test_data_samples")
+        })
+
+    @property
+    def endpoint_key(self) -> str:
+        return f"{self.method} {self.spec['path']}"
+
+    @property
+    def refreshes(self) -> bool:
+        """Whether the pool is regenerated before every level"""
+        return self.strategy == DataGenerationStrategy.RANDOM_EACH_TIME
+
+    async def prepare(self, count: int, executor: Optional[Executor] = None):
+        """Make sure the ring is ready for the next count requests"""
+        if self.requests and not self.refreshes:
+            return
+        loop = asyncio.get_running_loop()
+        self._executor = executor
+        self._refill = None
+        self.requests = await loop.run_in_executor(executor, build_requests, self.spec, count)
+        self._cursor = 0
+
+    def _wrap(self):
+        """Swap in a regenerated ring once it is ready, or start building one.
+
+        Until the new ring arrives the current one keeps cycling, so the hot path
+        never waits on data generation.
+        """
+        if self._refill is None:
+            loop = asyncio.get_running_loop()
+            self._refill = loop.run_in_executor(self._executor, build_requests, self.spec, len(self.requests))
+        elif self._refill.done():
+            refill, self._refill = self._refill, None
+            if not refill.cancelled() and refill.exception() is None:
+                self.requests = refill.result()
+                self._cursor = 0
+
+    def next(self) -> PreparedRequest:
+        if self.refreshes and self._cursor >= len(self.requests):
+            self._wrap()
+        request = self.requests[self._cursor % len(self.requests)]
+        self._cursor += 1
+        return request
@@ -0,0 +1,75 @@
+from typing import Dict, Any, Optional
+
+# JSON schema types mapped to the Python types json.loads produces
+_TYPE_CHECKS = {
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'array': lambda v: isinstance(v, list),
+    'object': lambda v: isinstance(v, dict),
+    'null': lambda v: v is None,
+}
+
+
+def find_response_schema(response_schemas: Optional[Dict[str, Any]], status_code: int) -> Optional[Dict[str, Any]]:
+    """Pick the OpenAPI response schema documented for a status code"""
+    if not response_schemas:
+        return None
+    status = str(status_code)
+    for key in (status, f"{status[0]}XX", f"{status[0]}xx", "default"):
+        if key in response_schemas:
+            return response_schemas[key]
+    return None
+
+
+def validate_response(instance: Any, schema: Optional[Dict[str, Any]], path: str = "$") -> Optional[str]:
+    """Check a decoded response body against an OpenAPI schema.
+
+    Supports the subset of JSON schema that OpenAPI responses commonly use: type
+    (including nullable), enum, properties/required, items and allOf/anyOf/oneOf.
+    Unresolved $ref nodes are treated as valid. Returns a description of the first
+    mismatch, or None if the body conforms.
+    """
+    if not schema or not isinstance(schema, dict) or '$ref' in schema:
+        return None
+
+    if instance is None and schema.get('nullable'):
+        return None
+
+    for sub_schema in schema.get('allOf', []):
+        error = validate_response(instance, sub_schema, path)
+        if error:
+            return error
+
+    for combinator in ('anyOf', 'oneOf'):
+        options = schema.get(combinator)
+        if options and all(validate_response(instance, option, path) for option in options):
+            return f"{path}: does not match any schema in {combinator}"
+
+    expected = schema.get('type')
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_TYPE_CHECKS.get(t, lambda v: True)(instance) for t in types):
+            return f"{path}: expected {' or '.join(types)}, got {type(instance).__name__}"
+
+    if 'enum' in schema and instance not in schema['enum']:
+        return f"{path}: {instance!r} is not one of {schema['enum']}"
+
+    if isinstance(instance, dict):
+        for name in schema.get('required', []):
+            if name not in instance:
+                return f"{path}: missing required property '{name}'"
+        for name, prop_schema in schema.get('properties', {}).items():
+            if name in instance:
+                error = validate_response(instance[name], prop_schema, f"{path}.{name}")
+                if error:
+                    return error
+
+    if isinstance(instance, list) and 'items' in schema:
+        for index, item in enumerate(instance):
+            error = validate_response(item, schema['items'], f"{path}[{index}]")
+            if error:
+                return error
+
+    return None
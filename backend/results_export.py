@@ -0,0 +1,139 @@
+import csv
+import importlib.util
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+from api_models import EndpointResult, ExportFormat
+
+# Parquet export needs the optional 'pyarrow' package
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Rows serialised per chunk (and per Parquet row group)
+EXPORT_BATCH_ROWS = 65536
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet"
+}
+
+# A batch maps column names to equally long lists of values
+Batch = Dict[str, List[Any]]
+
+# Columns of a per-level results row; lists and histograms are left out
+RESULT_COLUMNS = [
+    name for name in EndpointResult.model_fields
+    if name not in ("histogram", "response_samples")
+]
+
+
+def sample_batches(samples, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[Batch]:
+    """Batches of one row per recorded request, read slice by slice from a SampleFile"""
+    records = samples.records
+    endpoints = samples.endpoints
+    for start in range(0, len(records), batch_rows):
+        chunk = records[start:start + batch_rows]
+        latency = chunk["latency"].tolist()
+        yield {
+            "timestamp_ns": chunk["timestamp_ns"].tolist(),
+            "endpoint": [
+                endpoints[endpoint_id] if endpoint_id < len(endpoints) else str(endpoint_id)
+                for endpoint_id in chunk["endpoint"].tolist()
+            ],
+            # NaN marks a request that raised before it got a response
+            "latency": [None if value != value else value for value in latency],
+            "status_code": chunk["status"].tolist()
+        }
+
+
+def result_batches(advanced_results: Dict[str, Any]) -> Iterator[Batch]:
+    """One row per endpoint and concurrency level of get_advanced_results output"""
+    batch: Batch = {name: [] for name in RESULT_COLUMNS}
+    for endpoint_results in advanced_results["results"].values():
+        for result in endpoint_results:
+            for name in RESULT_COLUMNS:
+                value = getattr(result, name)
+                if name == "status_codes":
+                    value = json.dumps(value)
+                elif name == "timestamp":
+                    value = value.isoformat()
+                batch[name].append(value)
+    if batch[RESULT_COLUMNS[0]]:
+        yield batch
+
+
+def _ndjson(batches: Iterable[Batch]) -> Iterator[bytes]:
+    for batch in batches:
+        names = list(batch)
+        lines = [json.dumps(dict(zip(names, row))) for row in zip(*batch.values())]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def _csv(batches: Iterable[Batch]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for batch in batches:
+        if not header_written:
+            writer.writerow(batch.keys())
+            header_written = True
+        writer.writerows(zip(*batch.values()))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every row group"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _parquet(batches: Iterable[Batch]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    for batch in batches:
+        table = pa.table(batch)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def export_stream(batches: Iterable[Batch], export_format: ExportFormat) -> Iterator[bytes]:
+    """Serialise batches one at a time, so only one batch is held in memory.
+
+    Batches are produced lazily, which makes the result suitable as the body of a
+    StreamingResponse; Parquet output without any rows is empty.
+    """
+    if export_format == ExportFormat.PARQUET:
+        if not PARQUET_AVAILABLE:
+            raise ValueError("Parquet export requires the 'pyarrow' package")
+        return _parquet(batches)
+    if export_format == ExportFormat.CSV:
+        return _csv(batches)
+    return _ndjson(batches)
@@ -0,0 +1,94 @@
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import sessionmaker
+
+from api_models import EndpointResult
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class ResultsStore:
+    """Database persistence for finished advanced test runs.
+
+    Each run is stored as a TestRun row (config, summary, timings and the session
+    configuration that launched it) with one TestRunResult row per endpoint and
+    concurrency level, including its latency histogram, so results read back
+    exactly as StressTester.get_advanced_results reported them. Tables are created
+    on first use. Calls are blocking; run them off the event loop.
+    """
+
+    def __init__(self, engine=None):
+        if engine is None:
+            from database.database import engine
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self._schema_ready = False
+
+    def _session(self):
+        if not self._schema_ready:
+            from database.models import Base
+            Base.metadata.create_all(bind=self.engine)
+            self._schema_ready = True
+        return self.session_factory()
+
+    def save(self, advanced_results: Dict[str, Any], completed_requests: int = 0, session_config_id: Optional[str] = None):
+        """Store the output of get_advanced_results for a finished test"""
+        from database.crud import create_test_run
+
+        rows = []
+        for endpoint_key, endpoint_results in advanced_results["results"].items():
+            for result in endpoint_results:
+                rows.append({
+                    "endpoint": endpoint_key,
+                    "concurrent_requests": result.concurrent_requests,
+                    "result": jsonable_encoder(result),
+                    "histogram": result.histogram.to_dict() if result.histogram is not None else None
+                })
+
+        db = self._session()
+        try:
+            create_test_run(
+                db,
+                test_id=advanced_results["test_id"],
+                config=jsonable_encoder(advanced_results["config"]),
+                summary=jsonable_encoder(advanced_results["summary"]),
+                results=rows,
+                completed_requests=completed_requests,
+                start_time=advanced_results.get("start_time"),
+                end_time=advanced_results.get("end_time"),
+                session_config_id=uuid.UUID(session_config_id) if session_config_id else None
+            )
+        finally:
+            db.close()
+
+    def load(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """Read a stored run back in the shape get_advanced_results returns"""
+        from database.crud import get_test_run
+
+        db = self._session()
+        try:
+            run = get_test_run(db, test_id)
+            if run is None:
+                return None
+            results: Dict[str, List[EndpointResult]] = {}
+            for row in run.results:
+                result = EndpointResult(**row.result)
+                if row.histogram is not None:
+                    result.histogram = LatencyHistogram.from_dict(row.histogram)
+                results.setdefault(row.endpoint, []).append(result)
+            return {
+                "test_id": run.id,
+                "config": run.config,
+                "results": results,
+                "summary": run.summary,
+                "start_time": run.start_time,
+                "end_time": run.end_time,
+                "completed_requests": run.completed_requests,
+                "session_config_id": str(run.session_config_id) if run.session_config_id else None
+            }
+        finally:
+            db.close()
@@ -0,0 +1,126 @@
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from api_models import EndpointResult
+from latency_histogram import LatencyHistogram
+from metrics_protocol import TOTAL_SERIES
+
+# Points kept in the summary's throughput timeline; longer runs are averaged down
+MAX_THROUGHPUT_POINTS = 60
+
+
+class Distribution:
+    """Run-wide latency distribution and counters merged from per-level results.
+
+    Latencies come from merging each level's histogram, so percentiles and the
+    minimum and maximum are those of individual requests, and memory depends only
+    on the number of histogram buckets. Results without a histogram (older stored
+    runs) still count towards the mean, minimum and maximum.
+    """
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.successes = 0
+        self.failures = 0
+        self.status_codes: Dict[str, int] = {}
+        self._other_count = 0
+        self._other_total = 0.0
+        self._other_min: Optional[float] = None
+        self._other_max: Optional[float] = None
+
+    def add(self, result: EndpointResult):
+        self.successes += result.success_count
+        self.failures += result.failure_count
+        for status_code, count in result.status_codes.items():
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + count
+        if result.histogram is not None:
+            self.histogram.merge(result.histogram)
+        elif result.success_count:
+            self._other_count += result.success_count
+            self._other_total += result.avg_response_time * result.success_count
+            self._other_min = min(result.min_response_time, self._other_min if self._other_min is not None else math.inf)
+            self._other_max = max(result.max_response_time, self._other_max or 0.0)
+
+    def summary(self) -> Dict[str, Any]:
+        histogram = self.histogram
+        total = self.successes + self.failures
+        latencies = histogram.count + self._other_count
+        extremes = [value for value in (histogram.min_value, self._other_min) if value is not None]
+        peaks = [value for value in (histogram.max_value, self._other_max) if value is not None]
+        percentiles = histogram.percentiles()
+        return {
+            "total_requests": total,
+            "successful_requests": self.successes,
+            "failed_requests": self.failures,
+            "success_rate": (self.successes / total * 100) if total > 0 else 0,
+            "error_rate": (self.failures / total * 100) if total > 0 else 0,
+            "avg_response_time": (histogram.total + self._other_total) / latencies if latencies else 0,
+            "min_response_time": min(extremes) if extremes else 0,
+            "max_response_time": max(peaks) if peaks else 0,
+            "p50_response_time": percentiles["p50"],
+            "p90_response_time": percentiles["p90"],
+            "p99_response_time": percentiles["p99"],
+            "p999_response_time": percentiles["p999"],
+            "status_codes": dict(sorted(self.status_codes.items()))
+        }
+
+
+def _throughput(total_requests: int,
+                start_time: Optional[datetime],
+                end_time: Optional[datetime],
+                history=None,
+                window: float = 1.0) -> Dict[str, Any]:
+    """Average and peak requests per second, with a timeline from the test's MetricsRing"""
+    if start_time is not None and end_time is None:
+        # Still running
+        end_time = datetime.now()
+    duration = (end_time - start_time).total_seconds() if start_time and end_time else 0.0
+    throughput: Dict[str, Any] = {
+        "duration": duration,
+        "avg_rps": total_requests / duration if duration > 0 else 0.0
+    }
+    if history is None:
+        return throughput
+
+    rps = [value for value in history.since()["series"].get(TOTAL_SERIES, {}).get("rps", []) if value is not None]
+    if not rps:
+        return throughput
+    group = math.ceil(len(rps) / MAX_THROUGHPUT_POINTS)
+    timeline: List[float] = [
+        round(sum(rps[start:start + group]) / len(rps[start:start + group]), 2)
+        for start in range(0, len(rps), group)
+    ]
+    throughput.update({
+        "peak_rps": max(rps),
+        "interval": group * window,
+        "rps": timeline
+    })
+    return throughput
+
+
+def summarize_results(results: Dict[str, List[EndpointResult]],
+                      start_time: Optional[datetime] = None,
+                      end_time: Optional[datetime] = None,
+                      history=None,
+                      window: float = 1.0) -> Dict[str, Any]:
+    """Run-wide, per-endpoint and (for load-profile runs) per-phase summary of a test's results"""
+    overall = Distribution()
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    phases: Dict[str, Distribution] = {}
+    for endpoint_key, endpoint_results in results.items():
+        distribution = Distribution()
+        for result in endpoint_results:
+            distribution.add(result)
+            overall.add(result)
+            if result.phase is not None:
+                phases.setdefault(result.phase, Distribution()).add(result)
+        endpoints[endpoint_key] = distribution.summary()
+
+    summary = overall.summary()
+    summary["endpoints"] = endpoints
+    if phases:
+        # Steady-state numbers without warm-up and ramp-down noise
+        summary["phases"] = {phase: distribution.summary() for phase, distribution in phases.items()}
+    summary["throughput"] = _throughput(summary["total_requests"], start_time, end_time, history, window)
+    return summary
@@ -0,0 +1,218 @@
+import json
+import logging
+import math
+import queue
+import re
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Where raw sample files are written, one per test
+SAMPLES_DIR = Path(__file__).parent / "data" / "samples"
+
+# One record per request: start time (ns since the epoch), latency (s), status code, endpoint id
+_RECORD = struct.Struct("<qfHH")
+RECORD_SIZE = _RECORD.size
+# Records packed before a chunk is handed to the writer thread
+DEFAULT_CHUNK_RECORDS = 4096
+# Chunks waiting for the writer; further chunks are dropped (and counted) until it catches up
+MAX_PENDING_CHUNKS = 64
+
+
+def sample_paths(test_id: str, directory: Optional[Path] = None):
+    """Return the (records, index) file paths for a test"""
+    directory = Path(directory) if directory is not None else SAMPLES_DIR
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", test_id)
+    return directory / f"{name}.samples", directory / f"{name}.json"
+
+
+class SampleRecorder:
+    """Appends one fixed-width record per request to a test's sample file.
+
+    Records are packed into an in-memory chunk and whole chunks are written by a
+    background thread, so the event loop never waits on disk: if the writer falls
+    MAX_PENDING_CHUNKS behind, new chunks are dropped and counted in ``dropped``.
+    Endpoint keys are mapped to small ids, saved in a JSON index next to the
+    records when the recorder is closed. Read the file back with SampleFile.
+    """
+
+    def __init__(self, test_id: str, directory: Optional[Path] = None, chunk_records: int = DEFAULT_CHUNK_RECORDS):
+        self.path, self.index_path = sample_paths(test_id, directory)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.test_id = test_id
+        self.endpoints: List[str] = []
+        self.count = 0
+        self.dropped = 0
+        self._endpoint_ids: Dict[str, int] = {}
+        self._chunk = bytearray(chunk_records * RECORD_SIZE)
+        self._offset = 0
+        self._pending: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+        self._file = open(self.path, "wb")
+        self._writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self._writer.start()
+
+    def _write_chunks(self):
+        while True:
+            chunk = self._pending.get()
+            if chunk is None:
+                break
+            try:
+                self._file.write(chunk)
+            except OSError as e:
+                logger.error(f"Could not write samples to {self.path}: {str(e)}")
+        self._file.close()
+
+    def endpoint_id(self, endpoint_key: str) -> int:
+        endpoint_id = self._endpoint_ids.get(endpoint_key)
+        if endpoint_id is None:
+            endpoint_id = self._endpoint_ids[endpoint_key] = len(self.endpoints)
+            self.endpoints.append(endpoint_key)
+        return endpoint_id
+
+    def record(self, endpoint_key: str, result: Any):
+        """Append one execute_request result (or the exception it raised)"""
+        now_ns = time.time_ns()
+        if isinstance(result, Exception):
+            latency, status_code, total_time = math.nan, 0, 0.0
+        else:
+            response_time = result.get("response_time")
+            latency = math.nan if response_time is None else response_time
+            status_code = result.get("status_code") or 0
+            total_time = result.get("total_time") or response_time or 0.0
+        _RECORD.pack_into(self._chunk, self._offset, now_ns - int(total_time * 1e9), latency,
+                          status_code, self.endpoint_id(endpoint_key))
+        self._offset += RECORD_SIZE
+        self.count += 1
+        if self._offset == len(self._chunk):
+            self._hand_off()
+
+    def _hand_off(self, block: bool = False):
+        if not self._offset:
+            return
+        chunk = bytes(self._chunk[:self._offset])
+        self._offset = 0
+        if block:
+            self._pending.put(chunk)
+            return
+        try:
+            self._pending.put_nowait(chunk)
+        except queue.Full:
+            if not self.dropped:
+                logger.warning(f"Sample writer for test {self.test_id} is falling behind; dropping samples")
+            self.dropped += len(chunk) // RECORD_SIZE
+
+    def close(self):
+        """Write out buffered records and the endpoint index, then stop the writer.
+
+        Blocks until the writer has finished; call it off the event loop.
+        """
+        self._hand_off(block=True)
+        self._pending.put(None)
+        self._writer.join()
+        with open(self.index_path, "w") as index:
+            json.dump({"test_id": self.test_id, "endpoints": self.endpoints,
+                       "count": self.count - self.dropped, "dropped": self.dropped}, index)
+
+
+class SampleFile:
+    """Memory-mapped, read-only view of a test's sample file.
+
+    Records are exposed as a NumPy structured array backed by the file, so queries
+    are vectorised over the mapped pages instead of building Python objects.
+    """
+
+    def __init__(self, test_id: str, directory: Optional[Path] = None):
+        import numpy as np
+
+        self._np = np
+        self.path, self.index_path = sample_paths(test_id, directory)
+        if not self.path.exists():
+            raise FileNotFoundError(f"No samples recorded for test {test_id}")
+        self.endpoints: List[str] = []
+        if self.index_path.exists():
+            with open(self.index_path) as index:
+                self.endpoints = json.load(index)["endpoints"]
+        dtype = np.dtype([("timestamp_ns", "<i8"), ("latency", "<f4"), ("status", "<u2"), ("endpoint", "<u2")])
+        # A record may still be half-written while a test runs; only map whole ones
+        count = self.path.stat().st_size // RECORD_SIZE
+        self.records = np.memmap(self.path, dtype=dtype, mode="r", shape=(count,)) if count else np.empty(0, dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _mask(self, endpoint: Optional[str] = None, start_ns: Optional[int] = None, end_ns: Optional[int] = None):
+        np = self._np
+        records = self.records
+        mask = np.ones(len(records), dtype=bool)
+        if endpoint is not None:
+            if endpoint not in self.endpoints:
+                return np.zeros(len(records), dtype=bool)
+            mask &= records["endpoint"] == self.endpoints.index(endpoint)
+        if start_ns is not None:
+            mask &= records["timestamp_ns"] >= start_ns
+        if end_ns is not None:
+            mask &= records["timestamp_ns"] < end_ns
+        return mask
+
+    def percentiles(self,
+                    percents: Sequence[float] = (50, 90, 99, 99.9),
+                    endpoint: Optional[str] = None,
+                    start_ns: Optional[int] = None,
+                    end_ns: Optional[int] = None) -> Dict[str, Any]:
+        """Exact latency percentiles (seconds) of successful requests matching the filters"""
+        np = self._np
+        selected = self.records[self._mask(endpoint, start_ns, end_ns)]
+        ok = selected["latency"][(selected["status"] > 0) & (selected["status"] < 400)]
+        ok = ok[~np.isnan(ok)]
+        values = np.percentile(ok, list(percents)) if len(ok) else [0.0] * len(percents)
+        return {
+            "count": int(len(selected)),
+            "errors": int(len(selected) - len(ok)),
+            "percentiles": {f"p{percent:g}": float(value) for percent, value in zip(percents, values)}
+        }
+
+    def time_windows(self,
+                     width: float = 1.0,
+                     endpoint: Optional[str] = None,
+                     start_ns: Optional[int] = None,
+                     end_ns: Optional[int] = None) -> Dict[str, List[Any]]:
+        """Requests, errors, mean and p50/p99 latency per window of width seconds"""
+        np = self._np
+        selected = self.records[self._mask(endpoint, start_ns, end_ns)]
+        if not len(selected):
+            return {"start_ns": [], "requests": [], "errors": [], "mean": [], "p50": [], "p99": []}
+
+        width_ns = max(1, int(width * 1e9))
+        origin = int(selected["timestamp_ns"].min()) if start_ns is None else start_ns
+        window = (selected["timestamp_ns"] - origin) // width_ns
+        windows = int(window.max()) + 1
+        status = selected["status"]
+        latency = selected["latency"].astype(np.float64)
+        ok = (status > 0) & (status < 400) & ~np.isnan(latency)
+
+        requests = np.bincount(window, minlength=windows)
+        ok_counts = np.bincount(window[ok], minlength=windows)
+        mean = np.bincount(window[ok], weights=latency[ok], minlength=windows) / np.maximum(ok_counts, 1)
+
+        # Sort successful latencies by (window, latency) and pick ranks inside each window
+        order = np.lexsort((latency[ok], window[ok]))
+        sorted_latency = latency[ok][order]
+        first = np.concatenate(([0], np.cumsum(ok_counts)[:-1]))
+
+        def rank(percent: float):
+            index = first + np.maximum(np.ceil(ok_counts * percent / 100).astype(np.int64) - 1, 0)
+            values = sorted_latency[np.minimum(index, max(len(sorted_latency) - 1, 0))] if len(sorted_latency) else np.zeros(windows)
+            return np.where(ok_counts > 0, values, 0.0)
+
+        return {
+            "start_ns": (origin + np.arange(windows, dtype=np.int64) * width_ns).tolist(),
+            "requests": requests.tolist(),
+            "errors": (requests - ok_counts).tolist(),
+            "mean": mean.tolist(),
+            "p50": rank(50).tolist(),
+            "p99": rank(99).tolist()
+        }
@@ -0,0 +1,106 @@
+from typing import Any, Dict, Optional
+
+# Top-level sections of Swagger 2 documents that hold reusable definitions
+_SWAGGER_SECTIONS = ('definitions', 'parameters', 'responses')
+
+
+def _escape(name: str) -> str:
+    """Encode a key as a JSON pointer token"""
+    return name.replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+class SchemaResolver:
+    """Resolves the internal $ref nodes of one spec, shared by all of its operations.
+
+    The reusable sections (``components`` in OpenAPI 3, ``definitions``, ``parameters``
+    and ``responses`` in Swagger 2) are indexed by JSON pointer when the resolver is
+    created, and each reference is resolved once and then served from a memo, so an
+    operation reusing a schema gets the same object rather than a fresh copy. Subtrees
+    without references are returned as they are.
+
+    A reference met again while it is still being resolved (a recursive schema) is
+    left in place as its ``{"$ref": ...}`` node, which resolve_ref() can expand later
+    on demand. References outside the document resolve to an empty schema.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self._targets: Dict[str, Any] = {}
+        self._resolved: Dict[str, Any] = {}
+        self._resolving = set()
+
+        sections = [(f"#/components/{_escape(kind)}", entries)
+                    for kind, entries in (spec.get('components') or {}).items()]
+        sections += [(f"#/{section}", spec.get(section)) for section in _SWAGGER_SECTIONS]
+        for prefix, entries in sections:
+            if isinstance(entries, dict):
+                for name, node in entries.items():
+                    self._targets[f"{prefix}/{_escape(name)}"] = node
+
+    def target(self, ref: str) -> Optional[Any]:
+        """The unresolved node a reference points to, or None if it is not in this document"""
+        if ref in self._targets:
+            return self._targets[ref]
+        if not ref.startswith('#/'):
+            return None
+
+        # Pointers outside the indexed sections are walked once and remembered
+        current = self.spec
+        for token in ref[2:].split('/'):
+            token = _unescape(token)
+            if isinstance(current, dict) and token in current:
+                current = current[token]
+            elif isinstance(current, list) and token.isdigit() and int(token) < len(current):
+                current = current[int(token)]
+            else:
+                return None
+        self._targets[ref] = current
+        return current
+
+    def resolve_ref(self, ref: str) -> Any:
+        """The fully resolved node for a reference"""
+        if ref in self._resolved:
+            return self._resolved[ref]
+        if ref in self._resolving:
+            # Recursive schema: keep the reference and stop descending
+            return {'$ref': ref}
+        target = self.target(ref)
+        if target is None:
+            return {}
+
+        self._resolving.add(ref)
+        try:
+            resolved = self.resolve(target)
+        finally:
+            self._resolving.discard(ref)
+        self._resolved[ref] = resolved
+        return resolved
+
+    def resolve(self, node: Any) -> Any:
+        """The node with every reference inside it resolved; only changed containers are copied"""
+        if isinstance(node, dict):
+            ref = node.get('$ref')
+            if isinstance(ref, str):
+                return self.resolve_ref(ref)
+            resolved = None
+            for key, value in node.items():
+                new_value = self.resolve(value)
+                if new_value is not value:
+                    if resolved is None:
+                        resolved = dict(node)
+                    resolved[key] = new_value
+            return resolved if resolved is not None else node
+        if isinstance(node, list):
+            resolved = None
+            for index, value in enumerate(node):
+                new_value = self.resolve(value)
+                if new_value is not value:
+                    if resolved is None:
+                        resolved = list(node)
+                    resolved[index] = new_value
+            return resolved if resolved is not None else node
+        return node
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from api_models import EndpointSchema
+from spec_diff import SpecDiff, operation_hashes, operation_key
+from spec_discovery import normalise_target
+
+# Seconds a parsed spec is served without asking the target again
+DEFAULT_SPEC_TTL = 300.0
+
+# Targets whose parsed spec is kept
+MAX_CACHED_SPECS = 128
+
+
+def content_hash(schema: Dict[str, Any]) -> str:
+    """Stable digest of a spec document, independent of key order"""
+    encoded = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def build_endpoint_schemas(endpoints: List[EndpointSchema],
+                           reuse: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """Lookup of "METHOD /path" to the parameters, body and responses used to generate and check requests
+
+    Entries present in ``reuse`` (the lookup of an earlier version) are taken from it.
+    """
+    endpoint_schemas = {}
+    for endpoint_info in endpoints:
+        endpoint_key = operation_key(endpoint_info.method, endpoint_info.path)
+        if reuse and endpoint_key in reuse:
+            endpoint_schemas[endpoint_key] = reuse[endpoint_key]
+            continue
+        endpoint_schemas[endpoint_key] = {
+            # Raw OpenAPI keys ('in'/'schema'), as prepare_request_parts reads them
+            "parameters": [
+                {
+                    "name": param.name,
+                    "in": param.location,
+                    "required": param.required,
+                    "schema": param.param_schema,
+                    "description": param.description
+                }
+                for param in endpoint_info.parameters
+            ],
+            "requestBody": endpoint_info.request_body,
+            "responses": {
+                status: response.response_schema
+                for status, response in endpoint_info.responses.items()
+            }
+        }
+    return endpoint_schemas
+
+
+class ParsedSpec:
+    """A target's spec after parsing: its endpoints and the endpoint_schemas lookup"""
+
+    def __init__(self,
+                 target_url: str,
+                 content_hash: str,
+                 endpoints: List[EndpointSchema],
+                 operation_hashes: Dict[str, str],
+                 diff: Optional[SpecDiff] = None,
+                 reuse: Optional[Dict[str, Dict[str, Any]]] = None,
+                 pinned: bool = False):
+        self.target_url = target_url
+        self.content_hash = content_hash
+        self.endpoints = endpoints
+        self.endpoint_schemas = build_endpoint_schemas(endpoints, reuse)
+        self.operation_hashes = operation_hashes
+        # Changes from the version stored before this one; None for a target's first version
+        self.diff = diff
+        # Specs ingested from a file have no URL to refresh from, so they never expire
+        self.pinned = pinned
+        self.stored_at = time.time()
+
+    def expired(self, ttl: float, now: Optional[float] = None) -> bool:
+        if self.pinned:
+            return False
+        return (now if now is not None else time.time()) - self.stored_at > ttl
+
+
+class SpecCache:
+    """Process-wide cache of parsed specs keyed by target URL and content hash.
+
+    Storing a document whose hash matches the target's current entry only renews it,
+    and targets serving an identical document share one parse. A changed document is
+    compared with the target's previous version operation by operation (see
+    spec_diff.operation_hashes): only added and changed operations are parsed, the
+    rest are carried over, and the resulting SpecDiff is kept on the new entry.
+    Entries older than ``ttl`` are not returned by get() but still serve as the
+    previous version; the least recently stored target is dropped past ``max_targets``.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_SPEC_TTL, max_targets: int = MAX_CACHED_SPECS):
+        self.ttl = ttl
+        self.max_targets = max_targets
+        self._targets: "OrderedDict[str, ParsedSpec]" = OrderedDict()
+
+    def get(self, target_url: str) -> Optional[ParsedSpec]:
+        """The target's parsed spec if it was stored within the TTL"""
+        entry = self._targets.get(normalise_target(target_url)[0])
+        if entry is None or entry.expired(self.ttl):
+            return None
+        return entry
+
+    def store(self,
+              target_url: str,
+              schema: Dict[str, Any],
+              parse: Callable[..., List[EndpointSchema]],
+              pinned: bool = False) -> ParsedSpec:
+        """Cache a fetched or ingested document, parsing only what no cached version already holds
+
+        ``parse(schema)`` parses every operation and ``parse(schema, keys)`` only the
+        operations under those "METHOD /path" keys. Pinned entries never expire.
+        """
+        key = normalise_target(target_url)[0]
+        digest = content_hash(schema)
+        current = self._targets.get(key)
+        if current is not None and current.content_hash == digest:
+            current.stored_at = time.time()
+            current.pinned = pinned
+            current.diff = SpecDiff([], [], [])
+            self._targets.move_to_end(key)
+            return current
+
+        hashes = operation_hashes(schema)
+        diff = SpecDiff.compare(current.operation_hashes, hashes) if current is not None else None
+        shared = next((entry for entry in self._targets.values() if entry.content_hash == digest), None)
+        if shared is not None:
+            entry = ParsedSpec(key, digest, shared.endpoints, hashes, diff, shared.endpoint_schemas, pinned)
+        elif current is not None:
+            reparse = set(diff.added + diff.changed)
+            kept = [endpoint for endpoint in current.endpoints
+                    if operation_key(endpoint.method, endpoint.path) in hashes
+                    and operation_key(endpoint.method, endpoint.path) not in reparse]
+            endpoints = kept + (parse(schema, reparse) if reparse else [])
+            endpoints.sort(key=lambda e: (e.path, e.method))
+            unchanged = {endpoint_key: lookup for endpoint_key, lookup in current.endpoint_schemas.items()
+                         if endpoint_key not in reparse}
+            entry = ParsedSpec(key, digest, endpoints, hashes, diff, unchanged, pinned)
+        else:
+            entry = ParsedSpec(key, digest, parse(schema), hashes, pinned=pinned)
+        self._targets[key] = entry
+        self._targets.move_to_end(key)
+        while len(self._targets) > self.max_targets:
+            self._targets.popitem(last=False)
+        return entry
+
+    def invalidate(self, target_url: Optional[str] = None):
+        """Forget one target's parsed spec, or every target's"""
+        if target_url is None:
+            self._targets.clear()
+        else:
+            self._targets.pop(normalise_target(target_url)[0], None)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from schema_resolver import SchemaResolver
+
+# Keys of a path item that describe an operation
+HTTP_METHODS = ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']
+
+
+def operation_key(method: str, path: str) -> str:
+    """The "METHOD /path" key operations and endpoint_schemas are stored under"""
+    return f"{method.upper()} {path}"
+
+
+def _digest(node: Any) -> str:
+    encoded = json.dumps(node, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _refs(node: Any, found: Optional[Set[str]] = None) -> Set[str]:
+    """Every $ref string inside a node"""
+    found = set() if found is None else found
+    if isinstance(node, dict):
+        ref = node.get('$ref')
+        if isinstance(ref, str):
+            found.add(ref)
+        for value in node.values():
+            _refs(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _refs(value, found)
+    return found
+
+
+def operation_hashes(spec: Dict[str, Any], resolver: Optional[SchemaResolver] = None) -> Dict[str, str]:
+    """Hash each operation together with every definition it references, directly or not.
+
+    Editing a shared component therefore changes the hash of exactly the operations
+    that use it. Definitions are hashed once however many operations reach them.
+    """
+    resolver = resolver or SchemaResolver(spec)
+    references: Dict[str, Set[str]] = {}
+    digests: Dict[str, str] = {}
+
+    def reachable(refs: Set[str]) -> Set[str]:
+        seen = set()
+        pending = list(refs)
+        while pending:
+            ref = pending.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            if ref not in references:
+                target = resolver.target(ref)
+                references[ref] = _refs(target)
+                digests[ref] = _digest(target)
+            pending.extend(references[ref] - seen)
+        return seen
+
+    hashes = {}
+    for path, path_item in spec.get('paths', {}).items():
+        if not isinstance(path_item, dict):
+            continue
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS or not isinstance(operation, dict):
+                continue
+            digest = hashlib.sha256(_digest(operation).encode("utf-8"))
+            for ref in sorted(reachable(_refs(operation))):
+                digest.update(f"{ref}={digests[ref]}".encode("utf-8"))
+            hashes[operation_key(method, path)] = digest.hexdigest()
+    return hashes
+
+
+def path_matches(template: str, path: str) -> bool:
+    """Whether a concrete request path (e.g. /users/42) fits an OpenAPI path template (/users/{id})"""
+    pattern = re.sub(r"\\{[^/]+?\\}", "[^/]+", re.escape(template))
+    return re.fullmatch(pattern, path.rstrip('/') or '/') is not None
+
+
+class SpecDiff:
+    """Operations added, removed or changed between two versions of a spec"""
+
+    def __init__(self, added: List[str], removed: List[str], changed: List[str]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    @classmethod
+    def compare(cls, previous: Dict[str, str], current: Dict[str, str]) -> "SpecDiff":
+        return cls(
+            added=sorted(key for key in current if key not in previous),
+            removed=sorted(key for key in previous if key not in current),
+            changed=sorted(key for key in current if key in previous and previous[key] != current[key])
+        )
+
+    def affects(self, method: str, path: str) -> bool:
+        """Whether a request to method and concrete path hits a removed or changed operation"""
+        method = method.upper()
+        for key in self.removed + self.changed:
+            key_method, template = key.split(" ", 1)
+            if key_method == method and path_matches(template, path):
+                return True
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
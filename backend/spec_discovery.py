@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Conventional locations of OpenAPI/Swagger documents
+OPENAPI_PATHS = [
+    '/openapi.json',
+    '/api/openapi.json',
+    '/docs/openapi.json',
+    '/swagger.json',
+    '/swagger/v1/swagger.json',
+    '/api-docs/swagger.json',
+    '/api/v1/swagger.json',
+    '/api/swagger.json',
+]
+
+# Non-standard locations, possibly serving YAML and possibly without a version key
+SPECIAL_CASE_PATHS = [
+    '/openapi',
+    '/api/openapi',
+    '/openapi.yaml',
+]
+
+# Routes checked when no spec is found, to tell an undocumented API from a dead one
+LIVENESS_PATHS = ['/', '/docs', '/health', '/status', '/api']
+
+DEFAULT_PROBE_TIMEOUT = 10.0
+
+# Targets whose resolved spec URL is remembered
+MAX_CACHED_TARGETS = 256
+
+
+def normalise_target(url: str) -> Tuple[str, bool]:
+    """Strip trailing slashes and a /docs suffix; returns (base_url, whether /docs was given)"""
+    base_url = str(url).rstrip('/')
+    if base_url.endswith('/docs'):
+        return base_url[:-5], True
+    return base_url, False
+
+
+def _parse_spec(response: httpx.Response, strict: bool) -> Optional[Dict[str, Any]]:
+    """The OpenAPI document in a response, or None if it does not hold one.
+
+    Strict checks (conventional paths) require a version key as well as paths and
+    only accept JSON; special-case paths may serve YAML.
+    """
+    try:
+        schema = response.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        if strict:
+            return None
+        try:
+            import yaml
+            schema = yaml.safe_load(response.text)
+        except Exception:
+            return None
+    if not isinstance(schema, dict) or 'paths' not in schema:
+        return None
+    if strict and 'swagger' not in schema and 'openapi' not in schema:
+        return None
+    return schema
+
+
+class Discovery:
+    """Outcome of looking for a target's OpenAPI document"""
+
+    def __init__(self,
+                 base_url: str,
+                 schema: Optional[Dict[str, Any]] = None,
+                 spec_url: Optional[str] = None,
+                 cached: bool = False,
+                 connect_error: Optional[str] = None,
+                 docs_html: Optional[str] = None,
+                 accessible: Optional[List[str]] = None):
+        self.base_url = base_url
+        self.schema = schema
+        self.spec_url = spec_url
+        # True when a cached spec URL answered (304 or a fresh 200) without probing
+        self.cached = cached
+        # Set when the target could not be reached at all
+        self.connect_error = connect_error
+        # The /docs page, when it was served but named no usable spec
+        self.docs_html = docs_html
+        self.accessible = accessible or []
+
+
+class _CachedSpec:
+    def __init__(self, spec_url: str, schema: Dict[str, Any], response: httpx.Response):
+        self.spec_url = spec_url
+        self.schema = schema
+        self.etag = response.headers.get('etag')
+        self.last_modified = response.headers.get('last-modified')
+        self.checked_at = time.time()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class SpecDiscovery:
+    """Finds a target's OpenAPI document and remembers where it lives.
+
+    Every candidate location (the spec linked from the /docs page, the conventional
+    paths and the special cases) is requested at once and the first valid document
+    wins; the remaining probes are cancelled. The winning URL is cached per target,
+    and later lookups send one conditional GET to it (If-None-Match/If-Modified-Since),
+    reusing the cached document on 304. Only when that URL stops serving a spec does
+    discovery probe again.
+    """
+
+    def __init__(self,
+                 find_spec_link: Callable[[str], Optional[str]],
+                 timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 max_targets: int = MAX_CACHED_TARGETS,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        # Extracts the spec URL from a Swagger UI page
+        self.find_spec_link = find_spec_link
+        self.timeout = timeout
+        self.max_targets = max_targets
+        self.transport = transport
+        self._cache: "OrderedDict[str, _CachedSpec]" = OrderedDict()
+
+    def cached_spec_url(self, url: str) -> Optional[str]:
+        entry = self._cache.get(normalise_target(url)[0])
+        return entry.spec_url if entry else None
+
+    def invalidate(self, url: Optional[str] = None):
+        """Forget the spec URL of one target, or of every target"""
+        if url is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(normalise_target(url)[0], None)
+
+    async def discover(self, url: str) -> Discovery:
+        base_url, _ = normalise_target(url)
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True, transport=self.transport) as client:
+            cached = self._cache.get(base_url)
+            if cached is not None:
+                schema = await self._revalidate(client, base_url, cached)
+                if schema is not None:
+                    return Discovery(base_url, schema, cached.spec_url, cached=True)
+            return await self._probe_all(client, base_url)
+
+    async def _revalidate(self, client: httpx.AsyncClient, base_url: str, cached: _CachedSpec) -> Optional[Dict[str, Any]]:
+        """The cached target's current spec via a conditional GET, or None if it must be rediscovered"""
+        try:
+            response = await client.get(cached.spec_url, headers=cached.conditional_headers())
+        except httpx.HTTPError as e:
+            logger.warning(f"Cached spec URL {cached.spec_url} failed: {e}")
+            self._cache.pop(base_url, None)
+            return None
+        if response.status_code == 304:
+            cached.checked_at = time.time()
+            self._cache.move_to_end(base_url)
+            return cached.schema
+        schema = _parse_spec(response, strict=False) if response.status_code == 200 else None
+        if schema is None:
+            logger.info(f"Cached spec URL {cached.spec_url} no longer serves a spec; rediscovering")
+            self._cache.pop(base_url, None)
+            return None
+        self._remember(base_url, cached.spec_url, schema, response)
+        return schema
+
+    def _remember(self, base_url: str, spec_url: str, schema: Dict[str, Any], response: httpx.Response):
+        self._cache[base_url] = _CachedSpec(spec_url, schema, response)
+        self._cache.move_to_end(base_url)
+        while len(self._cache) > self.max_targets:
+            self._cache.popitem(last=False)
+
+    async def _probe_all(self, client: httpx.AsyncClient, base_url: str) -> Discovery:
+        docs_page: List[httpx.Response] = []
+
+        async def probe(spec_url: str, strict: bool):
+            try:
+                response = await client.get(spec_url)
+            except httpx.HTTPError as e:
+                logger.debug(f"Probe of {spec_url} failed: {e}")
+                return None
+            schema = _parse_spec(response, strict) if response.status_code == 200 else None
+            return (spec_url, schema, response) if schema is not None else None
+
+        async def probe_docs():
+            response = await client.get(f"{base_url}/docs")
+            docs_page.append(response)
+            if response.status_code != 200:
+                return None
+            spec_url = self.find_spec_link(response.text)
+            if not spec_url:
+                return None
+            if spec_url.startswith('/'):
+                spec_url = f"{base_url}{spec_url}"
+            return await probe(spec_url, strict=True)
+
+        base_check = asyncio.ensure_future(client.get(base_url))
+        probes = [probe_docs()]
+        probes += [probe(f"{base_url}{path}", strict=True) for path in OPENAPI_PATHS]
+        probes += [probe(f"{base_url}{path}", strict=False) for path in SPECIAL_CASE_PATHS]
+        found = await self._first_valid(probes)
+        if found is not None:
+            base_check.cancel()
+            spec_url, schema, response = found
+            logger.info(f"Found OpenAPI schema at {spec_url}")
+            self._remember(base_url, spec_url, schema, response)
+            return Discovery(base_url, schema, spec_url)
+
+        try:
+            base_response = await base_check
+            if base_response.status_code >= 400:
+                logger.warning(f"Base URL returned status code {base_response.status_code}")
+        except Exception as e:
+            logger.error(f"Failed to connect to base URL: {e}")
+            return Discovery(base_url, connect_error=str(e))
+
+        docs_html = docs_page[0].text if docs_page and docs_page[0].status_code == 200 else None
+        return Discovery(base_url, docs_html=docs_html, accessible=await self._accessible(client, base_url))
+
+    @staticmethod
+    async def _first_valid(probes) -> Optional[Tuple[str, Dict[str, Any], httpx.Response]]:
+        """Run probes together and return the valid result of the earliest probe in the list.
+
+        A result is returned as soon as every probe ranked before it has come back
+        empty; the remaining probes are then cancelled.
+        """
+        tasks = [asyncio.ensure_future(probe) for probe in probes]
+
+        def outcome(task: asyncio.Future):
+            if task.exception() is not None:
+                logger.debug(f"Discovery probe failed: {task.exception()}")
+                return None
+            return task.result()
+
+        try:
+            pending = set(tasks)
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if not task.done():
+                        break
+                    found = outcome(task)
+                    if found is not None:
+                        return found
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _accessible(client: httpx.AsyncClient, base_url: str) -> List[str]:
+        async def check(route: str) -> bool:
+            try:
+                return (await client.get(f"{base_url}{route}")).status_code < 400
+            except httpx.HTTPError:
+                return False
+
+        answered = await asyncio.gather(*(check(route) for route in LIVENESS_PATHS))
+        return [route for route, ok in zip(LIVENESS_PATHS, answered) if ok]
@@ -0,0 +1,68 @@
+import io
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+import ijson
+import yaml
+
+# Directory local spec paths are resolved against; paths outside it are refused
+SPECS_DIR = Path(os.getenv("STRESS_API_SPECS_DIR", Path(__file__).parent / "data" / "specs"))
+
+YAML_SUFFIXES = ('.yaml', '.yml')
+
+
+def _is_yaml(stream: BinaryIO, name: Optional[str]) -> bool:
+    """Decide by file extension, or else by whether the document opens with a JSON object"""
+    if name:
+        suffix = Path(name).suffix.lower()
+        if suffix in YAML_SUFFIXES:
+            return True
+        if suffix == '.json':
+            return False
+    head = stream.peek(64) if hasattr(stream, 'peek') else b''
+    if not head:
+        position = stream.tell()
+        head = stream.read(64)
+        stream.seek(position)
+    return not head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'{')
+
+
+def load_spec(stream: BinaryIO, name: Optional[str] = None) -> Dict[str, Any]:
+    """Decode an OpenAPI/Swagger document from a binary stream (JSON or YAML).
+
+    JSON is read incrementally with ijson, so the raw text is never held in memory
+    next to the decoded document. Raises ValueError if the stream is not a spec.
+    """
+    if not hasattr(stream, 'peek') and not stream.seekable():
+        stream = io.BufferedReader(stream)
+
+    try:
+        if _is_yaml(stream, name):
+            loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+            spec = yaml.load(io.TextIOWrapper(stream, encoding='utf-8-sig'), Loader=loader)
+        else:
+            spec = next(ijson.items(stream, '', use_float=True), None)
+    except Exception as e:
+        raise ValueError(f"Could not decode the spec: {e}")
+
+    if not isinstance(spec, dict) or 'paths' not in spec or ('openapi' not in spec and 'swagger' not in spec):
+        raise ValueError("The document is not an OpenAPI or Swagger specification")
+    return spec
+
+
+def resolve_spec_path(path: Union[str, Path], specs_dir: Optional[Path] = None) -> Path:
+    """A local spec path inside specs_dir (SPECS_DIR by default); relative paths are taken from it"""
+    base = Path(specs_dir or SPECS_DIR).resolve()
+    resolved = (base / path).resolve()
+    if resolved != base and base not in resolved.parents:
+        raise ValueError(f"Spec paths must be inside {base}")
+    if not resolved.is_file():
+        raise ValueError(f"No spec file at {resolved}")
+    return resolved
+
+
+def load_spec_file(path: Union[str, Path], specs_dir: Optional[Path] = None) -> Dict[str, Any]:
+    resolved = resolve_spec_path(path, specs_dir)
+    with open(resolved, 'rb') as stream:
+        return load_spec(stream, resolved.name)
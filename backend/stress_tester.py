@@ -1,15 +1,224 @@
 import asyncio
+import functools
 import httpx
+import json
+import math
 import time
 import random
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, Iterable
 import logging
-from api_models import DistributionStrategy, EndpointResult
+from api_models import DistributionStrategy, EndpointResult, LoadMode, ArrivalDistribution, ResponseBodyMode, LoadProfileDriver, AdaptiveSearchConfig
+from latency_histogram import LatencyHistogram
+from live_metrics import LiveChannel, live_metrics_hub
+from metrics_history import MetricsRing
+from sample_recorder import SampleRecorder
+from load_profile import LoadProfile
+from knee_search import KneeSearch, is_stable
+from results_summary import summarize_results
+from load_client import LoadClientPool
+from response_validator import find_response_schema, validate_response
+from worker_pool import WorkerPool
+from request_pool import DEFAULT_POOL_SIZE, RequestPool, prepare_request_parts
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Phases reported per request, in the order they happen on the wire
+REQUEST_PHASES = ("pool_wait", "connect", "tls", "ttfb", "download")
+
+# Decoded response bodies kept per endpoint and level when sampling
+MAX_RESPONSE_SAMPLES = 5
+
+# Finished tests whose state stays in memory once stored, and how long an unused one stays
+MAX_HOT_TESTS = 32
+HOT_TEST_TTL = 3600.0
+
+class RequestPhaseTimer:
+    """Timestamps httpx trace events for a single request with perf_counter_ns.
+    
+    Passed to httpx through the "trace" request extension. Event names are recorded
+    without their http11/http2/connection prefix so both protocols map to the same phases.
+    """
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.events = {}
+    
+    async def trace(self, event_name: str, info: Dict[str, Any]):
+        _, _, event = event_name.partition('.')
+        self.events.setdefault(event, time.perf_counter_ns())
+    
+    def _span(self, started: str, completed: str, end_ns: int) -> Optional[float]:
+        if started not in self.events:
+            return None
+        return (self.events.get(completed, end_ns) - self.events[started]) / 1e9
+    
+    def phases(self, end_ns: int) -> Dict[str, float]:
+        """Return the duration in seconds of each phase that was observed"""
+        phases = {}
+        
+        # Waiting for a pool slot ends when we start connecting or reuse a connection
+        acquired = [self.events[e] for e in ("connect_tcp.started", "send_request_headers.started") if e in self.events]
+        if acquired:
+            phases["pool_wait"] = (min(acquired) - self.start_ns) / 1e9
+        
+        spans = {
+            "connect": ("connect_tcp.started", "connect_tcp.complete"),
+            "tls": ("start_tls.started", "start_tls.complete"),
+            "ttfb": ("send_request_headers.started", "receive_response_headers.complete"),
+            "download": ("receive_response_body.started", "receive_response_body.complete")
+        }
+        for phase, (started, completed) in spans.items():
+            duration = self._span(started, completed, end_ns)
+            if duration is not None:
+                phases[phase] = duration
+        return phases
+
+class EndpointStats:
+    """Streaming aggregate of request outcomes for one endpoint at one concurrency level.
+    
+    Each result is folded into counters and a LatencyHistogram as it arrives, so memory
+    stays constant no matter how many requests a level issues.
+    """
+    def __init__(self):
+        self.success_count = 0
+        self.failure_count = 0
+        self.status_codes = {}
+        self.error_message = None
+        self.histogram = LatencyHistogram()
+        self.phase_totals = {phase: 0.0 for phase in REQUEST_PHASES}
+        self.phase_counts = {phase: 0 for phase in REQUEST_PHASES}
+        self.max_pool_wait = 0.0
+        self.response_size_total = 0
+        self.response_size_count = 0
+        self.response_samples = []
+        self.validation_failures = 0
+        self.validation_error = None
+    
+    def record(self, result: Any):
+        """Fold one execute_request result (or the exception it raised) into the stats"""
+        if isinstance(result, Exception):
+            self.failure_count += 1
+            if not self.error_message:
+                self.error_message = str(result)
+            return
+        
+        if result.get('success', False):
+            self.success_count += 1
+            if result.get('response_time') is not None:
+                self.histogram.record(result['response_time'])
+        else:
+            self.failure_count += 1
+            if not self.error_message and 'error_message' in result:
+                self.error_message = result.get('error_message')
+        
+        status_code = str(result.get('status_code', 0))
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        
+        phases = result.get('phases') or {}
+        for phase, duration in phases.items():
+            self.phase_totals[phase] += duration
+            self.phase_counts[phase] += 1
+        if phases.get("pool_wait", 0.0) > self.max_pool_wait:
+            self.max_pool_wait = phases["pool_wait"]
+        
+        if result.get('response_size') is not None:
+            self.response_size_total += result['response_size']
+            self.response_size_count += 1
+        if result.get('response_body') is not None and len(self.response_samples) < MAX_RESPONSE_SAMPLES:
+            self.response_samples.append(result['response_body'])
+        if result.get('validation_error'):
+            self.validation_failures += 1
+            if not self.validation_error:
+                self.validation_error = result['validation_error']
+    
+    def merge(self, other: "EndpointStats") -> "EndpointStats":
+        """Add another set of stats for the same endpoint and level into this one"""
+        self.success_count += other.success_count
+        self.failure_count += other.failure_count
+        for status_code, count in other.status_codes.items():
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + count
+        self.error_message = self.error_message or other.error_message
+        self.histogram.merge(other.histogram)
+        for phase in REQUEST_PHASES:
+            self.phase_totals[phase] += other.phase_totals[phase]
+            self.phase_counts[phase] += other.phase_counts[phase]
+        self.max_pool_wait = max(self.max_pool_wait, other.max_pool_wait)
+        self.response_size_total += other.response_size_total
+        self.response_size_count += other.response_size_count
+        room = MAX_RESPONSE_SAMPLES - len(self.response_samples)
+        self.response_samples.extend(other.response_samples[:max(0, room)])
+        self.validation_failures += other.validation_failures
+        self.validation_error = self.validation_error or other.validation_error
+        return self
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a compact, picklable dict (used for worker deltas)"""
+        return {
+            "success_count": self.success_count,
+            "failure_count": self.failure_count,
+            "status_codes": self.status_codes,
+            "error_message": self.error_message,
+            "histogram": self.histogram.to_dict(),
+            "phase_totals": self.phase_totals,
+            "phase_counts": self.phase_counts,
+            "max_pool_wait": self.max_pool_wait,
+            "response_size_total": self.response_size_total,
+            "response_size_count": self.response_size_count,
+            "response_samples": self.response_samples,
+            "validation_failures": self.validation_failures,
+            "validation_error": self.validation_error
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EndpointStats":
+        stats = cls()
+        for name, value in data.items():
+            if name == "histogram":
+                stats.histogram = LatencyHistogram.from_dict(value)
+            else:
+                setattr(stats, name, value)
+        return stats
+    
+    def phase_average(self, phase: str) -> float:
+        """Average duration of a phase over the requests where it was observed"""
+        count = self.phase_counts[phase]
+        return self.phase_totals[phase] / count if count else 0.0
+    
+    def to_endpoint_result(self, endpoint_key: str, concurrent_requests: int) -> EndpointResult:
+        """Build the EndpointResult reported for this endpoint and level"""
+        histogram = self.histogram
+        percentiles = histogram.percentiles()
+        return EndpointResult(
+            endpoint=endpoint_key,
+            concurrent_requests=concurrent_requests,
+            success_count=self.success_count,
+            failure_count=self.failure_count,
+            avg_response_time=histogram.mean,
+            min_response_time=histogram.min_value or 0,
+            max_response_time=histogram.max_value or 0,
+            p50_response_time=percentiles["p50"],
+            p90_response_time=percentiles["p90"],
+            p99_response_time=percentiles["p99"],
+            p999_response_time=percentiles["p999"],
+            avg_pool_wait_time=self.phase_average("pool_wait"),
+            max_pool_wait_time=self.max_pool_wait,
+            avg_connect_time=self.phase_average("connect"),
+            avg_tls_time=self.phase_average("tls"),
+            avg_time_to_first_byte=self.phase_average("ttfb"),
+            avg_download_time=self.phase_average("download"),
+            connections_opened=self.phase_counts["connect"],
+            avg_response_size=(self.response_size_total / self.response_size_count
+                               if self.response_size_count else 0.0),
+            response_samples=self.response_samples,
+            validation_failures=self.validation_failures,
+            validation_error=self.validation_error,
+            status_codes=self.status_codes,
+            error_message=self.error_message,
+            histogram=histogram
+        )
+
 class StressTester:
     def __init__(self):
         self.active_tests = {}
@@ -18,17 +227,73 @@ class StressTester:
         self.test_start_times = {}
         self.test_end_times = {}
         self.completed_requests = {}
+        self.schedule_stats = {}
+        # Probes and knee point of adaptive concurrency searches
+        self.knee_stats = {}
+        # Fixed-size per-second live metrics history (MetricsRing) per test
+        self.metrics_history = {}
+        # Per-agent status of tests coordinated across load agents
+        self.agent_stats = {}
+        
+        # Optional ResultsStore that finished advanced tests are written to, and the
+        # session configuration each test is stored under
+        self.results_store = None
+        self.session_config_ids = {}
+        # Stored tests still held in memory, least recently used first, with last use time
+        self.hot_tests = OrderedDict()
+        self.max_hot_tests = MAX_HOT_TESTS
+        self.hot_test_ttl = HOT_TEST_TTL
+        
+        # Seconds to pause between concurrency levels
+        self.level_delay = 1
+        # Upper bound on how long cancelled in-flight requests may take to unwind
+        self.cancel_timeout = 5.0
+        # Seconds requests still in flight at the end of a running test may take to finish
+        self.drain_timeout = 30.0
+        # Seconds between adjustments of the virtual user count in load-profile runs
+        self.profile_tick = 0.25
+        
+        # Shared HTTP clients, one per target, sized to each test's concurrency
+        self.client_pool = LoadClientPool()
+        # Worker process pools for tests that shard load across CPU cores
+        self.worker_pools = {}
+        # Pre-encoded request rings per test and endpoint, and where to build them
+        # (None runs generation on the default thread pool; a ProcessPoolExecutor also works)
+        self.request_pools = {}
+        self.data_executor = None
+        # Per-second aggregates of running tests, read by the metrics WebSocket
+        self.live_metrics = live_metrics_hub
         
         # Import RequestDataGenerator here to avoid circular imports
         from data_generator import RequestDataGenerator
         self.request_generator = RequestDataGenerator()
 
+    def _lease_client(self, test_id: str, target_url: str, concurrency: int):
+        """Borrow the shared load client for a target using the test's pool settings"""
+        config = self.test_configs.get(test_id, {})
+        return self.client_pool.lease(
+            target_url,
+            concurrency,
+            http2=config.get("http2", False),
+            max_connections=config.get("max_connections"),
+            max_keepalive_connections=config.get("max_keepalive_connections")
+        )
+
     async def execute_request(self, client: httpx.AsyncClient, base_url: str, endpoint_path: str, method: str = "GET",
                             headers: Optional[Dict[str, str]] = None,
                             path_params: Optional[Dict[str, Any]] = None,
                             query_params: Optional[Dict[str, Any]] = None,
-                            json_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Execute a single HTTP request and return metrics"""
+                            json_data: Optional[Dict[str, Any]] = None,
+                            content: Optional[bytes] = None,
+                            body_mode: ResponseBodyMode = ResponseBodyMode.DISCARD,
+                            sample_percent: float = 0.0,
+                            response_schemas: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute a single HTTP request and return metrics
+        
+        The response body is streamed off the socket and only decoded when body_mode
+        asks for it: always in validate mode, and for sample_percent of responses in
+        sample mode. Sizes are recorded in every mode except discard.
+        """
         # Convert base_url to string if it's not already
         base_url_str = str(base_url)
         
@@ -38,45 +303,92 @@ class StressTester:
             for param, value in path_params.items():
                 request_url = request_url.replace(f"{{{param}}}", str(value))
         
-        start_time = time.time()
+        decode_body = body_mode == ResponseBodyMode.VALIDATE or (
+            body_mode == ResponseBodyMode.SAMPLE and random.random() * 100 < sample_percent
+        )
+        
+        timer = RequestPhaseTimer()
         try:
-            response = await client.request(
+            async with client.stream(
                 method=method,
                 url=request_url,
                 headers=headers,
                 params=query_params,
                 json=json_data,
-                timeout=30.0  # Longer timeout for stress tests
-            )
-            response_time = time.time() - start_time
+                content=content,
+                timeout=30.0,  # Longer timeout for stress tests
+                extensions={"trace": timer.trace}
+            ) as response:
+                body = None
+                response_size = 0
+                if decode_body:
+                    body = await response.aread()
+                    response_size = len(body)
+                elif body_mode == ResponseBodyMode.SIZE_ONLY:
+                    async for chunk in response.aiter_raw():
+                        response_size += len(chunk)
+                else:
+                    async for _ in response.aiter_raw():
+                        pass
             
-            # Try to get response body if it's JSON
-            response_body = None
-            try:
-                if response.headers.get('content-type', '').startswith('application/json'):
-                    response_body = response.json()
-            except:
-                response_body = response.text[:1000] if response.text else None
-                
-            return {
+            end_ns = time.perf_counter_ns()
+            phases = timer.phases(end_ns)
+            total_time = (end_ns - timer.start_ns) / 1e9
+            # Time spent queueing for our own connection pool is not target latency
+            response_time = total_time - phases.get("pool_wait", 0.0)
+            
+            result = {
                 "timestamp": datetime.now().isoformat(),
                 "response_time": response_time,
                 "status_code": response.status_code,
                 "success": response.status_code < 400,
                 "error_message": None,
-                "response_body": response_body
+                "response_body": None,
+                "total_time": total_time,
+                "phases": phases
             }
+            if body_mode != ResponseBodyMode.DISCARD:
+                result["response_size"] = response_size
+            
+            if body is not None:
+                # Try to get response body if it's JSON
+                try:
+                    if response.headers.get('content-type', '').startswith('application/json'):
+                        result["response_body"] = json.loads(body)
+                    else:
+                        result["response_body"] = response.text[:1000] or None
+                except ValueError:
+                    result["response_body"] = response.text[:1000] or None
+                
+                if body_mode == ResponseBodyMode.VALIDATE:
+                    schema = find_response_schema(response_schemas, response.status_code)
+                    result["validation_error"] = validate_response(result["response_body"], schema)
+                
+            return result
         except Exception as e:
-            response_time = time.time() - start_time
+            end_ns = time.perf_counter_ns()
+            phases = timer.phases(end_ns)
+            total_time = (end_ns - timer.start_ns) / 1e9
             return {
                 "timestamp": datetime.now().isoformat(),
-                "response_time": response_time,
+                "response_time": total_time - phases.get("pool_wait", 0.0),
                 "status_code": 0,
                 "success": False,
                 "error_message": str(e),
-                "response_body": None
+                "response_body": None,
+                "total_time": total_time,
+                "phases": phases
             }
 
+    @staticmethod
+    def _body_options(endpoint: Dict[str, Any], endpoint_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Response-body handling arguments for execute_request from an endpoint config"""
+        return {
+            "body_mode": ResponseBodyMode(endpoint.get('body_mode') or ResponseBodyMode.DISCARD),
+            "sample_percent": endpoint.get('body_sample_percent', 1.0),
+            "response_schemas": endpoint_schema.get('responses') if endpoint_schema else None
+        }
+
     def _prepare_endpoint_request(self, 
                                 base_url: str, 
                                 endpoint_path: str, 
@@ -84,58 +396,53 @@ class StressTester:
                                 endpoint_schema: Optional[Dict[str, Any]] = None,
                                 custom_params: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
         """Prepare parameters for an endpoint request"""
-        # Convert base_url to string if it's not already
-        base_url_str = str(base_url)
-        
-        url = f"{base_url_str.rstrip('/')}/{endpoint_path.lstrip('/')}"
-        headers = {}
-        path_params = {}
-        query_params = {}
-        json_data = None
-        
-        # If we have schema and the data generator, create realistic test data
-        if endpoint_schema:
-            # Process parameters based on schema
-            for param in endpoint_schema.get('parameters', []):
-                param_name = param.get('name')
-                param_location = param.get('in', '')  # 'path', 'query', 'header'
-                param_schema = param.get('schema', {})
-                
-                # Use custom value if provided
-                custom_value = None
-                if custom_params and param_name in custom_params:
-                    custom_value = custom_params[param_name]
-                
-                # Generate or use the parameter value
-                if custom_value is not None:
-                    param_value = custom_value
-                else:
-                    param_value = self.request_generator.generate_primitive(
-                        param_schema.get('type', 'string'),
-                        param_schema.get('format'),
-                        param_schema.get('enum')
-                    )
-                
-                # Assign to appropriate parameter location
-                if param_location == 'path':
-                    path_params[param_name] = param_value
-                elif param_location == 'query':
-                    query_params[param_name] = param_value
-                elif param_location == 'header':
-                    headers[param_name] = str(param_value)
-            
-            # Generate request body for methods that support it
-            if method.lower() in ['post', 'put', 'patch'] and 'requestBody' in endpoint_schema:
-                request_body = endpoint_schema.get('requestBody', {})
-                
-                # Use custom request body if provided
-                if custom_params and '__request_body' in custom_params:
-                    json_data = custom_params['__request_body']
-                else:
-                    # Generate data based on schema
-                    json_data = self.request_generator.generate_request_data(request_body)
+        return prepare_request_parts(
+            self.request_generator,
+            base_url=base_url,
+            endpoint_path=endpoint_path,
+            method=method,
+            endpoint_schema=endpoint_schema,
+            custom_params=custom_params
+        )
+    
+    def _request_pool(self,
+                      test_id: Optional[str],
+                      target_url: str,
+                      endpoint: Dict[str, Any],
+                      endpoint_schema: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None) -> RequestPool:
+        """Get the request pool for an endpoint of a test, creating it on first use"""
+        if test_id is None:
+            return RequestPool.for_endpoint(target_url, endpoint, endpoint_schema, headers)
+        pools = self.request_pools.setdefault(test_id, {})
+        endpoint_key = f"{endpoint['method']} {endpoint['path']}"
+        if endpoint_key not in pools:
+            pools[endpoint_key] = RequestPool.for_endpoint(target_url, endpoint, endpoint_schema, headers)
+        return pools[endpoint_key]
+    
+    def _send_prepared(self,
+                       client: httpx.AsyncClient,
+                       pool: RequestPool,
+                       body_options: Optional[Dict[str, Any]] = None,
+                       live: Optional[LiveChannel] = None):
+        """Create the coroutine sending the next pre-encoded request from a pool
         
-        return url, path_params, query_params, json_data, headers
+        With a live channel the request is counted as in flight while it runs and its
+        result is published to the test's live metrics.
+        """
+        request = pool.next()
+        coro = self.execute_request(
+            client=client,
+            base_url=request.base_url,
+            endpoint_path=request.path,
+            method=pool.method,
+            headers=request.headers,
+            content=request.content,
+            **(body_options or {})
+        )
+        if live is None:
+            return coro
+        return live.track(pool.endpoint_key, coro)
 
     async def run_sequential_test(self, 
                                test_id: str, 
@@ -155,11 +462,10 @@ class StressTester:
         self.test_start_times[test_id] = datetime.now()
         
         # Test each endpoint sequentially with increasing concurrency
-        async with httpx.AsyncClient() as client:
+        async with self._lease_client(test_id, target_url, max_concurrent_users) as client:
             for endpoint in endpoints:
                 path = endpoint['path']
                 method = endpoint['method']
-                custom_params = endpoint.get('custom_parameters')
                 endpoint_key = f"{method} {path}"
                 
                 # Find schema if available
@@ -187,9 +493,9 @@ class StressTester:
                         endpoint_path=path,
                         endpoint_method=method,
                         concurrent_requests=concurrent_users,
-                        endpoint_schema=schema,
-                        custom_params=custom_params,
-                        headers=headers
+                        body_options=self._body_options(endpoint, schema),
+                        test_id=test_id,
+                        request_pool=self._request_pool(test_id, target_url, endpoint, schema, headers)
                     )
                     
                     # Store results
@@ -197,7 +503,7 @@ class StressTester:
                     self.completed_requests[test_id] += concurrent_users
                     
                     # Add a small delay between tests
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(self.level_delay)
         
         # Test is complete
         self.active_tests[test_id] = False
@@ -240,7 +546,7 @@ class StressTester:
         if max_concurrent_users not in concurrent_levels:
             concurrent_levels.append(max_concurrent_users)
         
-        async with httpx.AsyncClient() as client:
+        async with self._lease_client(test_id, target_url, max_concurrent_users) as client:
             for concurrent_users in concurrent_levels:
                 if not self.active_tests.get(test_id, False):
                     break
@@ -265,7 +571,6 @@ class StressTester:
                 for i, endpoint in enumerate(endpoints):
                     path = endpoint['path']
                     method = endpoint['method']
-                    custom_params = endpoint.get('custom_parameters')
                     endpoint_key = f"{method} {path}"
                     
                     # Find schema if available
@@ -281,23 +586,24 @@ class StressTester:
                             endpoint_path=path,
                             endpoint_method=method,
                             concurrent_requests=endpoint_allocations[i],
-                            endpoint_schema=schema,
-                            custom_params=custom_params,
-                            headers=headers
+                            body_options=self._body_options(endpoint, schema),
+                            test_id=test_id,
+                            request_pool=self._request_pool(test_id, target_url, endpoint, schema, headers)
                         )
                         tasks.append((endpoint_key, task))
                 
-                # Wait for all tasks to complete
-                for endpoint_key, task in tasks:
-                    try:
-                        endpoint_result = await task
-                        self.results[test_id][endpoint_key].append(endpoint_result)
-                        self.completed_requests[test_id] += endpoint_result.concurrent_requests
-                    except Exception as e:
-                        logger.error(f"Error in interleaved test for {endpoint_key}: {str(e)}")
+                # Run the per-endpoint batches together and store each as it finishes
+                def store_batch(endpoint_key: str, endpoint_result: Any):
+                    if isinstance(endpoint_result, Exception):
+                        logger.error(f"Error in interleaved test for {endpoint_key}: {str(endpoint_result)}")
+                        return
+                    self.results[test_id][endpoint_key].append(endpoint_result)
+                    self.completed_requests[test_id] += endpoint_result.concurrent_requests
+                
+                await self._dispatch_concurrently(test_id, tasks, store_batch)
                 
                 # Add a small delay between tests
-                await asyncio.sleep(1)
+                await asyncio.sleep(self.level_delay)
         
         # Test is complete
         self.active_tests[test_id] = False
@@ -331,12 +637,7 @@ class StressTester:
             self.results[test_id][endpoint_key] = []
             
             # Store endpoint info for random selection
-            endpoint_info[endpoint_key] = {
-                'path': path,
-                'method': method,
-                'weight': endpoint.get('weight', 1.0),
-                'custom_params': endpoint.get('custom_parameters')
-            }
+            endpoint_info[endpoint_key] = endpoint
         
         # Calculate weights for weighted random selection
         weights = [endpoint.get('weight', 1.0) for endpoint in endpoints]
@@ -348,77 +649,355 @@ class StressTester:
         if max_concurrent_users not in concurrent_levels:
             concurrent_levels.append(max_concurrent_users)
         
-        async with httpx.AsyncClient() as client:
+        async with self._lease_client(test_id, target_url, max_concurrent_users) as client:
             for concurrent_users in concurrent_levels:
                 if not self.active_tests.get(test_id, False):
                     break
                 
-                # Create a pool of requests with random endpoints
+                # Randomly select an endpoint for each request based on weights
+                selected_keys = random.choices(endpoint_keys, weights=weights, k=concurrent_users)
                 endpoint_counts = {}
-                tasks = []
-                
-                for _ in range(concurrent_users):
-                    # Randomly select an endpoint based on weights
-                    endpoint_key = random.choices(endpoint_keys, weights=weights, k=1)[0]
-                    endpoint_data = endpoint_info[endpoint_key]
-                    
-                    # Increment count for this endpoint
+                for endpoint_key in selected_keys:
                     endpoint_counts[endpoint_key] = endpoint_counts.get(endpoint_key, 0) + 1
-                    
-                    # Find schema if available
-                    schema = None
-                    if endpoint_schemas and endpoint_key in endpoint_schemas:
-                        schema = endpoint_schemas[endpoint_key]
-                    
-                    # Prepare the request
-                    url, path_params, query_params, json_data, req_headers = self._prepare_endpoint_request(
-                        base_url=target_url,
-                        endpoint_path=endpoint_data['path'],
-                        method=endpoint_data['method'],
-                        endpoint_schema=schema,
-                        custom_params=endpoint_data.get('custom_params')
+                
+                request_pools = {}
+                body_options = {}
+                for endpoint_key in endpoint_counts:
+                    schema = endpoint_schemas.get(endpoint_key) if endpoint_schemas else None
+                    request_pools[endpoint_key] = self._request_pool(
+                        test_id, target_url, endpoint_info[endpoint_key], schema, headers
                     )
+                    body_options[endpoint_key] = self._body_options(endpoint_info[endpoint_key], schema)
+                
+                tasks = []
+                if test_id in self.worker_pools:
+                    # Shard each endpoint's share of the level across the worker processes
+                    for endpoint_key, count in endpoint_counts.items():
+                        endpoint_data = endpoint_info[endpoint_key]
+                        task = self._run_concurrent_batch(
+                            client=client,
+                            target_url=target_url,
+                            endpoint_path=endpoint_data['path'],
+                            endpoint_method=endpoint_data['method'],
+                            concurrent_requests=count,
+                            body_options=body_options[endpoint_key],
+                            test_id=test_id,
+                            request_pool=request_pools[endpoint_key]
+                        )
+                        tasks.append((endpoint_key, task))
                     
-                    # Merge headers
-                    if headers:
-                        req_headers.update(headers)
+                    def store_batch(endpoint_key: str, endpoint_result: Any):
+                        if isinstance(endpoint_result, Exception):
+                            logger.error(f"Error in random test: {str(endpoint_result)}")
+                            return
+                        self.results[test_id][endpoint_key].append(endpoint_result)
+                        self.completed_requests[test_id] += endpoint_counts[endpoint_key]
                     
-                    # Create the task
-                    task = self.execute_request(
-                        client=client,
-                        base_url=target_url,
-                        endpoint_path=endpoint_data['path'],
-                        method=endpoint_data['method'],
-                        headers=req_headers,
-                        path_params=path_params,
-                        query_params=query_params,
-                        json_data=json_data
-                    )
+                    await self._dispatch_concurrently(test_id, tasks, store_batch)
+                    await asyncio.sleep(self.level_delay)
+                    continue
+                
+                # Fill the request rings for this level, then take pre-encoded requests from them
+                await asyncio.gather(*(
+                    request_pools[endpoint_key].prepare(count, self.data_executor)
+                    for endpoint_key, count in endpoint_counts.items()
+                ))
+                live = self.live_metrics.channel(test_id)
+                for endpoint_key in selected_keys:
+                    task = self._send_prepared(client, request_pools[endpoint_key], body_options[endpoint_key], live)
                     tasks.append((endpoint_key, task))
                 
-                # Execute all requests and collect results
-                results_by_endpoint = {}
-                for endpoint_key, task in tasks:
-                    try:
-                        result = await task
-                        if endpoint_key not in results_by_endpoint:
-                            results_by_endpoint[endpoint_key] = []
-                        results_by_endpoint[endpoint_key].append(result)
-                        self.completed_requests[test_id] += 1
-                    except Exception as e:
-                        logger.error(f"Error in random test: {str(e)}")
-                
-                # Process results for each endpoint
-                for endpoint_key, results in results_by_endpoint.items():
-                    endpoint_result = self._process_endpoint_results(
+                # Execute all requests together, folding results in as they complete
+                stats_by_endpoint = {}
+                
+                def collect_result(endpoint_key: str, result: Any):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error in random test: {str(result)}")
+                        return
+                    if endpoint_key not in stats_by_endpoint:
+                        stats_by_endpoint[endpoint_key] = EndpointStats()
+                    stats_by_endpoint[endpoint_key].record(result)
+                    self.completed_requests[test_id] += 1
+                
+                await self._dispatch_concurrently(test_id, tasks, collect_result)
+                
+                # Build results for each endpoint
+                for endpoint_key, stats in stats_by_endpoint.items():
+                    endpoint_result = stats.to_endpoint_result(
                         endpoint_key, 
-                        endpoint_counts.get(endpoint_key, 0), 
-                        results
+                        endpoint_counts.get(endpoint_key, 0)
                     )
                     self.results[test_id][endpoint_key].append(endpoint_result)
                 
                 # Add a small delay between tests
-                await asyncio.sleep(1)
+                await asyncio.sleep(self.level_delay)
+        
+        # Test is complete
+        self.active_tests[test_id] = False
+        self.test_end_times[test_id] = datetime.now()
+        
+        return self.results[test_id]
+        
+    async def run_constant_rate_test(self,
+                                  test_id: str,
+                                  target_url: str,
+                                  endpoints: List[Dict[str, Any]],
+                                  max_concurrent_users: int,
+                                  request_rate: int,
+                                  duration: int,
+                                  headers: Optional[Dict[str, str]] = None,
+                                  endpoint_schemas: Optional[Dict[str, Any]] = None,
+                                  arrival_distribution: ArrivalDistribution = ArrivalDistribution.FIXED) -> Dict[str, List[Dict[str, Any]]]:
+        """Run an open-loop test that fires requests at request_rate for duration seconds.
+        
+        Arrivals follow a fixed schedule (evenly spaced or Poisson) that does not wait for
+        responses, so a slow target cannot throttle the offered load. At most
+        max_concurrent_users requests are kept in flight; arrivals beyond that are counted
+        as dropped. How late each request left relative to its schedule is recorded in
+        schedule_stats[test_id].
+        """
+        self.active_tests[test_id] = True
+        self.results[test_id] = {}
+        self.completed_requests[test_id] = 0
+        
+        # Store start time
+        self.test_start_times[test_id] = datetime.now()
+        
+        # Initialize results for each endpoint
+        endpoint_info = {}
+        for endpoint in endpoints:
+            endpoint_key = f"{endpoint['method']} {endpoint['path']}"
+            self.results[test_id][endpoint_key] = []
+            endpoint_info[endpoint_key] = endpoint
+        
+        endpoint_keys = list(endpoint_info.keys())
+        weights = [endpoint.get('weight', 1.0) for endpoint in endpoints]
+        
+        schedule = {
+            "target_rate": request_rate,
+            "arrival_distribution": arrival_distribution.value,
+            "scheduled_requests": 0,
+            "sent_requests": 0,
+            "dropped_requests": 0,
+            "late_requests": 0,
+            "avg_schedule_lag": 0.0,
+            "max_schedule_lag": 0.0,
+            "achieved_rate": 0.0
+        }
+        self.schedule_stats[test_id] = schedule
+        
+        stats_by_endpoint = {key: EndpointStats() for key in endpoint_keys}
+        in_flight_by_endpoint = {key: 0 for key in endpoint_keys}
+        peak_in_flight = {key: 0 for key in endpoint_keys}
+        in_flight = set()
+        total_lag = 0.0
+        
+        # Requests are encoded up front; a random-each-time ring is regenerated in the background as it wraps
+        request_pools = {}
+        body_options = {}
+        for endpoint_key, endpoint_data in endpoint_info.items():
+            schema = endpoint_schemas.get(endpoint_key) if endpoint_schemas else None
+            request_pools[endpoint_key] = self._request_pool(test_id, target_url, endpoint_data, schema, headers)
+            body_options[endpoint_key] = self._body_options(endpoint_data, schema)
+        ring_size = min(DEFAULT_POOL_SIZE, request_rate * duration)
+        live = self.live_metrics.channel(test_id)
+        await asyncio.gather(*(pool.prepare(ring_size, self.data_executor) for pool in request_pools.values()))
+        
+        async def send(endpoint_key: str):
+            try:
+                result = await self._send_prepared(client, request_pools[endpoint_key], body_options[endpoint_key], live)
+                stats_by_endpoint[endpoint_key].record(result)
+                self.completed_requests[test_id] += 1
+            finally:
+                in_flight_by_endpoint[endpoint_key] -= 1
+        
+        loop = asyncio.get_running_loop()
+        async with self._lease_client(test_id, target_url, max_concurrent_users) as client:
+            start = loop.time()
+            next_offset = 0.0
+            
+            while self.active_tests.get(test_id, False) and next_offset < duration:
+                intended = start + next_offset
+                delay = intended - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+                # How far behind schedule this arrival is leaving
+                lag = max(0.0, loop.time() - intended)
+                schedule["scheduled_requests"] += 1
+                total_lag += lag
+                schedule["max_schedule_lag"] = max(schedule["max_schedule_lag"], lag)
+                if lag > 0.001:
+                    schedule["late_requests"] += 1
+                
+                if len(in_flight) >= max_concurrent_users:
+                    schedule["dropped_requests"] += 1
+                else:
+                    endpoint_key = random.choices(endpoint_keys, weights=weights, k=1)[0]
+                    in_flight_by_endpoint[endpoint_key] += 1
+                    peak_in_flight[endpoint_key] = max(peak_in_flight[endpoint_key], in_flight_by_endpoint[endpoint_key])
+                    task = asyncio.ensure_future(send(endpoint_key))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                    schedule["sent_requests"] += 1
+                
+                # Schedule the next arrival independently of any response
+                if arrival_distribution == ArrivalDistribution.POISSON:
+                    next_offset += random.expovariate(request_rate)
+                else:
+                    next_offset += 1.0 / request_rate
+            
+            send_window = loop.time() - start
+            
+            # Let requests already on the wire finish unless the test was stopped
+            await self._cancel_and_drain(in_flight, test_id)
+        
+        if schedule["scheduled_requests"]:
+            schedule["avg_schedule_lag"] = total_lag / schedule["scheduled_requests"]
+        if send_window > 0:
+            schedule["achieved_rate"] = schedule["sent_requests"] / send_window
+        
+        for endpoint_key, stats in stats_by_endpoint.items():
+            if stats.success_count or stats.failure_count:
+                self.results[test_id][endpoint_key].append(
+                    stats.to_endpoint_result(endpoint_key, peak_in_flight[endpoint_key])
+                )
+        
+        # Test is complete
+        self.active_tests[test_id] = False
+        self.test_end_times[test_id] = datetime.now()
+        
+        return self.results[test_id]
+        
+    async def run_profile_test(self,
+                            test_id: str,
+                            target_url: str,
+                            endpoints: List[Dict[str, Any]],
+                            profile: LoadProfile,
+                            max_concurrent_users: int,
+                            headers: Optional[Dict[str, str]] = None,
+                            endpoint_schemas: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Run a test whose load follows a load profile for the profile's duration.
+        
+        With the users driver a controller adds or retires virtual users every
+        profile_tick seconds to match the profile; each user sends requests back to
+        back (endpoint chosen by weight), waiting think_time between them, and a
+        retired user finishes its current request first. With the rate driver
+        arrivals are scheduled open-loop at the profile's current rate. Either way at
+        most max_concurrent_users requests are in flight. Results are kept per
+        endpoint and phase, tagged with the phase the request was sent in, so ramps
+        can be told apart from steady state.
+        """
+        self.active_tests[test_id] = True
+        self.results[test_id] = {}
+        self.completed_requests[test_id] = 0
+        
+        # Store start time
+        self.test_start_times[test_id] = datetime.now()
+        
+        # Initialize results for each endpoint
+        endpoint_info = {}
+        for endpoint in endpoints:
+            endpoint_key = f"{endpoint['method']} {endpoint['path']}"
+            self.results[test_id][endpoint_key] = []
+            endpoint_info[endpoint_key] = endpoint
+        
+        endpoint_keys = list(endpoint_info.keys())
+        weights = [endpoint.get('weight', 1.0) for endpoint in endpoints]
+        
+        request_pools = {}
+        body_options = {}
+        for endpoint_key, endpoint_data in endpoint_info.items():
+            schema = endpoint_schemas.get(endpoint_key) if endpoint_schemas else None
+            request_pools[endpoint_key] = self._request_pool(test_id, target_url, endpoint_data, schema, headers)
+            body_options[endpoint_key] = self._body_options(endpoint_data, schema)
+        ring_size = min(DEFAULT_POOL_SIZE, max(1, math.ceil(profile.peak() * profile.duration)))
+        live = self.live_metrics.channel(test_id)
+        await asyncio.gather(*(pool.prepare(ring_size, self.data_executor) for pool in request_pools.values()))
+        
+        # Stats and peak load (users or requests in flight) per phase
+        stats = {}
+        peak_load = {}
+        in_flight = set()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        
+        def current_phase() -> str:
+            phase = profile.phase_at(loop.time() - start)
+            if live is not None:
+                live.phase = phase
+            return phase
+        
+        async def send(endpoint_key: str, phase: str):
+            result = await self._send_prepared(client, request_pools[endpoint_key], body_options[endpoint_key], live)
+            if (phase, endpoint_key) not in stats:
+                stats[(phase, endpoint_key)] = EndpointStats()
+            stats[(phase, endpoint_key)].record(result)
+            self.completed_requests[test_id] += 1
+        
+        def track(task: asyncio.Task, phase: str):
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            if profile.driver == LoadProfileDriver.RATE:
+                peak_load[phase] = max(peak_load.get(phase, 0), len(in_flight))
+        
+        async with self._lease_client(test_id, target_url, max_concurrent_users) as client:
+            if profile.driver == LoadProfileDriver.USERS:
+                users = {}
+                wanted = [0]
+                
+                async def virtual_user(index: int):
+                    while self.active_tests.get(test_id, False) and index < wanted[0]:
+                        endpoint_key = random.choices(endpoint_keys, weights=weights, k=1)[0]
+                        await send(endpoint_key, current_phase())
+                        if profile.think_time > 0:
+                            await asyncio.sleep(profile.think_time)
+                
+                while self.active_tests.get(test_id, False) and loop.time() - start < profile.duration:
+                    phase = current_phase()
+                    wanted[0] = min(max_concurrent_users, round(profile.value_at(loop.time() - start)))
+                    peak_load[phase] = max(peak_load.get(phase, 0), wanted[0])
+                    for index in range(wanted[0]):
+                        if index not in users or users[index].done():
+                            users[index] = asyncio.ensure_future(virtual_user(index))
+                            track(users[index], phase)
+                    await asyncio.sleep(self.profile_tick)
+                wanted[0] = 0
+            else:
+                next_offset = 0.0
+                while self.active_tests.get(test_id, False) and next_offset < profile.duration:
+                    delay = start + next_offset - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    
+                    # Summed arrival gaps can land a hair short of a profile boundary
+                    scheduled = next_offset + 1e-9
+                    rate = profile.value_at(scheduled)
+                    if rate <= 0:
+                        # Nothing to send yet; look again a little later
+                        next_offset += self.profile_tick
+                        continue
+                    if len(in_flight) < max_concurrent_users:
+                        # Arrivals count towards the phase they were scheduled in
+                        phase = profile.phase_at(scheduled)
+                        if live is not None:
+                            live.phase = phase
+                        endpoint_key = random.choices(endpoint_keys, weights=weights, k=1)[0]
+                        track(asyncio.ensure_future(send(endpoint_key, phase)), phase)
+                    next_offset += 1.0 / rate
+            
+            # Let requests already on the wire finish unless the test was stopped
+            await self._cancel_and_drain(in_flight, test_id)
+        
+        phases = profile.phases()
+        phases += [phase for phase, _ in stats if phase not in phases]
+        for phase in phases:
+            for endpoint_key in endpoint_keys:
+                phase_stats = stats.get((phase, endpoint_key))
+                if phase_stats is not None:
+                    endpoint_result = phase_stats.to_endpoint_result(endpoint_key, peak_load.get(phase, 0))
+                    endpoint_result.phase = phase
+                    self.results[test_id][endpoint_key].append(endpoint_result)
         
         # Test is complete
         self.active_tests[test_id] = False
@@ -426,6 +1005,217 @@ class StressTester:
         
         return self.results[test_id]
         
+    async def run_adaptive_test(self,
+                             test_id: str,
+                             target_url: str,
+                             endpoints: List[Dict[str, Any]],
+                             max_concurrent_users: int,
+                             headers: Optional[Dict[str, str]] = None,
+                             endpoint_schemas: Optional[Dict[str, Any]] = None,
+                             adaptive: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Search for the highest concurrency that still meets a latency and error-rate SLO.
+        
+        Each probed level is held with that many virtual users (endpoints chosen by
+        weight) until the latency percentile of the last few measurement windows
+        agrees, and judged on those windows. Levels double until the SLO is breached,
+        then a binary search narrows down the knee (see KneeSearch). Every probe is
+        kept as a result row and the knee is reported in knee_stats[test_id].
+        """
+        config = AdaptiveSearchConfig(**(adaptive or {}))
+        self.active_tests[test_id] = True
+        self.results[test_id] = {}
+        self.completed_requests[test_id] = 0
+        
+        # Store start time
+        self.test_start_times[test_id] = datetime.now()
+        
+        # Initialize results for each endpoint
+        endpoint_info = {}
+        for endpoint in endpoints:
+            endpoint_key = f"{endpoint['method']} {endpoint['path']}"
+            self.results[test_id][endpoint_key] = []
+            endpoint_info[endpoint_key] = endpoint
+        
+        request_pools = {}
+        body_options = {}
+        for endpoint_key, endpoint_data in endpoint_info.items():
+            schema = endpoint_schemas.get(endpoint_key) if endpoint_schemas else None
+            request_pools[endpoint_key] = self._request_pool(test_id, target_url, endpoint_data, schema, headers)
+            body_options[endpoint_key] = self._body_options(endpoint_data, schema)
+        await asyncio.gather(*(pool.prepare(DEFAULT_POOL_SIZE, self.data_executor) for pool in request_pools.values()))
+        
+        search = KneeSearch(max_concurrent_users, config.resolution)
+        self.knee_stats[test_id] = search
+        
+        async with self._lease_client(test_id, target_url, max_concurrent_users) as client:
+            level = search.next_level()
+            while level is not None and self.active_tests.get(test_id, False):
+                totals, metrics = await self._hold_level(
+                    test_id, client, level, endpoint_info, request_pools, body_options, config
+                )
+                for endpoint_key, stats in totals.items():
+                    self.results[test_id][endpoint_key].append(stats.to_endpoint_result(endpoint_key, level))
+                if not self.active_tests.get(test_id, False):
+                    # A stopped probe was cut short; do not judge it
+                    break
+                latency_ok = metrics["latency"] is not None and metrics["latency"] <= config.max_latency
+                search.report(level, latency_ok and metrics["error_rate"] <= config.max_error_rate, metrics)
+                level = search.next_level()
+                if level is not None:
+                    await asyncio.sleep(self.level_delay)
+        
+        # Test is complete
+        self.active_tests[test_id] = False
+        self.test_end_times[test_id] = datetime.now()
+        
+        return self.results[test_id]
+    
+    async def _hold_level(self,
+                          test_id: str,
+                          client: httpx.AsyncClient,
+                          level: int,
+                          endpoint_info: Dict[str, Dict[str, Any]],
+                          request_pools: Dict[str, RequestPool],
+                          body_options: Dict[str, Dict[str, Any]],
+                          config: AdaptiveSearchConfig) -> Tuple[Dict[str, EndpointStats], Dict[str, Any]]:
+        """Hold level virtual users until latency settles; returns the level's stats and verdict metrics"""
+        endpoint_keys = list(endpoint_info)
+        weights = [endpoint.get('weight', 1.0) for endpoint in endpoint_info.values()]
+        live = self.live_metrics.channel(test_id)
+        if live is not None:
+            live.phase = f"concurrency {level}"
+        
+        # Stats of the current measurement window, swapped out every window
+        current = [{}]
+        windows = []
+        holding = [True]
+        
+        async def virtual_user():
+            while holding[0] and self.active_tests.get(test_id, False):
+                endpoint_key = random.choices(endpoint_keys, weights=weights, k=1)[0]
+                result = await self._send_prepared(client, request_pools[endpoint_key], body_options[endpoint_key], live)
+                if endpoint_key not in current[0]:
+                    current[0][endpoint_key] = EndpointStats()
+                current[0][endpoint_key].record(result)
+                self.completed_requests[test_id] += 1
+        
+        def window_latency(window: Dict[str, EndpointStats]) -> Optional[float]:
+            histogram = LatencyHistogram()
+            for stats in window.values():
+                histogram.merge(stats.histogram)
+            return histogram.percentile(config.percentile) if histogram.count else None
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        users = [asyncio.ensure_future(virtual_user()) for _ in range(level)]
+        try:
+            while self.active_tests.get(test_id, False):
+                await asyncio.sleep(config.window)
+                window, current[0] = current[0], {}
+                windows.append(window)
+                held = loop.time() - start
+                recent = [window_latency(window) for window in windows[-config.stable_windows:]]
+                if held >= config.max_hold or (
+                    held >= config.min_hold and len(recent) == config.stable_windows
+                    and is_stable(recent, config.stability_tolerance)
+                ):
+                    break
+        finally:
+            holding[0] = False
+            await self._cancel_and_drain(users, test_id)
+        
+        # Judge the level on its last, settled windows; totals also cover the warm-up
+        measured = {}
+        for window in windows[-config.stable_windows:]:
+            for endpoint_key, stats in window.items():
+                measured.setdefault(endpoint_key, EndpointStats()).merge(stats)
+        totals = {}
+        for window in windows + [current[0]]:
+            for endpoint_key, stats in window.items():
+                totals.setdefault(endpoint_key, EndpointStats()).merge(stats)
+        
+        requests = sum(stats.success_count + stats.failure_count for stats in measured.values())
+        failures = sum(stats.failure_count for stats in measured.values())
+        measured_seconds = len(windows[-config.stable_windows:]) * config.window
+        recent = [window_latency(window) for window in windows[-config.stable_windows:]]
+        return totals, {
+            "duration": round(loop.time() - start, 3),
+            "requests": requests,
+            "rps": requests / measured_seconds if measured_seconds else 0.0,
+            "error_rate": (failures / requests * 100) if requests else 100.0,
+            "latency": window_latency(measured),
+            "stable": is_stable(recent, config.stability_tolerance)
+        }
+        
+    async def _dispatch_concurrently(self,
+                                  test_id: str,
+                                  keyed_tasks: List[Tuple[str, Awaitable[Any]]],
+                                  on_result: Callable[[str, Any], None]) -> int:
+        """Schedule keyed coroutines together and hand each result to on_result as it completes.
+        
+        Exceptions raised by a task are passed to on_result instead of its result. If the
+        test is stopped while tasks are still running, the remaining tasks are cancelled
+        and given at most cancel_timeout seconds to unwind. Returns the number of tasks
+        that completed.
+        """
+        if not keyed_tasks:
+            return 0
+        
+        task_keys = {}
+        for endpoint_key, coro in keyed_tasks:
+            task_keys[asyncio.ensure_future(coro)] = endpoint_key
+        
+        pending = set(task_keys)
+        completed = 0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=0.25, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    error = task.exception()
+                    on_result(task_keys[task], error if error is not None else task.result())
+                    completed += 1
+                
+                # Stop waiting on in-flight requests once the test has been stopped
+                if pending and not self.active_tests.get(test_id, False):
+                    logger.info(f"Test {test_id} stopped, cancelling {len(pending)} in-flight requests")
+                    break
+        finally:
+            await self._cancel_and_drain(pending)
+        
+        return completed
+    
+    async def _cancel_and_drain(self, tasks: Iterable[asyncio.Future], test_id: Optional[str] = None):
+        """Let tasks finish, then cancel the rest and give them cancel_timeout seconds to unwind.
+        
+        Tasks get drain_timeout seconds to finish while test_id is still running and
+        cancel_timeout once it has been stopped; without a test_id they are cancelled
+        straight away.
+        """
+        tasks = set(tasks)
+        if not tasks:
+            return
+        if test_id is not None:
+            timeout = self.drain_timeout if self.active_tests.get(test_id, False) else self.cancel_timeout
+            _, tasks = await asyncio.wait(tasks, timeout=timeout)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.cancel_timeout)
+        
+    def _batch_requests(self,
+                        client: httpx.AsyncClient,
+                        request_pool: RequestPool,
+                        concurrent_requests: int,
+                        body_options: Optional[Dict[str, Any]] = None,
+                        live: Optional[LiveChannel] = None) -> List[Any]:
+        """Build the request coroutines for one batch from a prepared request pool"""
+        return [
+            self._send_prepared(client, request_pool, body_options, live)
+            for _ in range(concurrent_requests)
+        ]
+    
     async def _run_concurrent_batch(self,
                                  client: httpx.AsyncClient,
                                  target_url: str,
@@ -434,94 +1224,82 @@ class StressTester:
                                  concurrent_requests: int,
                                  endpoint_schema: Optional[Dict[str, Any]] = None,
                                  custom_params: Optional[Dict[str, Any]] = None,
-                                 headers: Optional[Dict[str, str]] = None) -> EndpointResult:
-        """Run a batch of concurrent requests for a single endpoint"""
-        tasks = []
-        
-        for _ in range(concurrent_requests):
-            # Prepare the request
-            full_url, path_params, query_params, json_data, req_headers = self._prepare_endpoint_request(
-                base_url=target_url,
-                endpoint_path=endpoint_path,
-                method=endpoint_method,
-                endpoint_schema=endpoint_schema,
-                custom_params=custom_params
-            )
-            
-            # Merge headers
-            if headers:
-                req_headers.update(headers)
-            
-            # Get base_url and path from full_url
-            base_url_parts = full_url.split('/')
-            # Get the protocol and domain
-            base_url_str = '/'.join(base_url_parts[:3])
-            # Get the path by removing the protocol and domain
-            path_str = '/'.join(base_url_parts[3:])
-            
-            # Create the task
-            task = self.execute_request(
-                client=client,
-                base_url=base_url_str,
-                endpoint_path=path_str,
-                method=endpoint_method,
-                headers=req_headers,
-                path_params=path_params,
-                query_params=query_params,
-                json_data=json_data
-            )
-            tasks.append(task)
-        
-        # Execute all tasks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+                                 headers: Optional[Dict[str, str]] = None,
+                                 body_options: Optional[Dict[str, Any]] = None,
+                                 test_id: Optional[str] = None,
+                                 request_pool: Optional[RequestPool] = None) -> EndpointResult:
+        """Run a batch of concurrent requests for a single endpoint
         
-        # Process the results
+        Request data comes from request_pool (a one-off pool is built from the schema
+        and custom parameters if none is given). When the test has a worker pool the
+        batch is sharded across its processes and their streamed stats are merged;
+        otherwise it runs on this event loop.
+        """
         endpoint_key = f"{endpoint_method} {endpoint_path}"
-        return self._process_endpoint_results(endpoint_key, concurrent_requests, results)
-    
-    def _process_endpoint_results(self, endpoint_key: str, concurrent_requests: int, results: List[Dict[str, Any]]) -> EndpointResult:
-        """Process raw results into an EndpointResult object"""
-        success_count = 0
-        failure_count = 0
-        response_times = []
-        status_codes = {}
-        error_message = None
+        if request_pool is None:
+            request_pool = RequestPool.for_endpoint(
+                target_url,
+                {"path": endpoint_path, "method": endpoint_method, "custom_parameters": custom_params},
+                endpoint_schema,
+                headers
+            )
         
-        for result in results:
-            if isinstance(result, Exception):
-                failure_count += 1
-                if not error_message:
-                    error_message = str(result)
+        live = self.live_metrics.channel(test_id)
+        pool = self.worker_pools.get(test_id) if test_id else None
+        if pool is not None:
+            config = self.test_configs.get(test_id, {})
+            if request_pool.refreshes:
+                # Let each worker generate fresh data for its own share
+                request_pool = RequestPool(request_pool.spec)
             else:
-                if result.get('success', False):
-                    success_count += 1
-                    if 'response_time' in result and result['response_time'] is not None:
-                        response_times.append(result['response_time'])
-                else:
-                    failure_count += 1
-                    if not error_message and 'error_message' in result:
-                        error_message = result.get('error_message')
+                await request_pool.prepare(concurrent_requests, self.data_executor)
+            job = {
+                "target_url": target_url,
+                "concurrent_requests": concurrent_requests,
+                "request_pool": request_pool,
+                "body_options": body_options,
+                "http2": config.get("http2", False),
+                "max_connections": config.get("max_connections"),
+                "max_keepalive_connections": config.get("max_keepalive_connections")
+            }
+            if live is None:
+                stats = await pool.run_batch(job)
+            else:
+                # Worker deltas feed the live metrics as they arrive
+                outstanding = [concurrent_requests]
+                
+                def publish_delta(delta: EndpointStats):
+                    completed = delta.success_count + delta.failure_count
+                    outstanding[0] -= completed
+                    live.add_in_flight(endpoint_key, -completed)
+                    live.merge(endpoint_key, delta)
                 
-                status_code = str(result.get('status_code', 0))
-                status_codes[status_code] = status_codes.get(status_code, 0) + 1
+                live.add_in_flight(endpoint_key, concurrent_requests)
+                try:
+                    stats = await pool.run_batch(job, on_delta=publish_delta)
+                finally:
+                    live.add_in_flight(endpoint_key, -max(0, outstanding[0]))
+            return stats.to_endpoint_result(endpoint_key, concurrent_requests)
         
-        # Calculate statistics
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        min_response_time = min(response_times) if response_times else 0
-        max_response_time = max(response_times) if response_times else 0
+        await request_pool.prepare(concurrent_requests, self.data_executor)
+        tasks = self._batch_requests(client, request_pool, concurrent_requests, body_options, live)
         
-        # Create endpoint result
-        return EndpointResult(
-            endpoint=endpoint_key,
-            concurrent_requests=concurrent_requests,
-            success_count=success_count,
-            failure_count=failure_count,
-            avg_response_time=avg_response_time,
-            min_response_time=min_response_time,
-            max_response_time=max_response_time,
-            status_codes=status_codes,
-            error_message=error_message
-        )
+        # Execute all tasks concurrently, folding each result in as it completes
+        stats = EndpointStats()
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                stats.record(await next_done)
+            except Exception as e:
+                stats.record(e)
+        
+        return stats.to_endpoint_result(endpoint_key, concurrent_requests)
+    
+    def _process_endpoint_results(self, endpoint_key: str, concurrent_requests: int, results: List[Dict[str, Any]]) -> EndpointResult:
+        """Process raw results into an EndpointResult object"""
+        stats = EndpointStats()
+        for result in results:
+            stats.record(result)
+        return stats.to_endpoint_result(endpoint_key, concurrent_requests)
     
     async def run_test(self, 
                     test_id: str, 
@@ -531,36 +1309,46 @@ class StressTester:
                     duration: int, 
                     endpoints: List[str],
                     headers: Optional[Dict[str, str]] = None,
-                    payload_data: Optional[Dict[str, Any]] = None):
+                    payload_data: Optional[Dict[str, Any]] = None,
+                    record_samples: bool = False):
         """Run a simple stress test (backward compatibility)"""
         self.active_tests[test_id] = True
         self.results[test_id] = []
+        samples = SampleRecorder(test_id) if record_samples else None
         
-        async with httpx.AsyncClient() as client:
-            start_time = time.time()
-            request_interval = 1.0 / request_rate if request_rate > 0 else 0
-            
-            while time.time() - start_time < duration and self.active_tests.get(test_id, False):
-                tasks = []
-                for endpoint in endpoints:
-                    for _ in range(concurrent_users):
-                        # Convert target_url to string if it's not already
-                        target_url_str = str(target_url)
-                        task = self.execute_request(
-                            client=client,
-                            base_url=target_url_str,
-                            endpoint_path=endpoint.lstrip('/'),
-                            method="GET",
-                            headers=headers,
-                            json_data=payload_data
-                        )
-                        tasks.append(task)
-                
-                results = await asyncio.gather(*tasks)
-                self.results[test_id].extend(results)
+        try:
+            async with self._lease_client(test_id, target_url, concurrent_users * len(endpoints)) as client:
+                start_time = time.monotonic()
+                request_interval = 1.0 / request_rate if request_rate > 0 else 0
                 
-                if request_interval > 0:
-                    await asyncio.sleep(request_interval)
+                while time.monotonic() - start_time < duration and self.active_tests.get(test_id, False):
+                    tasks = []
+                    for endpoint in endpoints:
+                        for _ in range(concurrent_users):
+                            # Convert target_url to string if it's not already
+                            target_url_str = str(target_url)
+                            task = self.execute_request(
+                                client=client,
+                                base_url=target_url_str,
+                                endpoint_path=endpoint.lstrip('/'),
+                                method="GET",
+                                headers=headers,
+                                json_data=payload_data
+                            )
+                            tasks.append(task)
+                    
+                    results = await asyncio.gather(*tasks)
+                    self.results[test_id].extend(results)
+                    if samples is not None:
+                        # Tasks were created endpoint by endpoint, concurrent_users each
+                        for index, result in enumerate(results):
+                            samples.record(f"GET {endpoints[index // concurrent_users]}", result)
+                    
+                    if request_interval > 0:
+                        await asyncio.sleep(request_interval)
+        finally:
+            if samples is not None:
+                await asyncio.get_running_loop().run_in_executor(None, samples.close)
         
         self.active_tests[test_id] = False
         return self.results[test_id]
@@ -574,8 +1362,17 @@ class StressTester:
                              duration: int,
                              endpoints: List[Dict[str, Any]],
                              headers: Optional[Dict[str, str]] = None,
-                             endpoint_schemas: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
-        """Run an advanced stress test with the specified strategy"""
+                             endpoint_schemas: Optional[Dict[str, Any]] = None,
+                             load_mode: LoadMode = LoadMode.CLOSED_LOOP,
+                             arrival_distribution: ArrivalDistribution = ArrivalDistribution.FIXED,
+                             http2: bool = False,
+                             max_connections: Optional[int] = None,
+                             max_keepalive_connections: Optional[int] = None,
+                             worker_processes: Optional[int] = None,
+                             record_samples: bool = False,
+                             load_profile: Optional[Dict[str, Any]] = None,
+                             adaptive: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Run an advanced stress test with the specified strategy, or following a load profile"""
         # Store the test configuration
         self.test_configs[test_id] = {
             "target_url": target_url,
@@ -584,45 +1381,152 @@ class StressTester:
             "request_rate": request_rate,
             "duration": duration,
             "endpoints": endpoints,
-            "headers": headers
+            "headers": headers,
+            "load_mode": load_mode,
+            "arrival_distribution": arrival_distribution,
+            "http2": http2,
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "worker_processes": worker_processes,
+            "record_samples": record_samples,
+            "load_profile": load_profile,
+            "adaptive": adaptive
         }
         
-        # Choose the appropriate test strategy
-        if strategy == DistributionStrategy.SEQUENTIAL:
-            return await self.run_sequential_test(
-                test_id=test_id,
-                target_url=target_url,
-                endpoints=endpoints,
-                max_concurrent_users=max_concurrent_users,
-                request_rate=request_rate,
-                duration=duration,
-                headers=headers,
-                endpoint_schemas=endpoint_schemas
-            )
-        elif strategy == DistributionStrategy.INTERLEAVED:
-            return await self.run_interleaved_test(
-                test_id=test_id,
-                target_url=target_url,
-                endpoints=endpoints,
-                max_concurrent_users=max_concurrent_users,
-                request_rate=request_rate,
-                duration=duration,
-                headers=headers,
-                endpoint_schemas=endpoint_schemas
-            )
-        elif strategy == DistributionStrategy.RANDOM:
-            return await self.run_random_test(
-                test_id=test_id,
-                target_url=target_url,
-                endpoints=endpoints,
-                max_concurrent_users=max_concurrent_users,
-                request_rate=request_rate,
-                duration=duration,
-                headers=headers,
-                endpoint_schemas=endpoint_schemas
-            )
-        else:
-            raise ValueError(f"Unknown strategy: {strategy}")
+        # Requests run by worker processes only reach this process as aggregates, so
+        # raw samples are recorded for in-process requests only
+        samples = SampleRecorder(test_id) if record_samples else None
+        # Opened before anything is awaited so a client connecting right away sees the test
+        self.metrics_history[test_id] = MetricsRing()
+        self.live_metrics.open(test_id, history=self.metrics_history[test_id], samples=samples)
+        try:
+            # Load profiles drive users or arrivals from this event loop
+            if load_profile is not None:
+                return await self.run_profile_test(
+                    test_id=test_id,
+                    target_url=target_url,
+                    endpoints=endpoints,
+                    profile=LoadProfile.from_config(load_profile),
+                    max_concurrent_users=max_concurrent_users,
+                    headers=headers,
+                    endpoint_schemas=endpoint_schemas
+                )
+            
+            # The adaptive search holds virtual users on this event loop too
+            if strategy == DistributionStrategy.ADAPTIVE and load_mode != LoadMode.OPEN_LOOP:
+                return await self.run_adaptive_test(
+                    test_id=test_id,
+                    target_url=target_url,
+                    endpoints=endpoints,
+                    max_concurrent_users=max_concurrent_users,
+                    headers=headers,
+                    endpoint_schemas=endpoint_schemas,
+                    adaptive=adaptive
+                )
+            
+            if worker_processes and load_mode != LoadMode.OPEN_LOOP:
+                # Shard each batch across worker processes, each with its own event loop
+                pool = WorkerPool(worker_processes)
+                self.worker_pools[test_id] = pool
+                await pool.start()
+            
+            # Open-loop runs mix endpoints by weight at a fixed arrival rate
+            if load_mode == LoadMode.OPEN_LOOP:
+                return await self.run_constant_rate_test(
+                    test_id=test_id,
+                    target_url=target_url,
+                    endpoints=endpoints,
+                    max_concurrent_users=max_concurrent_users,
+                    request_rate=request_rate,
+                    duration=duration,
+                    headers=headers,
+                    endpoint_schemas=endpoint_schemas,
+                    arrival_distribution=arrival_distribution
+                )
+            
+            # Choose the appropriate test strategy
+            if strategy == DistributionStrategy.SEQUENTIAL:
+                return await self.run_sequential_test(
+                    test_id=test_id,
+                    target_url=target_url,
+                    endpoints=endpoints,
+                    max_concurrent_users=max_concurrent_users,
+                    request_rate=request_rate,
+                    duration=duration,
+                    headers=headers,
+                    endpoint_schemas=endpoint_schemas
+                )
+            elif strategy == DistributionStrategy.INTERLEAVED:
+                return await self.run_interleaved_test(
+                    test_id=test_id,
+                    target_url=target_url,
+                    endpoints=endpoints,
+                    max_concurrent_users=max_concurrent_users,
+                    request_rate=request_rate,
+                    duration=duration,
+                    headers=headers,
+                    endpoint_schemas=endpoint_schemas
+                )
+            elif strategy == DistributionStrategy.RANDOM:
+                return await self.run_random_test(
+                    test_id=test_id,
+                    target_url=target_url,
+                    endpoints=endpoints,
+                    max_concurrent_users=max_concurrent_users,
+                    request_rate=request_rate,
+                    duration=duration,
+                    headers=headers,
+                    endpoint_schemas=endpoint_schemas
+                )
+            else:
+                raise ValueError(f"Unknown strategy: {strategy}")
+        finally:
+            self.live_metrics.close(test_id)
+            self.request_pools.pop(test_id, None)
+            pool = self.worker_pools.pop(test_id, None)
+            if pool is not None:
+                await pool.close()
+            if samples is not None:
+                await asyncio.get_running_loop().run_in_executor(None, samples.close)
+            await self.finish_test(test_id)
+    
+    async def finish_test(self, test_id: str):
+        """Store a finished test's results and evict stale in-memory test state.
+        
+        Only tests that were stored are ever evicted; load_advanced_results and
+        load_test_progress read evicted tests back from the store.
+        """
+        if self.results_store is not None and test_id in self.results:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                    self.results_store.save,
+                    self.get_advanced_results(test_id),
+                    completed_requests=self.completed_requests.get(test_id, 0),
+                    session_config_id=self.session_config_ids.get(test_id)
+                ))
+            except Exception as e:
+                logger.error(f"Could not store results of test {test_id}: {str(e)}")
+            else:
+                self.hot_tests[test_id] = time.monotonic()
+        self._evict_hot_tests()
+    
+    def _touch(self, test_id: str):
+        if test_id in self.hot_tests:
+            self.hot_tests[test_id] = time.monotonic()
+            self.hot_tests.move_to_end(test_id)
+    
+    def _evict_hot_tests(self):
+        """Drop stored tests beyond max_hot_tests or unused for hot_test_ttl seconds"""
+        now = time.monotonic()
+        while self.hot_tests:
+            test_id, last_used = next(iter(self.hot_tests.items()))
+            if len(self.hot_tests) <= self.max_hot_tests and now - last_used < self.hot_test_ttl:
+                break
+            del self.hot_tests[test_id]
+            for state in (self.active_tests, self.results, self.test_configs, self.test_start_times,
+                          self.test_end_times, self.completed_requests, self.schedule_stats,
+                          self.knee_stats, self.agent_stats, self.metrics_history, self.session_config_ids):
+                state.pop(test_id, None)
 
     def stop_test(self, test_id: str):
         if test_id in self.active_tests:
@@ -633,50 +1537,39 @@ class StressTester:
     def get_results(self, test_id: str) -> List[Dict[str, Any]]:
         return self.results.get(test_id, [])
     
+    async def load_advanced_results(self, test_id: str) -> Dict[str, Any]:
+        """get_advanced_results, reading evicted tests back from the results store off the event loop"""
+        if test_id in self.results or self.results_store is None:
+            return self.get_advanced_results(test_id)
+        stored = await asyncio.get_running_loop().run_in_executor(None, self.results_store.load, test_id)
+        return stored if stored is not None else {}
+    
     def get_advanced_results(self, test_id: str) -> Dict[str, Any]:
-        """Get results from an advanced test"""
+        """Get results from an advanced test held in memory"""
         if test_id not in self.results:
             return {}
+        self._touch(test_id)
         
         results = self.results[test_id]
         config = self.test_configs.get(test_id, {})
         start_time = self.test_start_times.get(test_id)
         end_time = self.test_end_times.get(test_id)
         
-        # Calculate summary statistics
-        total_requests = 0
-        successful_requests = 0
-        failed_requests = 0
-        total_response_time = 0
-        response_times = []
-        
-        # Process all endpoint results
-        for endpoint, endpoint_results in results.items():
-            for result in endpoint_results:
-                total_requests += result.success_count + result.failure_count
-                successful_requests += result.success_count
-                failed_requests += result.failure_count
-                
-                # Calculate response time metrics if available
-                if result.success_count > 0:
-                    total_response_time += result.avg_response_time * result.success_count
-                    response_times.extend([result.avg_response_time] * result.success_count)
-        
-        # Calculate overall metrics
-        avg_response_time = total_response_time / successful_requests if successful_requests > 0 else 0
-        min_response_time = min(response_times) if response_times else 0
-        max_response_time = max(response_times) if response_times else 0
-        
-        # Create summary
-        summary = {
-            "total_requests": total_requests,
-            "successful_requests": successful_requests,
-            "failed_requests": failed_requests,
-            "success_rate": (successful_requests / total_requests * 100) if total_requests > 0 else 0,
-            "avg_response_time": avg_response_time,
-            "min_response_time": min_response_time,
-            "max_response_time": max_response_time
-        }
+        # Merge per-level histograms into run-wide and per-endpoint distributions
+        summary = summarize_results(results, start_time, end_time,
+                                    self.metrics_history.get(test_id), self.live_metrics.window)
+        
+        # Report how well an open-loop run kept to its arrival schedule
+        if test_id in self.schedule_stats:
+            summary["schedule"] = self.schedule_stats[test_id]
+        
+        # Report the knee point found by an adaptive search
+        if test_id in self.knee_stats:
+            summary["knee"] = self.knee_stats[test_id].to_dict()
+        
+        # Report which load agents took part in a distributed run
+        if test_id in self.agent_stats:
+            summary["agents"] = self.agent_stats[test_id]
         
         return {
             "test_id": test_id,
@@ -687,8 +1580,24 @@ class StressTester:
             "end_time": end_time
         }
     
+    async def load_test_progress(self, test_id: str) -> Dict[str, Any]:
+        """get_test_progress, reading evicted tests back from the results store off the event loop"""
+        if test_id in self.active_tests or self.results_store is None:
+            return self.get_test_progress(test_id)
+        stored = await asyncio.get_running_loop().run_in_executor(None, self.results_store.load, test_id)
+        if stored is None:
+            return self.get_test_progress(test_id)
+        start_time, end_time = stored["start_time"], stored["end_time"]
+        return {
+            "test_id": test_id,
+            "status": "completed",
+            "elapsed_time": (end_time - start_time).total_seconds() if start_time and end_time else 0,
+            "completed_requests": stored["completed_requests"],
+            "results_available": True
+        }
+    
     def get_test_progress(self, test_id: str) -> Dict[str, Any]:
-        """Get the progress of a running test"""
+        """Get the progress of a test held in memory"""
         if test_id not in self.active_tests:
             return {
                 "test_id": test_id,
@@ -1,7 +1,16 @@
 import pytest
 import asyncio
+import atexit
+import os
+import shutil
+import tempfile
 from typing import Generator
 
+# Keep the app, and the agent processes some tests spawn, off data/stress_api.db
+_database_dir = tempfile.mkdtemp(prefix="stress_api_tests_")
+atexit.register(shutil.rmtree, _database_dir, ignore_errors=True)
+os.environ.setdefault("STRESS_API_DATABASE_URL", f"sqlite:///{_database_dir}/stress_api.db")
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
     """Create an instance of the default event loop for each test case."""
@@ -4,6 +4,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 import sys
 import os
 import json
+import uuid
 from datetime import datetime
 
 # Add the parent directory to the path so we can import our modules
@@ -277,5 +278,38 @@ class TestAPIEndpoints(unittest.TestCase):
         self.assertIn("start_time", data)
 
 
+    @patch('main.start_advanced_test', new_callable=AsyncMock)
+    @patch('main.get_session_config')
+    def test_run_session_configuration_merges_query(self, mock_get_config, mock_start):
+        """Test that saved request parameters join the endpoint URL's own query string"""
+        # Setup
+        mock_get_config.return_value = MagicMock(
+            id=uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            endpoint_url="https://example.com/search?sort=asc",
+            http_method="get",
+            request_params={"q": "a b", "page": 2},
+            request_headers=None,
+            request_body=None,
+            concurrent_users=5,
+            ramp_up_time=1,
+            test_duration=10,
+            think_time=0
+        )
+        mock_start.return_value = {
+            "test_id": "t-1",
+            "status": "running",
+            "config": {"target_url": "https://example.com", "concurrent_users": 5, "request_rate": 5, "duration": 10, "endpoints": ["GET /search"]},
+            "start_time": datetime.now().isoformat()
+        }
+
+        # Execute
+        self.client.post("/api/sessions/configuration/12345678-1234-5678-1234-567812345678/run")
+
+        # Assert
+        config = mock_start.await_args.args[0]
+        self.assertEqual(config.endpoints[0].path, "/search?sort=asc&q=a+b&page=2")
+        self.assertIsNone(config.endpoints[0].custom_parameters)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -177,5 +177,74 @@ class TestRequestDataGenerator(unittest.TestCase):
                 self.assertIn(role, ["admin", "user", "guest"])
 
 
+    def test_compile_schema_is_cached(self):
+        """Test that a schema is compiled once per content and recompiled after an in-place edit"""
+        # Setup
+        schema = {"type": "object", "properties": {"id": {"type": "integer"}}, "required": ["id"]}
+        
+        # Execute
+        first = self.generator.compile_schema(schema)
+        same_object = self.generator.compile_schema(schema)
+        equal_copy = self.generator.compile_schema({"type": "object", "properties": {"id": {"type": "integer"}}, "required": ["id"]})
+        as_array = self.generator.compile_schema(schema, 'array')
+        schema["properties"]["id"]["type"] = "string"
+        edited = self.generator.compile_schema(schema)
+        
+        # Assert
+        self.assertIs(first, same_object)
+        self.assertIs(first, equal_copy)
+        self.assertIsNot(first, as_array)
+        self.assertIsNot(first, edited)
+        self.assertIsInstance(edited()["id"], str)
+        
+    def test_generate_many(self):
+        """Test batch generation from one compiled schema"""
+        # Setup
+        schema = {
+            "type": "object",
+            "properties": {
+                "status": {"type": "string", "enum": ["active", "inactive"]},
+                "tags": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["status", "tags"]
+        }
+        
+        # Execute
+        results = self.generator.generate_many(schema, 50)
+        
+        # Assert
+        self.assertEqual(len(results), 50)
+        for result in results:
+            self.assertIn(result["status"], ["active", "inactive"])
+            self.assertTrue(1 <= len(result["tags"]) <= 3)
+            
+    def test_compiled_object_requires_object_type(self):
+        """Test that request data for a non-object schema stays empty, as before compiling"""
+        # Execute
+        result = self.generator.generate_request_data({"type": "string"})
+        
+        # Assert
+        self.assertEqual(result, {})
+
+    def test_seeded_faker_makes_primitives_reproducible(self):
+        """Test that seeding Faker repeats compiled integers, numbers and booleans"""
+        # Setup
+        schema = {
+            "type": "object",
+            "properties": {"count": {"type": "integer"}, "score": {"type": "number"}, "active": {"type": "boolean"}},
+            "required": ["count", "score", "active"]
+        }
+        other = RequestDataGenerator()
+        
+        # Execute
+        self.generator.fake.seed_instance(7)
+        other.fake.seed_instance(7)
+        first = self.generator.generate_many(schema, 20) + [self.generator.generate_primitive("integer")]
+        second = other.generate_many(schema, 20) + [other.generate_primitive("integer")]
+        
+        # Assert
+        self.assertEqual(first, second)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
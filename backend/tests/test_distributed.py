@@ -0,0 +1,236 @@
+import unittest
+import asyncio
+import socket
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+
+from distributed import DistributedCoordinator, LoadAgent, merge_endpoint_results, serialize_results, shard_config
+from stress_tester import EndpointStats, StressTester
+from api_models import DistributionStrategy
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestDistributedMerging(unittest.TestCase):
+    def test_merge_endpoint_results(self):
+        """Test that per-agent results merge counts and recompute percentiles from histograms"""
+        # Setup
+        first = EndpointStats()
+        second = EndpointStats()
+        for value in (0.1, 0.2):
+            first.record({"success": True, "status_code": 200, "response_time": value})
+        second.record({"success": True, "status_code": 200, "response_time": 0.4})
+        second.record({"success": False, "status_code": 503, "error_message": "busy"})
+
+        # Execute
+        merged = merge_endpoint_results("GET /items", [
+            first.to_endpoint_result("GET /items", 2),
+            second.to_endpoint_result("GET /items", 2)
+        ])
+
+        # Assert
+        self.assertEqual(merged.concurrent_requests, 4)
+        self.assertEqual(merged.success_count, 3)
+        self.assertEqual(merged.failure_count, 1)
+        self.assertEqual(merged.status_codes, {"200": 3, "503": 1})
+        self.assertEqual(merged.max_response_time, 0.4)
+        self.assertAlmostEqual(merged.avg_response_time, (0.1 + 0.2 + 0.4) / 3, places=6)
+        self.assertEqual(merged.error_message, "busy")
+
+    def test_merge_keeps_phase(self):
+        """Test that merging the agents' rows for a load profile phase keeps the phase name"""
+        # Setup
+        stats = EndpointStats()
+        stats.record({"success": True, "status_code": 200, "response_time": 0.1})
+        rows = [stats.to_endpoint_result("GET /items", users) for users in (3, 2)]
+        for row in rows:
+            row.phase = "steady"
+
+        # Execute
+        merged = merge_endpoint_results("GET /items", rows)
+
+        # Assert
+        self.assertEqual(merged.phase, "steady")
+        self.assertEqual(merged.concurrent_requests, 5)
+
+    def test_shard_config(self):
+        """Test that users, rate and connection limits are split between agents"""
+        # Setup
+        config = {"max_concurrent_users": 10, "request_rate": 100, "max_connections": 10}
+
+        # Execute
+        shards = shard_config(config, 3)
+        few_users = shard_config(dict(config, max_concurrent_users=2), 3)
+
+        # Assert
+        self.assertEqual([shard["max_concurrent_users"] for shard in shards], [4, 3, 3])
+        self.assertEqual([shard["request_rate"] for shard in shards], [40, 30, 30])
+        self.assertEqual([shard["max_connections"] for shard in shards], [4, 3, 3])
+        self.assertEqual(len(few_users), 2)
+
+    def test_collect_merges_levels_by_position(self):
+        """Test that agents' shares of one level merge into one row even when their concurrency differs"""
+        # Setup: 101 users split 51/50, so the last level differs between the agents
+        def agent_results(levels):
+            rows = []
+            for users in levels:
+                stats = EndpointStats()
+                stats.record({"success": True, "status_code": 200, "response_time": 0.1})
+                rows.append(stats.to_endpoint_result("GET /items", users))
+            return {"results": serialize_results({"GET /items": rows})}
+
+        replies = {"http://a": agent_results([1, 51]), "http://b": agent_results([1, 50])}
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, json=replies[f"http://{request.url.host}"])
+        )
+        stress_tester = StressTester()
+        coordinator = DistributedCoordinator(stress_tester)
+        agents = [{"url": url, "status": "completed", "last_seen": 0} for url in replies]
+
+        async def collect():
+            async with httpx.AsyncClient(transport=transport) as client:
+                await coordinator._collect(client, "dist-levels", agents)
+
+        # Execute
+        asyncio.run(collect())
+
+        # Assert
+        levels = stress_tester.results["dist-levels"]["GET /items"]
+        self.assertEqual([level.concurrent_requests for level in levels], [2, 101])
+        self.assertEqual([level.success_count for level in levels], [2, 2])
+
+    def test_agent_refuses_adaptive_shard(self):
+        """Test that an agent rejects the adaptive strategy instead of running it without its settings"""
+        # Setup
+        agent = LoadAgent(StressTester())
+
+        # Execute / Assert
+        with self.assertRaises(ValueError):
+            agent.start_test("adaptive-1", 0, {"strategy": DistributionStrategy.ADAPTIVE.value})
+        self.assertIsNone(agent.status("adaptive-1"))
+
+    def test_shard_config_apportions_profile_users(self):
+        """Test that a users profile's target and points are split into whole users adding up to the original"""
+        # Setup
+        config = {
+            "max_concurrent_users": 10,
+            "request_rate": 100,
+            "load_profile": {"shape": "custom", "driver": "users", "target": 5,
+                             "points": [{"at": 0, "value": 2}, {"at": 10, "value": 5}]}
+        }
+
+        # Execute
+        shards = shard_config(config, 3)
+        rate_shards = shard_config(dict(config, load_profile=dict(config["load_profile"], driver="rate")), 3)
+
+        # Assert
+        self.assertEqual([shard["load_profile"]["target"] for shard in shards], [2, 2, 1])
+        self.assertEqual([[point["value"] for point in shard["load_profile"]["points"]] for shard in shards],
+                         [[1, 2], [1, 2], [0, 1]])
+        self.assertAlmostEqual(sum(shard["load_profile"]["target"] for shard in rate_shards), 5)
+        self.assertAlmostEqual(rate_shards[0]["load_profile"]["target"], 2)
+
+
+class TestDistributedCoordinator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Two local agent processes running this backend
+        cls.agents = []
+        cls.agent_urls = []
+        for _ in range(2):
+            port = _free_port()
+            cls.agents.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+                cwd=BACKEND_DIR,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            ))
+            cls.agent_urls.append(f"http://127.0.0.1:{port}")
+
+        deadline = time.monotonic() + 30
+        for url in cls.agent_urls:
+            while True:
+                try:
+                    if httpx.get(f"{url}/health").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Agent at {url} did not start")
+                time.sleep(0.2)
+
+        # A local target for the agents to load
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.target_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        for agent in cls.agents:
+            agent.terminate()
+            agent.wait()
+
+    def test_run_across_local_agents(self):
+        """Test a sequential test split over two agents and merged by concurrency level"""
+        # Setup
+        stress_tester = StressTester()
+        coordinator = DistributedCoordinator(stress_tester, heartbeat_interval=0.2, start_delay=0.2)
+        unreachable = f"http://127.0.0.1:{_free_port()}"
+        config = {
+            "target_url": self.target_url,
+            "strategy": DistributionStrategy.SEQUENTIAL,
+            "max_concurrent_users": 4,
+            "request_rate": 10,
+            "duration": 1,
+            "endpoints": [{"path": "/ping", "method": "GET"}]
+        }
+
+        # Execute
+        results = asyncio.run(coordinator.run_advanced_test(
+            "dist-1", self.agent_urls + [unreachable], config
+        ))
+        summary = stress_tester.get_advanced_results("dist-1")["summary"]
+
+        # Assert
+        levels = results["GET /ping"]
+        self.assertEqual([level.concurrent_requests for level in levels], [2, 4])
+        self.assertEqual([level.success_count for level in levels], [2, 4])
+        self.assertEqual(summary["total_requests"], 6)
+        statuses = {agent["url"]: agent["status"] for agent in summary["agents"]}
+        self.assertEqual(statuses[unreachable], "unreachable")
+        for url in self.agent_urls:
+            self.assertEqual(statuses[url], "completed")
+        skews = [agent["start_skew"] for agent in summary["agents"] if "start_skew" in agent]
+        self.assertEqual(len(skews), 2)
+        self.assertLess(max(skews), 0.5)
+        self.assertEqual(stress_tester.get_test_progress("dist-1")["status"], "completed")
+
+
+if __name__ == '__main__':
+    unittest.main()
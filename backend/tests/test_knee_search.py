@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from knee_search import KneeSearch, is_stable
+
+
+def _search(knee: int, max_level: int, resolution: float = 0.05):
+    """Drive a search against a server that meets the SLO up to knee users"""
+    search = KneeSearch(max_level, resolution)
+    probed = []
+    level = search.next_level()
+    while level is not None:
+        probed.append(level)
+        search.report(level, level <= knee, {"rps": level * 10.0})
+        level = search.next_level()
+    return search, probed
+
+
+class TestKneeSearch(unittest.TestCase):
+    def test_doubles_then_bisects_to_the_knee(self):
+        """Test that load doubles until a breach and bisection finds the last passing level"""
+        # Execute
+        search, probed = _search(knee=45, max_level=1000, resolution=0)
+
+        # Assert
+        self.assertEqual(probed[:7], [1, 2, 4, 8, 16, 32, 64])
+        self.assertEqual(probed[7:], [48, 40, 44, 46, 45])
+        self.assertEqual(search.knee, 45)
+        summary = search.to_dict()
+        self.assertEqual(summary["breached_at"], 46)
+        self.assertTrue(summary["saturated"])
+        self.assertEqual(summary["rps"], 450.0)
+        self.assertEqual(len(summary["probes"]), len(probed))
+
+    def test_resolution_and_limits(self):
+        """Test that resolution stops the search early and max_level and first-level breaches are reported"""
+        # Execute
+        coarse, _ = _search(knee=450, max_level=1000, resolution=0.1)
+        unsaturated, probed = _search(knee=1000, max_level=100)
+        overloaded, _ = _search(knee=0, max_level=100)
+
+        # Assert
+        self.assertLessEqual(coarse.knee, 450)
+        self.assertLessEqual(coarse.to_dict()["breached_at"] - coarse.knee, coarse.knee * 0.1 + 1)
+        self.assertEqual(probed[-1], 100)
+        self.assertEqual(unsaturated.knee, 100)
+        self.assertFalse(unsaturated.to_dict()["saturated"])
+        self.assertEqual(overloaded.knee, 0)
+        self.assertIsNone(overloaded.to_dict()["rps"])
+
+    def test_is_stable(self):
+        """Test that window latencies are stable only when their spread is within tolerance"""
+        # Execute / Assert
+        self.assertTrue(is_stable([0.100, 0.105, 0.098], 0.1))
+        self.assertFalse(is_stable([0.1, 0.2, 0.4], 0.1))
+        self.assertFalse(is_stable([0.1, None, 0.1], 0.1))
+        self.assertFalse(is_stable([0.1], 0.1))
+        self.assertTrue(is_stable([0.0, 0.0], 0.1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from latency_histogram import LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def setUp(self):
+        self.histogram = LatencyHistogram()
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram reports zeros"""
+        # Assert
+        self.assertEqual(self.histogram.count, 0)
+        self.assertEqual(self.histogram.mean, 0.0)
+        self.assertEqual(self.histogram.percentile(99), 0.0)
+
+    def test_exact_min_max_and_mean(self):
+        """Test that min, max and mean are exact rather than bucketed"""
+        # Execute
+        for value in (0.1, 0.2, 0.3):
+            self.histogram.record(value)
+
+        # Assert
+        self.assertEqual(self.histogram.count, 3)
+        self.assertEqual(self.histogram.min_value, 0.1)
+        self.assertEqual(self.histogram.max_value, 0.3)
+        self.assertAlmostEqual(self.histogram.mean, 0.2, places=10)
+
+    def test_percentiles_within_precision(self):
+        """Test that percentiles stay within the histogram's relative error"""
+        # Setup
+        rng = random.Random(42)
+        values = sorted(rng.uniform(0.001, 2.0) for _ in range(10000))
+        for value in values:
+            self.histogram.record(value)
+
+        # Execute / Assert
+        for percent in (50, 90, 99, 99.9):
+            exact = values[int(len(values) * percent / 100) - 1]
+            self.assertAlmostEqual(self.histogram.percentile(percent), exact, delta=exact * 0.02)
+
+    def test_memory_is_bounded(self):
+        """Test that recording many values does not grow the bucket count past the value range"""
+        # Execute
+        for i in range(200000):
+            self.histogram.record(0.05 + (i % 1000) / 10000)
+
+        # Assert
+        self.assertEqual(self.histogram.count, 200000)
+        self.assertLess(len(self.histogram.buckets), 1000)
+
+    def test_merge(self):
+        """Test that merging two histograms matches recording into one"""
+        # Setup
+        other = LatencyHistogram()
+        combined = LatencyHistogram()
+        for i in range(1, 500):
+            self.histogram.record(i / 1000)
+            combined.record(i / 1000)
+        for i in range(500, 1000):
+            other.record(i / 1000)
+            combined.record(i / 1000)
+
+        # Execute
+        self.histogram.merge(other)
+
+        # Assert
+        self.assertEqual(self.histogram.buckets, combined.buckets)
+        self.assertEqual(self.histogram.count, combined.count)
+        self.assertEqual(self.histogram.max_value, 0.999)
+        self.assertEqual(self.histogram.percentile(90), combined.percentile(90))
+
+    def test_round_trip_dict(self):
+        """Test serializing and restoring a histogram"""
+        # Setup
+        for value in (0.01, 0.5, 1.5):
+            self.histogram.record(value)
+
+        # Execute
+        restored = LatencyHistogram.from_dict(self.histogram.to_dict())
+
+        # Assert
+        self.assertEqual(restored.buckets, self.histogram.buckets)
+        self.assertEqual(restored.min_value, 0.01)
+        self.assertEqual(restored.percentile(50), self.histogram.percentile(50))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from live_metrics import LiveChannel, LiveMetricsHub
+
+
+def _result(status_code: int, response_time: float):
+    return {"status_code": status_code, "success": status_code < 400, "response_time": response_time}
+
+
+class TestLiveMetrics(unittest.TestCase):
+    def test_flush_aggregates_window(self):
+        """Test that a frame reports rate, errors by status and latency for the window, then resets"""
+        # Setup
+        channel = LiveChannel("test-1")
+        for _ in range(8):
+            channel.record("GET /a", _result(200, 0.010))
+        channel.record("GET /a", _result(503, 0.5))
+        channel.record("POST /b", RuntimeError("connection reset"))
+        channel.add_in_flight("POST /b", 3)
+
+        # Execute
+        frame = channel.flush()
+        next_frame = channel.flush()
+
+        # Assert
+        self.assertEqual(frame["requests"], 10)
+        self.assertEqual(frame["errors"], 2)
+        self.assertEqual(frame["errorsByStatus"], {"503": 1, "0": 1})
+        self.assertEqual(frame["inFlight"], 3)
+        self.assertGreater(frame["rps"], 0)
+        by_endpoint = {series["endpoint"]: series for series in frame["endpoints"]}
+        self.assertEqual(by_endpoint["GET /a"]["requests"], 9)
+        self.assertAlmostEqual(by_endpoint["GET /a"]["p50ResponseTime"], 10.0, delta=0.1)
+        self.assertEqual(by_endpoint["POST /b"]["successRate"], 0.0)
+        self.assertEqual(next_frame["requests"], 0)
+        self.assertEqual(next_frame["totalRequests"], 10)
+        self.assertEqual(next_frame["inFlight"], 3)
+
+    def test_track_counts_in_flight(self):
+        """Test that tracked requests are in flight while running and recorded when done"""
+        # Setup
+        channel = LiveChannel("test-1")
+        release = None
+        seen_in_flight = []
+
+        async def request():
+            await release.wait()
+            return _result(200, 0.001)
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            tasks = [asyncio.ensure_future(channel.track("GET /a", request())) for _ in range(4)]
+            await asyncio.sleep(0)
+            seen_in_flight.append(channel.in_flight["GET /a"])
+            release.set()
+            await asyncio.gather(*tasks)
+
+        # Execute
+        asyncio.run(run())
+
+        # Assert
+        self.assertEqual(seen_in_flight, [4])
+        self.assertEqual(channel.in_flight["GET /a"], 0)
+        self.assertEqual(channel.windows["GET /a"].requests, 4)
+
+    def test_subscribers_get_frames_until_close(self):
+        """Test that subscribers receive published frames, the final frame and an end marker"""
+        # Setup
+        hub = LiveMetricsHub(window=0.05)
+
+        async def run():
+            channel = hub.open("test-1")
+            queue = hub.subscribe("test-1")
+            channel.record("GET /a", _result(200, 0.002))
+            first = await asyncio.wait_for(queue.get(), timeout=1)
+            hub.close("test-1")
+            frames = [first]
+            while True:
+                frame = await asyncio.wait_for(queue.get(), timeout=1)
+                if frame is None:
+                    break
+                frames.append(frame)
+            late = hub.subscribe("test-1")
+            return frames, [late.get_nowait(), late.get_nowait()]
+
+        # Execute
+        frames, late_frames = asyncio.run(run())
+
+        # Assert
+        self.assertEqual(frames[0]["status"], "running")
+        self.assertEqual(frames[0]["requests"], 1)
+        self.assertEqual(frames[-1]["status"], "completed")
+        self.assertIsNone(hub.channel("test-1"))
+        self.assertTrue(hub.has_test("test-1"))
+        self.assertEqual(late_frames[0]["status"], "completed")
+        self.assertIsNone(late_frames[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
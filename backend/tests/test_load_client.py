@@ -0,0 +1,91 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from load_client import LoadClientPool
+
+
+class TestLoadClientPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = LoadClientPool()
+
+    def test_limits_follow_concurrency(self):
+        """Test that the pool is sized from the test's concurrency rather than httpx defaults"""
+        # Execute
+        limits = self.pool.limits_for(500)
+
+        # Assert
+        self.assertEqual(limits.max_connections, 500)
+        self.assertEqual(limits.max_keepalive_connections, 500)
+
+    def test_limits_overrides(self):
+        """Test explicit connection and keep-alive limits"""
+        # Execute
+        limits = self.pool.limits_for(500, max_connections=50, max_keepalive_connections=200)
+
+        # Assert
+        self.assertEqual(limits.max_connections, 50)
+        self.assertEqual(limits.max_keepalive_connections, 50)
+
+    def test_client_is_shared_per_target(self):
+        """Test that leases for the same target and settings reuse one client"""
+        async def run():
+            async with self.pool.lease("http://example.com/api", 10) as first:
+                async with self.pool.lease("http://example.com/other", 10) as second:
+                    same = first is second
+            async with self.pool.lease("http://example.com", 10) as third:
+                reused = third is first
+            async with self.pool.lease("http://other.example.com", 10) as fourth:
+                separate = fourth is not first
+            await self.pool.aclose()
+            return same, reused, separate
+
+        # Execute
+        same, reused, separate = asyncio.run(run())
+
+        # Assert
+        self.assertTrue(same)
+        self.assertTrue(reused)
+        self.assertTrue(separate)
+
+    def test_idle_client_is_resized(self):
+        """Test that an idle client is replaced when a test needs a larger pool"""
+        async def run():
+            async with self.pool.lease("http://example.com", 10) as small:
+                pass
+            async with self.pool.lease("http://example.com", 100) as large:
+                return small.is_closed, large is small
+
+        # Execute
+        small_closed, reused = asyncio.run(run())
+
+        # Assert
+        self.assertTrue(small_closed)
+        self.assertFalse(reused)
+
+    def test_busy_client_is_not_resized(self):
+        """Test that a client in use is not closed when another test needs other settings"""
+        async def run():
+            async with self.pool.lease("http://example.com", 10) as shared:
+                async with self.pool.lease("http://example.com", 100) as private:
+                    distinct = private is not shared
+                private_closed = private.is_closed
+                shared_open = not shared.is_closed
+            await self.pool.aclose()
+            return distinct, private_closed, shared_open
+
+        # Execute
+        distinct, private_closed, shared_open = asyncio.run(run())
+
+        # Assert
+        self.assertTrue(distinct)
+        self.assertTrue(private_closed)
+        self.assertTrue(shared_open)
+
+
+if __name__ == '__main__':
+    unittest.main()
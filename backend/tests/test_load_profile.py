@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from load_profile import LoadProfile
+
+
+class TestLoadProfile(unittest.TestCase):
+    def test_ramp_profile(self):
+        """Test that a ramp profile climbs linearly, holds and comes back down"""
+        # Setup
+        profile = LoadProfile.from_config({"shape": "ramp", "target": 10, "ramp_up": 10, "steady": 20, "ramp_down": 5})
+
+        # Execute
+        values = [profile.value_at(t) for t in (0, 5, 10, 25, 32.5, 35)]
+        phases = [profile.phase_at(t) for t in (5, 10, 32.5)]
+
+        # Assert
+        self.assertEqual(profile.duration, 35)
+        self.assertEqual(values, [0, 5, 10, 10, 5, 0])
+        self.assertEqual(phases, ["ramp_up", "steady", "ramp_down"])
+        self.assertEqual(profile.phases(), ["ramp_up", "steady", "ramp_down"])
+
+    def test_step_and_spike_profiles_jump(self):
+        """Test that step and spike profiles change load instantly at their boundaries"""
+        # Setup
+        step = LoadProfile.from_config({"shape": "step", "target": 8, "ramp_up": 8, "steady": 4, "steps": 4})
+        spike = LoadProfile.from_config({"shape": "spike", "target": 10, "steady": 30, "spike_duration": 10, "spike_multiplier": 3})
+
+        # Execute / Assert
+        self.assertEqual([step.value_at(t) for t in (0, 1.9, 2, 7.9, 8, 11.9)], [2, 2, 4, 8, 8, 8])
+        self.assertEqual([spike.value_at(t) for t in (0, 9.9, 10, 19.9, 20)], [10, 10, 30, 30, 10])
+        self.assertEqual(spike.phase_at(15), "spike")
+        self.assertEqual(spike.phases(), ["steady", "spike"])
+
+    def test_custom_profile(self):
+        """Test that custom points interpolate, carry their phase forward and must be ordered"""
+        # Setup
+        profile = LoadProfile.from_config({"shape": "custom", "points": [
+            {"at": 0, "value": 1, "phase": "warm"},
+            {"at": 4, "value": 5, "phase": "hot"},
+            {"at": 8, "value": 5}
+        ]})
+
+        # Execute / Assert
+        self.assertEqual(profile.value_at(2), 3)
+        self.assertEqual(profile.phase_at(6), "hot")
+        self.assertEqual(profile.phases(), ["warm", "hot"])
+        with self.assertRaises(ValueError):
+            LoadProfile.from_config({"shape": "custom", "points": [{"at": 4, "value": 1}, {"at": 0, "value": 1}]})
+        with self.assertRaises(ValueError):
+            LoadProfile.from_config({"shape": "ramp", "target": 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
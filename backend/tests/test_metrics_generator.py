@@ -5,7 +5,10 @@ import asyncio
 from typing import List, Dict, Any
 import json
 
-from metrics_generator import MetricsGenerator, MetricsManager, EndpointMetrics
+from metrics_generator import CLIENT_QUEUE_SIZE, MetricsGenerator, MetricsManager, EndpointMetrics
+from live_metrics import LiveMetricsHub
+from metrics_history import MetricsRing
+from metrics_protocol import decode_message
 from main import app
 
 class MockWebSocket:
@@ -19,6 +22,9 @@ class MockWebSocket:
     async def send_json(self, data: Dict[str, Any]):
         self.sent_messages.append(data)
 
+    async def send_text(self, data: str):
+        self.sent_messages.append(json.loads(data))
+
     async def close(self):
         self.closed = True
 
@@ -80,9 +86,11 @@ async def test_metrics_manager():
     await manager.connect_client(test_id, websocket)
     assert test_id in manager.active_connections
     assert websocket in manager.active_connections[test_id]
+    sender = asyncio.create_task(manager.serve_client(test_id, websocket))
     
     # Test broadcasting
     await manager.broadcast_metrics(test_id)
+    await asyncio.sleep(0.01)
     assert len(websocket.sent_messages) > 0
     
     metrics_data = websocket.sent_messages[0]
@@ -96,8 +104,10 @@ async def test_metrics_manager():
         assert "successRate" in metric
     
     # Test disconnection
+    sender.cancel()
     await manager.disconnect_client(test_id, websocket)
     assert test_id not in manager.active_connections
+    assert test_id not in manager.producers
     assert websocket.closed
 
 @pytest.mark.asyncio
@@ -111,11 +121,79 @@ async def test_multiple_clients():
     await manager.connect_client(test_id, websocket1)
     await manager.connect_client(test_id, websocket2)
     assert len(manager.active_connections[test_id]) == 2
+    assert len(manager.producers) == 1
+    senders = [asyncio.create_task(manager.serve_client(test_id, ws)) for ws in (websocket1, websocket2)]
     
     # Broadcast to multiple clients
     await manager.broadcast_metrics(test_id)
+    await asyncio.sleep(0.01)
     assert len(websocket1.sent_messages) == len(websocket2.sent_messages)
     assert websocket1.sent_messages[0] == websocket2.sent_messages[0]
+    for sender in senders:
+        sender.cancel()
+    manager.stop_test(test_id)
+
+@pytest.mark.asyncio
+async def test_slow_client_drops_oldest_frames():
+    manager = MetricsManager(interval=3600)
+    test_id = "test-123"
+    slow = MockWebSocket()
+    fast = MockWebSocket()
+    await manager.connect_client(test_id, slow)
+    await manager.connect_client(test_id, fast)
+    sender = asyncio.create_task(manager.serve_client(test_id, fast))
+    
+    # The slow client never drains its queue while frames keep coming
+    for _ in range(CLIENT_QUEUE_SIZE * 2):
+        await manager.broadcast_metrics(test_id)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    
+    assert manager.client_queues[slow].qsize() == CLIENT_QUEUE_SIZE
+    assert manager.dropped_frames >= CLIENT_QUEUE_SIZE
+    assert len(fast.sent_messages) >= CLIENT_QUEUE_SIZE * 2
+    sender.cancel()
+    manager.stop_test(test_id)
+
+@pytest.mark.asyncio
+async def test_backfill_only_for_protocol_clients():
+    hub = LiveMetricsHub(window=3600)
+    channel = hub.open("live-123", history=MetricsRing())
+    channel.flush()
+    manager = MetricsManager(hub=hub)
+    plain = MockWebSocket()
+    versioned = MockWebSocket()
+    
+    await manager.connect_client("live-123", plain)
+    await manager.connect_client("live-123", versioned, manager.stream_profile(protocol=1))
+    
+    # Plain JSON clients keep getting live frames only
+    assert manager.client_queues[plain].empty()
+    assert decode_message(manager.client_queues[versioned].get_nowait())["type"] == "backfill"
+    manager.stop_test("live-123")
+    hub.close("live-123")
+
+@pytest.mark.asyncio
+async def test_live_frames_keep_plain_list_shape():
+    hub = LiveMetricsHub(window=3600)
+    channel = hub.open("live-456")
+    manager = MetricsManager(hub=hub)
+    plain = MockWebSocket()
+    await manager.connect_client("live-456", plain)
+    sender = asyncio.create_task(manager.serve_client("live-456", plain))
+    await asyncio.sleep(0.01)
+    
+    channel.record("GET /a", {"success": True, "status_code": 200, "response_time": 0.01})
+    channel.publish(channel.flush())
+    await asyncio.sleep(0.01)
+    
+    # Plain clients get the per-endpoint list the frontend parses, not the protocol frame
+    assert plain.sent_messages[0][0]["endpoint"] == "GET /a"
+    assert plain.sent_messages[0][0]["concurrentRequests"] == 0
+    assert "avgResponseTime" in plain.sent_messages[0][0]
+    sender.cancel()
+    manager.stop_test("live-456")
+    hub.close("live-456")
 
 def test_endpoint_characteristics():
     generator = MetricsGenerator()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metrics_history import HISTORY_FIELDS, MetricsRing
+
+
+def _frame(requests: int, endpoints=("GET /a",)):
+    return {
+        "requests": requests,
+        "rps": float(requests),
+        "p99ResponseTime": 12.5,
+        "endpoints": [{"endpoint": endpoint, "requests": requests} for endpoint in endpoints]
+    }
+
+
+class TestMetricsRing(unittest.TestCase):
+    def test_since_cursor_returns_only_newer_windows(self):
+        """Test that a cursor from one call fetches just the windows appended after it"""
+        # Setup
+        ring = MetricsRing(capacity=10)
+        for requests in range(3):
+            ring.append(_frame(requests), timestamp=1000.0 + requests)
+
+        # Execute
+        first = ring.since()
+        ring.append(_frame(3), timestamp=1003.0)
+        second = ring.since(first["cursor"])
+
+        # Assert
+        self.assertEqual(first["cursor"], 3)
+        self.assertEqual(first["series"]["*"]["requests"], [0, 1, 2])
+        self.assertEqual(first["fields"], list(HISTORY_FIELDS))
+        self.assertEqual(second["start"], 4)
+        self.assertEqual(second["timestamps"], [1003.0])
+        self.assertEqual(second["series"]["GET /a"]["requests"], [3])
+        self.assertEqual(ring.since(second["cursor"])["timestamps"], [])
+
+    def test_ring_keeps_fixed_number_of_windows(self):
+        """Test that old windows are overwritten and cursors into them skip ahead"""
+        # Setup
+        ring = MetricsRing(capacity=4)
+
+        # Execute
+        for requests in range(10):
+            ring.append(_frame(requests))
+        history = ring.since(2)
+
+        # Assert
+        self.assertEqual(len(ring.timestamps), 4)
+        self.assertEqual(history["start"], 7)
+        self.assertEqual(history["series"]["*"]["requests"], [6, 7, 8, 9])
+        self.assertEqual(ring.since(8, limit=1)["series"]["*"]["requests"], [8])
+
+    def test_missing_series_are_gaps(self):
+        """Test that windows without data for an endpoint come back as None"""
+        # Setup
+        ring = MetricsRing(capacity=4)
+
+        # Execute
+        ring.append(_frame(1, endpoints=("GET /a",)))
+        ring.append(_frame(2, endpoints=("GET /b",)))
+        history = ring.since()
+
+        # Assert
+        self.assertEqual(history["series"]["GET /a"]["requests"], [1, None])
+        self.assertEqual(history["series"]["GET /b"]["requests"], [None, 2])
+        self.assertEqual(history["series"]["*"]["errors"], [None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
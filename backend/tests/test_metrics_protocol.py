@@ -0,0 +1,153 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metrics_protocol import StreamDecoder, StreamEncoder, TOTAL_SERIES, decode_message, encode_backfill
+
+
+def _frame(requests_a: int, p50_a: float, errors_by_status=None, with_b: bool = True):
+    endpoints = [{"endpoint": "GET /a", "requests": requests_a, "rps": float(requests_a),
+                  "p50ResponseTime": p50_a, "errorsByStatus": errors_by_status or {}}]
+    if with_b:
+        endpoints.append({"endpoint": "GET /b", "requests": 5, "rps": 5.0,
+                          "p50ResponseTime": 2.0, "errorsByStatus": {}})
+    return {
+        "type": "metrics",
+        "testId": "test-1",
+        "status": "running",
+        "requests": requests_a + (5 if with_b else 0),
+        "window": 1.0,
+        "rps": float(requests_a + (5 if with_b else 0)),
+        "endpoints": endpoints
+    }
+
+
+class TestMetricsProtocol(unittest.TestCase):
+    def test_snapshot_then_deltas_round_trip(self):
+        """Test that deltas carry only changed values and rebuild the full state in both encodings"""
+        for encoding in ("json", "binary"):
+            with self.subTest(encoding=encoding):
+                # Setup
+                encoder = StreamEncoder(encoding)
+                decoder = StreamDecoder()
+
+                # Execute
+                first = decoder.apply(encoder.push(_frame(10, 4.0)))
+                second = decoder.apply(encoder.push(_frame(10, 6.0, {"503": 2})))
+                after_second = dict(decoder.series["GET /a"])
+                third = decoder.apply(encoder.push(_frame(10, 6.0, with_b=False)))
+
+                # Assert
+                self.assertEqual(first["type"], "snapshot")
+                self.assertEqual(second["type"], "delta")
+                self.assertEqual(len(second["values"]), 2)  # p50 and the new error counter
+                self.assertEqual(second["fields"], ["errorsByStatus.503"])
+                self.assertEqual(third["seq"], 3)
+                self.assertEqual(decoder.meta["testId"], "test-1")
+                self.assertEqual(decoder.series["GET /a"]["p50ResponseTime"], 6.0)
+                self.assertEqual(after_second["errorsByStatus.503"], 2)
+                self.assertNotIn("errorsByStatus.503", decoder.series["GET /a"])
+                self.assertNotIn("GET /b", decoder.series)
+                self.assertEqual(decoder.series[TOTAL_SERIES]["requests"], 10)
+
+    def test_binary_is_smaller_than_full_frames(self):
+        """Test that binary deltas are a fraction of the size of resending the frame"""
+        # Setup
+        encoder = StreamEncoder("binary")
+        encoder.push(_frame(10, 4.0))
+
+        # Execute
+        delta = encoder.push(_frame(11, 4.0))
+
+        # Assert
+        self.assertIsInstance(delta, bytes)
+        self.assertLess(len(delta), len(StreamEncoder("json").push(_frame(11, 4.0))) / 2)
+        self.assertEqual(decode_message(delta)["type"], "delta")
+
+    def test_downsampling_sums_counters(self):
+        """Test that frames inside the interval are merged, summing counters and keeping the latest gauges"""
+        # Setup
+        encoder = StreamEncoder("json", interval=3.0)
+        decoder = StreamDecoder()
+        decoder.apply(encoder.push(_frame(10, 4.0), now=0.0))
+
+        # Execute
+        skipped = [encoder.push(_frame(20, 5.0, {"500": 1}), now=1.0),
+                   encoder.push(_frame(30, 7.0, {"500": 2}), now=2.0)]
+        decoder.apply(encoder.push(_frame(40, 8.0), now=3.0))
+
+        # Assert
+        self.assertEqual(skipped, [None, None])
+        series = decoder.series["GET /a"]
+        self.assertEqual(series["requests"], 90)
+        self.assertEqual(series["p50ResponseTime"], 8.0)
+        self.assertEqual(series["errorsByStatus.500"], 3)
+        self.assertEqual(decoder.series[TOTAL_SERIES]["window"], 3.0)
+        self.assertEqual(decoder.series[TOTAL_SERIES]["rps"], round(105 / 3.0, 2))
+
+    def test_late_snapshot_continues_shared_sequence(self):
+        """Test that a client joining mid-stream can apply the deltas other clients receive"""
+        # Setup
+        encoder = StreamEncoder("json")
+        early = StreamDecoder()
+        early.apply(encoder.push(_frame(10, 4.0)))
+        early.apply(encoder.push(_frame(12, 4.0)))
+
+        # Execute
+        late = StreamDecoder()
+        late.apply(encoder.snapshot())
+        delta = encoder.push(_frame(14, 5.0))
+        early.apply(delta)
+        late.apply(delta)
+
+        # Assert
+        self.assertEqual(late.series, early.series)
+        self.assertEqual(late.seq, early.seq)
+
+    def test_backfill_round_trip(self):
+        """Test that backfill decodes in both encodings without moving the delta sequence"""
+        # Setup
+        history = {"cursor": 2, "start": 1, "fields": ["requests"], "timestamps": [1.0, 2.0],
+                   "series": {"*": {"requests": [4, None]}}}
+
+        for encoding in ("json", "binary"):
+            with self.subTest(encoding=encoding):
+                decoder = StreamDecoder()
+
+                # Execute
+                message = decoder.apply(encode_backfill(history, encoding))
+
+                # Assert
+                self.assertEqual(message["type"], "backfill")
+                self.assertEqual(message["series"], history["series"])
+                self.assertEqual(decoder.seq, 0)
+
+
+class TestMetricsWebSocketProtocol(unittest.TestCase):
+    def test_protocol_negotiated_at_connect(self):
+        """Test that query parameters select the binary protocol and bad options are refused"""
+        from fastapi.testclient import TestClient
+        from starlette.websockets import WebSocketDisconnect
+        from main import app
+
+        # Setup
+        client = TestClient(app)
+
+        # Execute
+        with client.websocket_connect("/ws/metrics/demo-protocol?protocol=1&encoding=binary") as websocket:
+            message = decode_message(websocket.receive_bytes())
+
+        # Assert
+        self.assertEqual(message["type"], "snapshot")
+        self.assertEqual(message["v"], 1)
+        self.assertTrue(message["series"])
+        with self.assertRaises(WebSocketDisconnect):
+            with client.websocket_connect("/ws/metrics/demo-protocol?protocol=9") as websocket:
+                websocket.receive_text()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import unittest
+import asyncio
+import json
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from request_pool import RequestPool, build_requests, parameter_parts
+from api_models import DataGenerationStrategy, EndpointSchema, ParameterSchema
+from spec_cache import build_endpoint_schemas
+
+
+class TestRequestPool(unittest.TestCase):
+    def setUp(self):
+        # The lookup start_advanced_test passes in, built from a parsed endpoint
+        endpoint_schema = EndpointSchema(
+            path="/items/{item_id}",
+            method="PUT",
+            summary="Replace an item",
+            parameters=[
+                ParameterSchema(name="item_id", location="path", required=True, param_schema={"type": "integer"}),
+                ParameterSchema(name="q", location="query", required=False, param_schema={"type": "string"})
+            ],
+            request_body={
+                "type": "object",
+                "required": ["name"],
+                "properties": {"name": {"type": "string"}}
+            }
+        )
+        self.schema = build_endpoint_schemas([endpoint_schema])["PUT /items/{item_id}"]
+        self.endpoint = {"path": "/items/{item_id}", "method": "PUT"}
+
+    def _pool(self, **endpoint_options):
+        return RequestPool.for_endpoint(
+            "http://example.com/",
+            dict(self.endpoint, **endpoint_options),
+            self.schema,
+            headers={"Authorization": "Bearer token"}
+        )
+
+    def test_requests_are_pre_encoded(self):
+        """Test that path, query, headers and body are fully encoded ahead of time"""
+        # Setup
+        pool = self._pool(custom_parameters={"item_id": 7, "q": "a b", "__request_body": {"name": "widget"}})
+
+        # Execute
+        asyncio.run(pool.prepare(10))
+        request = pool.next()
+
+        # Assert
+        self.assertEqual(request.base_url, "http://example.com/")
+        self.assertEqual(request.path, "/items/7?q=a+b")
+        self.assertEqual(json.loads(request.content), {"name": "widget"})
+        self.assertEqual(request.headers["Content-Type"], "application/json")
+        self.assertEqual(request.headers["Authorization"], "Bearer token")
+
+    def test_generated_parameters_fill_path_and_query(self):
+        """Test that parameters without custom values are generated into the path and query string"""
+        # Setup
+        pool = self._pool()
+
+        # Execute
+        asyncio.run(pool.prepare(1))
+        request = pool.next()
+
+        # Assert
+        self.assertNotIn("{item_id}", request.path)
+        self.assertRegex(request.path, r"^/items/-?\d+\?q=")
+        self.assertEqual(
+            parameter_parts({"name": "id", "in": "header", "schema": {"type": "string"}}),
+            ("id", "header", {"type": "string"})
+        )
+
+    def test_query_merges_with_query_in_path(self):
+        """Test that generated query parameters join a query string already in the endpoint path"""
+        # Setup
+        self.endpoint["path"] = "/items/{item_id}?expand=owner"
+        pool = self._pool(custom_parameters={"item_id": 7, "q": "a b"})
+
+        # Execute
+        asyncio.run(pool.prepare(1))
+        request = pool.next()
+
+        # Assert
+        self.assertEqual(request.path, "/items/7?expand=owner&q=a+b")
+
+    def test_consistent_random_is_built_once(self):
+        """Test that consistent data is generated once and reused across levels"""
+        # Setup
+        pool = self._pool(data_strategy=DataGenerationStrategy.CONSISTENT_RANDOM)
+
+        # Execute
+        asyncio.run(pool.prepare(5))
+        first = pool.requests
+        asyncio.run(pool.prepare(50))
+
+        # Assert
+        self.assertEqual(len(pool.requests), 1)
+        self.assertIs(pool.requests, first)
+        self.assertIs(pool.next(), pool.next())
+
+    def test_random_each_time_refreshes(self):
+        """Test that random data is regenerated for every level with one entry per request"""
+        # Setup
+        pool = self._pool(data_strategy=DataGenerationStrategy.RANDOM_EACH_TIME)
+
+        # Execute
+        asyncio.run(pool.prepare(4))
+        first = pool.requests
+        asyncio.run(pool.prepare(8))
+
+        # Assert
+        self.assertEqual(len(first), 4)
+        self.assertEqual(len(pool.requests), 8)
+        self.assertIsNot(pool.requests, first)
+
+    def test_fresh_data_per_request_by_default(self):
+        """Test that an endpoint without a data strategy gets distinct requests, not one reused request"""
+        # Setup
+        pool = self._pool()
+
+        # Execute
+        asyncio.run(pool.prepare(20))
+        bodies = [pool.next().content for _ in range(20)]
+
+        # Assert
+        self.assertEqual(pool.strategy, DataGenerationStrategy.RANDOM_EACH_TIME)
+        self.assertTrue(pool.refreshes)
+        self.assertGreater(len(set(bodies)), 1)
+
+    def test_wrapped_ring_is_regenerated(self):
+        """Test that a random-each-time ring cycled past its end is replaced by new requests"""
+        # Setup
+        pool = self._pool()
+
+        async def run():
+            await pool.prepare(3)
+            first = pool.requests
+            for _ in range(4):
+                pool.next()
+            await pool._refill
+            pool.next()
+            return first
+
+        # Execute
+        first = asyncio.run(run())
+
+        # Assert
+        self.assertIsNot(pool.requests, first)
+        self.assertEqual(len(pool.requests), 3)
+        self.assertIsNone(pool._refill)
+
+    def test_user_defined_samples_cycle(self):
+        """Test that user-defined samples override custom parameters and are used in turn"""
+        # Setup
+        spec = self._pool(
+            data_strategy=DataGenerationStrategy.USER_DEFINED,
+            custom_parameters={"q": "shared"},
+            test_data_samples=[{"item_id": 1}, {"item_id": 2, "q": "own"}]
+        ).spec
+
+        # Execute
+        requests = build_requests(spec, 10)
+
+        # Assert
+        self.assertEqual([request.path for request in requests], ["/items/1?q=shared", "/items/2?q=own"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from response_validator import find_response_schema, validate_response
+
+
+class TestResponseValidator(unittest.TestCase):
+    def setUp(self):
+        self.schema = {
+            "type": "object",
+            "required": ["id", "tags"],
+            "properties": {
+                "id": {"type": "integer"},
+                "status": {"type": "string", "enum": ["active", "inactive"]},
+                "owner": {"type": "string", "nullable": True},
+                "tags": {"type": "array", "items": {"type": "string"}}
+            }
+        }
+
+    def test_find_response_schema(self):
+        """Test status lookup falls back to wildcard and default responses"""
+        # Setup
+        schemas = {"200": {"type": "object"}, "4XX": {"type": "string"}, "default": {"type": "null"}}
+
+        # Execute / Assert
+        self.assertEqual(find_response_schema(schemas, 200), {"type": "object"})
+        self.assertEqual(find_response_schema(schemas, 404), {"type": "string"})
+        self.assertEqual(find_response_schema(schemas, 500), {"type": "null"})
+        self.assertIsNone(find_response_schema(None, 200))
+
+    def test_valid_instance(self):
+        """Test that a conforming body produces no error"""
+        # Setup
+        instance = {"id": 1, "status": "active", "owner": None, "tags": ["a", "b"]}
+
+        # Execute
+        error = validate_response(instance, self.schema)
+
+        # Assert
+        self.assertIsNone(error)
+
+    def test_invalid_instances(self):
+        """Test that mismatches are reported with their location"""
+        # Execute / Assert
+        self.assertIn("missing required property 'tags'", validate_response({"id": 1}, self.schema))
+        self.assertIn("$.id", validate_response({"id": "1", "tags": []}, self.schema))
+        self.assertIn("$.status", validate_response({"id": 1, "tags": [], "status": "gone"}, self.schema))
+        self.assertIn("$.tags[1]", validate_response({"id": 1, "tags": ["a", 2]}, self.schema))
+
+    def test_combinators_and_refs(self):
+        """Test anyOf handling and that unresolved references are skipped"""
+        # Setup
+        schema = {"anyOf": [{"type": "integer"}, {"type": "string"}]}
+
+        # Execute / Assert
+        self.assertIsNone(validate_response("x", schema))
+        self.assertIsNotNone(validate_response([], schema))
+        self.assertIsNone(validate_response(42, {"$ref": "#/components/schemas/Item"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
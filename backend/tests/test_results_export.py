@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import csv
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api_models import EndpointResult, ExportFormat
+from results_export import PARQUET_AVAILABLE, export_stream, result_batches, sample_batches
+from sample_recorder import SampleFile, SampleRecorder
+
+
+def _record_samples(directory: str, test_id: str, count: int):
+    recorder = SampleRecorder(test_id, directory=directory)
+    for i in range(count):
+        recorder.record("GET /a" if i % 2 else "POST /b", {"response_time": 0.01, "status_code": 200})
+    recorder.record("GET /a", ConnectionError("refused"))
+    recorder.close()
+
+
+class TestResultsExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_samples_stream_in_batches(self):
+        """Test that sample rows are serialised one batch per chunk as NDJSON and CSV"""
+        # Setup
+        _record_samples(self.directory.name, "export-1", 9)
+        samples = SampleFile("export-1", directory=self.directory.name)
+
+        # Execute
+        ndjson_chunks = list(export_stream(sample_batches(samples, batch_rows=4), ExportFormat.NDJSON))
+        csv_chunks = list(export_stream(sample_batches(samples, batch_rows=4), ExportFormat.CSV))
+
+        # Assert
+        self.assertEqual(len(ndjson_chunks), 3)
+        rows = [json.loads(line) for line in b"".join(ndjson_chunks).decode().splitlines()]
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[1]["endpoint"], "GET /a")
+        self.assertEqual(rows[-1]["status_code"], 0)
+        self.assertIsNone(rows[-1]["latency"])
+        table = list(csv.DictReader(io.StringIO(b"".join(csv_chunks).decode())))
+        self.assertEqual(len(table), 10)
+        self.assertEqual(table[0]["endpoint"], "POST /b")
+
+    def test_results_rows(self):
+        """Test that per-level results export one flat row per endpoint and concurrency level"""
+        # Setup
+        results = {"results": {"GET /a": [
+            EndpointResult(endpoint="GET /a", concurrent_requests=level, success_count=level, failure_count=0,
+                           avg_response_time=0.1, min_response_time=0.1, max_response_time=0.1,
+                           status_codes={"200": level})
+            for level in (1, 2)
+        ]}}
+
+        # Execute
+        body = b"".join(export_stream(result_batches(results), ExportFormat.NDJSON)).decode()
+        rows = [json.loads(line) for line in body.splitlines()]
+
+        # Assert
+        self.assertEqual([row["concurrent_requests"] for row in rows], [1, 2])
+        self.assertEqual(json.loads(rows[1]["status_codes"]), {"200": 2})
+        self.assertNotIn("histogram", rows[0])
+
+    @unittest.skipUnless(PARQUET_AVAILABLE, "pyarrow is not installed")
+    def test_parquet_row_group_per_batch(self):
+        """Test that Parquet output streams one row group per batch and reads back whole"""
+        import pyarrow.parquet as pq
+
+        # Setup
+        _record_samples(self.directory.name, "export-2", 9)
+        samples = SampleFile("export-2", directory=self.directory.name)
+
+        # Execute
+        body = b"".join(export_stream(sample_batches(samples, batch_rows=4), ExportFormat.PARQUET))
+        parquet = pq.ParquetFile(io.BytesIO(body))
+
+        # Assert
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        self.assertEqual(parquet.read().column("endpoint").to_pylist()[:2], ["POST /b", "GET /a"])
+
+    def test_export_endpoint_streams_samples(self):
+        """Test that the export endpoint streams recorded samples with chunked encoding"""
+        from fastapi.testclient import TestClient
+        from main import app
+
+        # Setup
+        _record_samples(self.directory.name, "export-3", 5)
+        client = TestClient(app)
+
+        # Execute
+        with patch("sample_recorder.SAMPLES_DIR", Path(self.directory.name)):
+            response = client.get("/api/advanced-test/export-3/export?format=csv")
+            missing = client.get("/api/advanced-test/export-missing/export")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        # Streamed bodies have no length up front and go out chunked
+        self.assertNotIn("content-length", response.headers)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertEqual(len(response.text.strip().splitlines()), 7)
+        self.assertEqual(missing.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import asyncio
+import sys
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from results_store import ResultsStore
+from stress_tester import StressTester
+from api_models import DistributionStrategy
+from database.models import User, Session as DBSession, SessionConfiguration
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        # Setup: a private in-memory database
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        self.store = ResultsStore(engine)
+        self.stress_tester = StressTester()
+        self.stress_tester.results_store = self.store
+        self.stress_tester.level_delay = 0
+
+        async def fake_execute(**kwargs):
+            return {"response_time": 0.02, "status_code": 200, "success": True, "error_message": None}
+        self.stress_tester.execute_request = fake_execute
+
+    def _session_config_id(self) -> str:
+        db = self.store._session()
+        try:
+            user = User(email="runner@example.com")
+            session = DBSession(user=user, name="Nightly")
+            config = SessionConfiguration(session=session, endpoint_url="https://example.com/a", http_method="GET",
+                                          concurrent_users=4, ramp_up_time=0, test_duration=1, think_time=0)
+            db.add(config)
+            db.commit()
+            return str(config.id)
+        finally:
+            db.close()
+
+    def _run(self, test_id: str):
+        return asyncio.run(self.stress_tester.run_advanced_test(
+            test_id=test_id,
+            target_url="https://example.com",
+            strategy=DistributionStrategy.SEQUENTIAL,
+            max_concurrent_users=4,
+            request_rate=10,
+            duration=1,
+            endpoints=[{"path": "/a", "method": "GET"}]
+        ))
+
+    def test_finished_run_is_stored_with_histograms(self):
+        """Test that a finished run is written to the database, linked to its session config"""
+        # Setup
+        config_id = self._session_config_id()
+        self.stress_tester.session_config_ids["run-1"] = config_id
+
+        # Execute
+        self._run("run-1")
+        stored = self.store.load("run-1")
+
+        # Assert
+        live = self.stress_tester.get_advanced_results("run-1")
+        self.assertEqual(stored["session_config_id"], config_id)
+        self.assertEqual(stored["summary"], live["summary"])
+        self.assertEqual(stored["completed_requests"], self.stress_tester.completed_requests["run-1"])
+        stored_levels = stored["results"]["GET /a"]
+        self.assertEqual([r.concurrent_requests for r in stored_levels], [1, 2, 4])
+        self.assertEqual(stored_levels[-1].histogram.count, 4)
+        self.assertEqual(stored_levels[-1].p99_response_time, live["results"]["GET /a"][-1].p99_response_time)
+        self.assertIsNone(self.store.load("missing"))
+
+    def test_evicted_runs_read_back_from_store(self):
+        """Test that stored runs leave memory under the LRU limit but stay readable"""
+        # Setup
+        self.stress_tester.max_hot_tests = 1
+
+        # Execute
+        self._run("run-1")
+        self._run("run-2")
+
+        # Assert
+        self.assertNotIn("run-1", self.stress_tester.results)
+        self.assertNotIn("run-1", self.stress_tester.test_configs)
+        self.assertIn("run-2", self.stress_tester.results)
+        self.assertEqual(self.stress_tester.get_advanced_results("run-1"), {})
+        results = asyncio.run(self.stress_tester.load_advanced_results("run-1"))
+        self.assertEqual(results["summary"]["total_requests"], 7)
+        self.assertEqual(results["config"]["target_url"], "https://example.com")
+        progress = asyncio.run(self.stress_tester.load_test_progress("run-1"))
+        self.assertEqual(progress["status"], "completed")
+        self.assertTrue(progress["results_available"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api_models import EndpointResult
+from latency_histogram import LatencyHistogram
+from metrics_history import MetricsRing
+from results_summary import MAX_THROUGHPUT_POINTS, summarize_results
+
+
+def _level(endpoint: str, level: int, latencies, failures: int = 0, with_histogram: bool = True):
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    return EndpointResult(
+        endpoint=endpoint,
+        concurrent_requests=level,
+        success_count=len(latencies),
+        failure_count=failures,
+        avg_response_time=histogram.mean,
+        min_response_time=histogram.min_value or 0,
+        max_response_time=histogram.max_value or 0,
+        status_codes={"200": len(latencies), "500": failures} if failures else {"200": len(latencies)},
+        histogram=histogram if with_histogram else None
+    )
+
+
+class TestResultsSummary(unittest.TestCase):
+    def test_extremes_and_percentiles_come_from_requests(self):
+        """Test that min, max and percentiles are those of requests, not of level averages"""
+        # Setup
+        results = {
+            "GET /a": [_level("GET /a", 1, [0.010, 0.500]), _level("GET /a", 2, [0.020] * 98, failures=2)],
+            "GET /b": [_level("GET /b", 1, [0.002])]
+        }
+
+        # Execute
+        summary = summarize_results(results)
+
+        # Assert
+        self.assertEqual(summary["total_requests"], 103)
+        self.assertEqual(summary["failed_requests"], 2)
+        self.assertAlmostEqual(summary["error_rate"], 2 / 103 * 100)
+        self.assertAlmostEqual(summary["min_response_time"], 0.002)
+        self.assertAlmostEqual(summary["max_response_time"], 0.500)
+        self.assertAlmostEqual(summary["p50_response_time"], 0.020, places=3)
+        self.assertAlmostEqual(summary["avg_response_time"], (0.51 + 0.020 * 98 + 0.002) / 101)
+        self.assertEqual(summary["status_codes"], {"200": 101, "500": 2})
+        self.assertEqual(summary["endpoints"]["GET /a"]["total_requests"], 102)
+        self.assertAlmostEqual(summary["endpoints"]["GET /b"]["max_response_time"], 0.002)
+
+    def test_results_without_histograms_still_count(self):
+        """Test that stored results lacking histograms contribute their mean and extremes"""
+        # Setup
+        results = {"GET /a": [_level("GET /a", 1, [0.1, 0.3], with_histogram=False), _level("GET /a", 2, [0.2])]}
+
+        # Execute
+        summary = summarize_results(results)
+
+        # Assert
+        self.assertAlmostEqual(summary["avg_response_time"], 0.2)
+        self.assertAlmostEqual(summary["min_response_time"], 0.1)
+        self.assertAlmostEqual(summary["max_response_time"], 0.3)
+
+    def test_throughput_timeline_is_downsampled(self):
+        """Test that throughput reports the average, peak and a bounded timeline of windows"""
+        # Setup
+        history = MetricsRing()
+        for second in range(MAX_THROUGHPUT_POINTS * 3):
+            history.append({"rps": 100.0 if second == 7 else 10.0, "endpoints": []}, timestamp=1000.0 + second)
+        start = datetime(2024, 1, 1)
+
+        # Execute
+        throughput = summarize_results(
+            {"GET /a": [_level("GET /a", 1, [0.01] * 360)]}, start, start + timedelta(seconds=180), history
+        )["throughput"]
+
+        # Assert
+        self.assertAlmostEqual(throughput["avg_rps"], 2.0)
+        self.assertEqual(throughput["peak_rps"], 100.0)
+        self.assertEqual(throughput["interval"], 3.0)
+        self.assertEqual(len(throughput["rps"]), MAX_THROUGHPUT_POINTS)
+        self.assertEqual(throughput["rps"][2], 40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sample_recorder import RECORD_SIZE, SampleFile, SampleRecorder
+
+
+def _result(response_time: float, status_code: int = 200):
+    return {
+        "response_time": response_time,
+        "total_time": response_time,
+        "status_code": status_code,
+        "success": 200 <= status_code < 400
+    }
+
+
+class TestSampleRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_records_read_back_through_memory_map(self):
+        """Test that records written in chunks read back with exact percentiles per endpoint"""
+        # Setup
+        recorder = SampleRecorder("test-1", directory=self.directory.name, chunk_records=64)
+
+        # Execute
+        for i in range(1, 1001):
+            recorder.record("GET /a", _result(i / 1000))
+            recorder.record("POST /b", _result(0.5, 500 if i % 10 == 0 else 201))
+        recorder.close()
+        samples = SampleFile("test-1", directory=self.directory.name)
+        overall = samples.percentiles()
+        by_endpoint = samples.percentiles((50, 100), endpoint="GET /a")
+
+        # Assert
+        self.assertEqual(os.path.getsize(recorder.path), 2000 * RECORD_SIZE)
+        self.assertEqual(len(samples), 2000)
+        self.assertEqual(samples.endpoints, ["GET /a", "POST /b"])
+        self.assertEqual(overall["count"], 2000)
+        self.assertEqual(overall["errors"], 100)
+        self.assertEqual(by_endpoint["count"], 1000)
+        self.assertAlmostEqual(by_endpoint["percentiles"]["p50"], 0.5005, places=4)
+        self.assertAlmostEqual(by_endpoint["percentiles"]["p100"], 1.0, places=5)
+        self.assertEqual(samples.percentiles(endpoint="GET /missing")["count"], 0)
+
+    def test_time_windows_group_requests_by_start_time(self):
+        """Test that windows count requests by start time and take latency percentiles per window"""
+        # Setup
+        recorder = SampleRecorder("test-2", directory=self.directory.name)
+        base_ns = 1_700_000_000 * 10**9
+
+        # Execute
+        with patch("sample_recorder.time.time_ns") as time_ns:
+            for second, latencies in enumerate([[0.1, 0.2, 0.3], [], [0.4]]):
+                for latency in latencies:
+                    # Each request completes latency seconds after the window starts
+                    time_ns.return_value = base_ns + second * 10**9 + int(latency * 1e9)
+                    recorder.record("GET /a", _result(latency))
+            time_ns.return_value = base_ns + 2 * 10**9
+            recorder.record("GET /a", ValueError("connection reset"))
+        recorder.close()
+        windows = SampleFile("test-2", directory=self.directory.name).time_windows(width=1.0)
+
+        # Assert
+        self.assertEqual(windows["start_ns"][0], base_ns)
+        self.assertEqual(windows["requests"], [3, 0, 2])
+        self.assertEqual(windows["errors"], [0, 0, 1])
+        self.assertAlmostEqual(windows["mean"][0], 0.2, places=5)
+        self.assertAlmostEqual(windows["p50"][0], 0.2, places=5)
+        self.assertAlmostEqual(windows["p99"][0], 0.3, places=5)
+        self.assertEqual(windows["p99"][1], 0.0)
+        self.assertAlmostEqual(windows["p99"][2], 0.4, places=5)
+
+    def test_full_writer_queue_drops_chunks_instead_of_blocking(self):
+        """Test that recording never waits on a stalled writer and counts the records it dropped"""
+        # Setup: a writer stuck on its first chunk and room for one more
+        recorder = SampleRecorder("test-full", directory=self.directory.name, chunk_records=4)
+        release = threading.Event()
+        write = recorder._file.write
+        recorder._file.write = lambda chunk: (release.wait(), write(chunk))
+
+        # Execute
+        recorder._pending.maxsize = 1
+        for i in range(40):
+            recorder.record("GET /a", _result(0.01))
+        release.set()
+        recorder.close()
+
+        # Assert
+        self.assertGreater(recorder.dropped, 0)
+        self.assertEqual(os.path.getsize(recorder.path), (40 - recorder.dropped) * RECORD_SIZE)
+        self.assertEqual(len(SampleFile("test-full", directory=self.directory.name)), 40 - recorder.dropped)
+
+    def test_missing_samples_raise(self):
+        """Test that opening samples for a test that recorded none fails clearly"""
+        # Execute / Assert
+        with self.assertRaises(FileNotFoundError):
+            SampleFile("never-recorded", directory=self.directory.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import json
+import time
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openapi_parser import OpenAPIParser
+from schema_resolver import SchemaResolver
+
+
+def _spec(operations: int = 1):
+    """A spec whose operations all post an Order (nested refs) and return a recursive Category"""
+    json_body = lambda ref: {"content": {"application/json": {"schema": {"$ref": ref}}}}
+    paths = {}
+    for index in range(operations):
+        paths[f"/orders/{index}"] = {
+            "post": {
+                "parameters": [{"$ref": "#/components/parameters/Limit"}],
+                "requestBody": {"$ref": "#/components/requestBodies/Order"},
+                "responses": {"200": dict(json_body("#/components/schemas/Category"), description="ok")}
+            }
+        }
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Test API", "version": "1.0.0"},
+        "paths": paths,
+        "components": {
+            "parameters": {"Limit": {"name": "limit", "in": "query", "schema": {"$ref": "#/components/schemas/Count"}}},
+            "requestBodies": {"Order": json_body("#/components/schemas/Order")},
+            "schemas": {
+                "Count": {"type": "integer", "minimum": 1},
+                "Item": {"type": "object", "properties": {"sku": {"type": "string"}, "qty": {"$ref": "#/components/schemas/Count"}}},
+                "Order": {"type": "object", "properties": {"items": {"type": "array", "items": {"$ref": "#/components/schemas/Item"}}}},
+                "Category": {"type": "object", "properties": {
+                    "name": {"type": "string"},
+                    "children": {"type": "array", "items": {"$ref": "#/components/schemas/Category"}}
+                }}
+            }
+        }
+    }
+
+
+class TestSchemaResolver(unittest.TestCase):
+    def test_nested_refs_resolve_against_the_whole_spec(self):
+        """Test that references inside request bodies and parameters are resolved, not dropped"""
+        # Execute
+        endpoint = OpenAPIParser.parse_endpoints(_spec())[0]
+
+        # Assert
+        items = endpoint.request_body["properties"]["items"]["items"]
+        self.assertEqual(items["properties"]["qty"], {"type": "integer", "minimum": 1})
+        self.assertEqual(endpoint.parameters[0].name, "limit")
+        self.assertEqual(endpoint.parameters[0].param_schema["minimum"], 1)
+
+    def test_resolution_is_memoised_and_cycles_stay_lazy(self):
+        """Test that a reference resolves once and a recursive schema keeps its back reference"""
+        # Setup
+        spec = _spec()
+        resolver = SchemaResolver(spec)
+
+        # Execute
+        order = resolver.resolve_ref("#/components/schemas/Order")
+        category = resolver.resolve_ref("#/components/schemas/Category")
+        untouched = resolver.resolve(spec["components"]["schemas"]["Count"])
+
+        # Assert
+        self.assertIs(resolver.resolve_ref("#/components/schemas/Order"), order)
+        self.assertIs(order["properties"]["items"]["items"], resolver.resolve_ref("#/components/schemas/Item"))
+        self.assertIs(untouched, spec["components"]["schemas"]["Count"])
+        self.assertEqual(category["properties"]["children"]["items"], {"$ref": "#/components/schemas/Category"})
+        self.assertEqual(resolver.resolve_ref(category["properties"]["children"]["items"]["$ref"]), category)
+        self.assertEqual(resolver.resolve_ref("#/components/schemas/Missing"), {})
+        json.dumps(category)
+
+    def test_large_spec_parses_quickly(self):
+        """Test that a 2,000-operation spec sharing its components parses without re-resolving them per operation"""
+        # Setup
+        spec = _spec(operations=2000)
+
+        # Execute
+        start = time.perf_counter()
+        endpoints = OpenAPIParser.parse_endpoints(spec)
+        elapsed = time.perf_counter() - start
+
+        # Assert
+        self.assertEqual(len(endpoints), 2000)
+        self.assertTrue(all(endpoint.request_body["type"] == "object" for endpoint in endpoints))
+        self.assertLess(elapsed, 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
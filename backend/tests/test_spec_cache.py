@@ -0,0 +1,114 @@
+import unittest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openapi_parser import OpenAPIParser, spec_cache
+from data_generator import RequestDataGenerator
+from request_pool import encode_request, prepare_request_parts
+from spec_cache import SpecCache, build_endpoint_schemas, content_hash
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/users/{id}": {
+            "get": {
+                "summary": "Get a user",
+                "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                "responses": {"200": {"description": "A user"}}
+            }
+        }
+    }
+}
+
+
+class TestSpecCache(unittest.TestCase):
+    def tearDown(self):
+        spec_cache.invalidate()
+
+    def test_same_content_is_parsed_once(self):
+        """Test that re-storing unchanged content, or the same spec for another target, skips parsing"""
+        # Setup
+        cache = SpecCache()
+        parse = MagicMock(side_effect=OpenAPIParser.parse_endpoints)
+
+        # Execute
+        first = cache.store("https://example.com/", SPEC, parse)
+        again = cache.store("https://example.com", dict(reversed(list(SPEC.items()))), parse)
+        mirror = cache.store("https://mirror.example.com", SPEC, parse)
+        changed = cache.store("https://example.com", dict(SPEC, paths={}), parse)
+
+        # Assert
+        self.assertIs(again, first)
+        self.assertIs(mirror.endpoints, first.endpoints)
+        # The changed document only removed an operation, so nothing needed parsing
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(changed.endpoints, [])
+        self.assertNotEqual(changed.content_hash, content_hash(SPEC))
+        self.assertEqual(first.endpoint_schemas["GET /users/{id}"]["parameters"][0]["name"], "id")
+
+    def test_cached_schemas_drive_request_generation(self):
+        """Test that a parsed spec's endpoint_schemas fill path parameters when requests are built"""
+        # Setup
+        endpoint_schemas = build_endpoint_schemas(OpenAPIParser.parse_endpoints(SPEC))
+
+        # Execute
+        url, path_params, _, _, _ = prepare_request_parts(
+            RequestDataGenerator(),
+            base_url="https://example.com",
+            endpoint_path="/users/{id}",
+            method="GET",
+            endpoint_schema=endpoint_schemas["GET /users/{id}"]
+        )
+        request = encode_request(
+            {"base_url": "https://example.com", "path": "/users/{id}", "method": "GET",
+             "endpoint_schema": endpoint_schemas["GET /users/{id}"]},
+            None,
+            RequestDataGenerator()
+        )
+
+        # Assert
+        self.assertEqual(endpoint_schemas["GET /users/{id}"]["parameters"][0]["in"], "path")
+        self.assertIsInstance(path_params["id"], int)
+        self.assertRegex(request.path, r"^/users/-?\d+$")
+
+    def test_ttl_and_invalidation(self):
+        """Test that expired or invalidated targets are no longer served"""
+        # Setup
+        cache = SpecCache(ttl=60)
+        cache.store("https://a.example.com", SPEC, OpenAPIParser.parse_endpoints)
+        cache.store("https://b.example.com", SPEC, OpenAPIParser.parse_endpoints)
+
+        # Execute
+        cache.get("https://a.example.com").stored_at -= 61
+        cache.invalidate("https://b.example.com/")
+
+        # Assert
+        self.assertIsNone(cache.get("https://a.example.com"))
+        self.assertIsNone(cache.get("https://b.example.com"))
+
+    def test_test_start_reuses_listed_spec(self):
+        """Test that a parse cached by the endpoint listing is reused without fetching again"""
+        # Setup
+        fetch = AsyncMock(return_value=SPEC)
+
+        # Execute
+        with patch.object(OpenAPIParser, 'fetch_openapi_spec', fetch):
+            listed = asyncio.run(OpenAPIParser.get_endpoints("https://example.com"))
+            parsed = asyncio.run(OpenAPIParser.get_parsed_spec("https://example.com"))
+            OpenAPIParser.invalidate("https://example.com")
+            asyncio.run(OpenAPIParser.get_parsed_spec("https://example.com"))
+
+        # Assert
+        self.assertEqual(fetch.await_count, 2)
+        self.assertEqual(parsed.endpoints, listed)
+        self.assertIn("GET /users/{id}", parsed.endpoint_schemas)
+
+
+if __name__ == '__main__':
+    unittest.main()
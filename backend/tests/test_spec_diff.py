@@ -0,0 +1,137 @@
+import unittest
+import copy
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from database.crud import get_target_session_configs
+from database.models import Base, User, Session as DBSession, SessionConfiguration
+from openapi_parser import OpenAPIParser, spec_cache
+from spec_cache import SpecCache
+from spec_diff import SpecDiff, operation_hashes, path_matches
+
+
+def _spec():
+    ok = {"200": {"description": "ok", "content": {"application/json": {"schema": {"$ref": "#/components/schemas/User"}}}}}
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Test API", "version": "1.0.0"},
+        "paths": {
+            "/users": {"get": {"summary": "List users", "responses": {"200": {"description": "ok"}}}},
+            "/users/{id}": {
+                "get": {"summary": "Get a user", "responses": ok},
+                "delete": {"summary": "Delete a user", "responses": {"204": {"description": "gone"}}}
+            }
+        },
+        "components": {"schemas": {
+            "User": {"type": "object", "properties": {"name": {"type": "string"}, "address": {"$ref": "#/components/schemas/Address"}}},
+            "Address": {"type": "object", "properties": {"street": {"type": "string"}}}
+        }}
+    }
+
+
+def _next_version():
+    """Address gains a field (reaching GET /users/{id} via User), DELETE goes, POST /users arrives"""
+    spec = copy.deepcopy(_spec())
+    spec["components"]["schemas"]["Address"]["properties"]["city"] = {"type": "string"}
+    del spec["paths"]["/users/{id}"]["delete"]
+    spec["paths"]["/users"]["post"] = {"summary": "Create a user", "responses": {"201": {"description": "created"}}}
+    return spec
+
+
+class TestSpecDiff(unittest.TestCase):
+    def tearDown(self):
+        spec_cache.invalidate()
+
+    def test_operation_hashes_follow_references(self):
+        """Test that editing a component changes the hash of exactly the operations reaching it"""
+        # Execute
+        before = operation_hashes(_spec())
+        diff = SpecDiff.compare(before, operation_hashes(_next_version()))
+
+        # Assert
+        self.assertEqual(diff.changed, ["GET /users/{id}"])
+        self.assertEqual(diff.added, ["POST /users"])
+        self.assertEqual(diff.removed, ["DELETE /users/{id}"])
+        self.assertTrue(diff.affects("get", "/users/42"))
+        self.assertFalse(diff.affects("GET", "/users"))
+        self.assertTrue(path_matches("/orgs/{org}/users/{id}", "/orgs/acme/users/7/"))
+        self.assertFalse(path_matches("/users/{id}", "/users/7/posts"))
+
+    def test_only_changed_operations_are_parsed(self):
+        """Test that a new version re-parses added and changed operations and carries the rest over"""
+        # Setup
+        cache = SpecCache()
+        parse = MagicMock(side_effect=OpenAPIParser.parse_endpoints)
+        first = cache.store("https://example.com", _spec(), parse)
+
+        # Execute
+        second = cache.store("https://example.com", _next_version(), parse)
+
+        # Assert
+        self.assertEqual(parse.call_args.args[1], {"GET /users/{id}", "POST /users"})
+        self.assertIs(second.endpoints[0], first.endpoints[0])
+        self.assertEqual([(e.method, e.path) for e in second.endpoints], [("GET", "/users"), ("POST", "/users"), ("GET", "/users/{id}")])
+        address = second.endpoint_schemas["GET /users/{id}"]["responses"]["200"]["properties"]["address"]
+        self.assertIn("city", address["properties"])
+        self.assertEqual(second.diff.to_dict()["removed"], ["DELETE /users/{id}"])
+        self.assertIsNone(first.diff)
+
+    @patch('main.get_target_session_configs')
+    def test_endpoint_listing_flags_affected_configurations(self, mock_configs):
+        """Test that re-listing a changed spec reports the diff and the saved configurations it breaks"""
+        # Setup
+        client = TestClient(app)
+        saved = [
+            MagicMock(id="changed", endpoint_url="https://example.com/users/42", http_method="GET"),
+            MagicMock(id="removed", endpoint_url="https://example.com/users/7?soft=1", http_method="DELETE"),
+            MagicMock(id="untouched", endpoint_url="https://example.com/users", http_method="GET")
+        ]
+        mock_configs.return_value = saved
+        fetch = AsyncMock(side_effect=[_spec(), _next_version()])
+
+        # Execute
+        with patch.object(OpenAPIParser, 'fetch_openapi_spec', fetch):
+            first = client.post("/api/openapi-endpoints", json={"target_url": "https://example.com"}).json()
+            second = client.post("/api/openapi-endpoints", json={"target_url": "https://example.com"}).json()
+
+        # Assert
+        self.assertIsNone(first["changes"])
+        self.assertEqual(second["changes"]["changed"], ["GET /users/{id}"])
+        self.assertEqual(second["changes"]["affected_configurations"], ["changed", "removed"])
+        self.assertEqual(len(second["endpoints"]), 3)
+
+    def test_target_configurations_match_whole_base_url(self):
+        """Test that a target's saved configurations exclude other hosts and ports sharing its prefix"""
+        # Setup: a private in-memory database
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        session = DBSession(user=User(email="owner@example.com"), name="Specs")
+        for url in ("http://api", "http://api/users/1", "http://api?page=2", "http://api2/users",
+                    "http://api:8080/users", "http://api_x/users"):
+            db.add(SessionConfiguration(session=session, endpoint_url=url, http_method="GET",
+                                        concurrent_users=1, ramp_up_time=0, test_duration=1, think_time=0))
+        db.commit()
+
+        # Execute
+        matched = get_target_session_configs(db, "http://api/")
+        escaped = get_target_session_configs(db, "http://api_")
+        db.close()
+
+        # Assert
+        self.assertEqual(sorted(config.endpoint_url for config in matched),
+                         ["http://api", "http://api/users/1", "http://api?page=2"])
+        self.assertEqual(escaped, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
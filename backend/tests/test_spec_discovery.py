@@ -0,0 +1,141 @@
+import unittest
+import asyncio
+import time
+import sys
+import os
+
+import httpx
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openapi_parser import OpenAPIParser
+from spec_discovery import SpecDiscovery
+
+SPEC = {"openapi": "3.0.0", "info": {"title": "Test API", "version": "1.0.0"}, "paths": {"/users": {}}}
+
+
+class FakeTarget:
+    """MockTransport handler serving a spec at spec_path; every other route is slow or missing"""
+
+    def __init__(self, spec_path: str = "/swagger.json", delay: float = 0.2, slow_path: str = "/openapi"):
+        self.spec_path = spec_path
+        self.delay = delay
+        self.slow_path = slow_path
+        self.spec = SPEC
+        self.etag = '"v1"'
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.url.path, request.headers.get("if-none-match")))
+        path = request.url.path
+        if path == self.slow_path:
+            await asyncio.sleep(5)
+        if path == self.spec_path:
+            if request.headers.get("if-none-match") == self.etag:
+                return httpx.Response(304)
+            return httpx.Response(200, json=self.spec, headers={"ETag": self.etag})
+        await asyncio.sleep(self.delay)
+        if path == "/":
+            return httpx.Response(200, text="ok")
+        return httpx.Response(404)
+
+
+def _discovery(target) -> SpecDiscovery:
+    return SpecDiscovery(
+        find_spec_link=OpenAPIParser._extract_openapi_url_from_html,
+        transport=httpx.MockTransport(target)
+    )
+
+
+class TestSpecDiscovery(unittest.TestCase):
+    def test_probes_run_concurrently_and_first_valid_wins(self):
+        """Test that discovery returns once a spec is found, without waiting on lower-ranked probes"""
+        # Setup
+        target = FakeTarget()
+        discovery = _discovery(target)
+
+        # Execute
+        start = time.perf_counter()
+        found = asyncio.run(discovery.discover("https://example.com/"))
+        elapsed = time.perf_counter() - start
+
+        # Assert: sequential probing would wait out the 5s probe and a dozen 0.2s ones
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(found.schema, SPEC)
+        self.assertEqual(found.spec_url, "https://example.com/swagger.json")
+        self.assertFalse(found.cached)
+        self.assertEqual(discovery.cached_spec_url("https://example.com/docs"), "https://example.com/swagger.json")
+
+    def test_best_ranked_spec_wins_over_faster_probe(self):
+        """Test that a spec at a conventional path is preferred to one a special-case path serves sooner"""
+        # Setup: /openapi.json answers after the special-case /openapi does
+        async def target(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/openapi.json":
+                await asyncio.sleep(0.3)
+                return httpx.Response(200, json=SPEC)
+            if request.url.path == "/openapi":
+                return httpx.Response(200, json=dict(SPEC, info={"title": "Other", "version": "1.0.0"}))
+            await asyncio.sleep(0.1)
+            return httpx.Response(404)
+
+        # Execute
+        found = asyncio.run(_discovery(target).discover("https://example.com"))
+
+        # Assert
+        self.assertEqual(found.spec_url, "https://example.com/openapi.json")
+        self.assertEqual(found.schema, SPEC)
+
+    def test_cached_spec_url_is_revalidated_with_etag(self):
+        """Test that a repeat lookup sends one conditional GET and rediscovers only when needed"""
+        # Setup
+        target = FakeTarget(delay=0)
+        discovery = _discovery(target)
+        asyncio.run(discovery.discover("https://example.com"))
+        target.requests.clear()
+
+        # Execute
+        unchanged = asyncio.run(discovery.discover("https://example.com"))
+        revalidation = list(target.requests)
+        target.spec = dict(SPEC, paths={"/orders": {}})
+        target.etag = '"v2"'
+        changed = asyncio.run(discovery.discover("https://example.com"))
+        target.spec_path = "/api/openapi.json"
+        target.requests.clear()
+        moved = asyncio.run(discovery.discover("https://example.com"))
+
+        # Assert
+        self.assertEqual(revalidation, [("/swagger.json", '"v1"')])
+        self.assertTrue(unchanged.cached)
+        self.assertEqual(unchanged.schema, SPEC)
+        self.assertTrue(changed.cached)
+        self.assertIn("/orders", changed.schema["paths"])
+        self.assertFalse(moved.cached)
+        self.assertEqual(moved.spec_url, "https://example.com/api/openapi.json")
+        self.assertGreater(len(target.requests), 1)
+
+    def test_missing_spec_and_unreachable_target(self):
+        """Test that failed discovery reports reachable routes, or the connection error"""
+        # Setup
+        undocumented = _discovery(FakeTarget(spec_path="/nowhere", delay=0, slow_path=None))
+
+        def refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        unreachable = _discovery(refuse)
+
+        # Execute
+        missing = asyncio.run(undocumented.discover("https://example.com"))
+        down = asyncio.run(unreachable.discover("https://example.com"))
+
+        # Assert
+        self.assertIsNone(missing.schema)
+        self.assertIsNone(missing.connect_error)
+        self.assertEqual(missing.accessible, ["/"])
+        self.assertIsNone(undocumented.cached_spec_url("https://example.com"))
+        self.assertIsNone(down.schema)
+        self.assertIn("connection refused", down.connect_error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import asyncio
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+import sys
+import os
+
+from fastapi.testclient import TestClient
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import spec_loader
+from main import app
+from openapi_parser import OpenAPIParser, spec_cache
+from spec_loader import load_spec, load_spec_file
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Staging API", "version": "1.0.0"},
+    "paths": {"/orders": {"get": {"summary": "List orders", "responses": {"200": {"description": "ok"}}}}}
+}
+
+YAML_SPEC = b"""openapi: 3.0.0
+info:
+  title: Staging API
+  version: 1.0.0
+paths:
+  /orders:
+    get:
+      summary: List orders
+      responses:
+        '200':
+          description: ok
+"""
+
+
+class TestSpecLoader(unittest.TestCase):
+    def tearDown(self):
+        spec_cache.invalidate()
+
+    def test_json_and_yaml_are_detected(self):
+        """Test that specs decode by extension or, without one, by their first character"""
+        # Execute
+        from_json = load_spec(io.BytesIO(json.dumps(SPEC).encode()), "api.json")
+        from_yaml = load_spec(io.BytesIO(YAML_SPEC), "api.yml")
+        sniffed = load_spec(io.BytesIO(b"\n  " + json.dumps(SPEC).encode()))
+        sniffed_yaml = load_spec(io.BytesIO(YAML_SPEC))
+
+        # Assert
+        self.assertEqual(from_json, SPEC)
+        self.assertEqual(from_yaml, SPEC)
+        self.assertEqual(sniffed, SPEC)
+        self.assertEqual(sniffed_yaml["paths"], SPEC["paths"])
+        with self.assertRaises(ValueError):
+            load_spec(io.BytesIO(b'{"paths": {}}'), "api.json")
+        with self.assertRaises(ValueError):
+            load_spec(io.BytesIO(b'{"openapi": '), "api.json")
+
+    def test_local_paths_stay_inside_specs_dir(self):
+        """Test that local spec files load from the specs directory and paths outside it are refused"""
+        # Setup
+        with tempfile.TemporaryDirectory() as directory:
+            (Path(directory) / "staging.yaml").write_bytes(YAML_SPEC)
+
+            # Execute
+            spec = load_spec_file("staging.yaml", Path(directory))
+
+            # Assert
+            self.assertEqual(spec["info"]["title"], "Staging API")
+            with self.assertRaises(ValueError):
+                load_spec_file("../staging.yaml", Path(directory) / "nested")
+            with self.assertRaises(ValueError):
+                load_spec_file("missing.json", Path(directory))
+
+    def test_uploaded_and_local_specs_feed_the_spec_cache(self):
+        """Test that ingested specs are listed and reused by test start without probing the target"""
+        # Setup
+        client = TestClient(app)
+        fetch = AsyncMock(side_effect=AssertionError("the target must not be probed"))
+
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(spec_loader, 'SPECS_DIR', Path(directory)), \
+                patch.object(OpenAPIParser, 'fetch_openapi_spec', fetch):
+            (Path(directory) / "local.json").write_text(json.dumps(SPEC))
+
+            # Execute
+            uploaded = client.post(
+                "/api/openapi-endpoints/upload",
+                data={"target_url": "https://staging.example.com"},
+                files={"spec": ("api.yaml", YAML_SPEC, "application/yaml")}
+            )
+            local = client.post(
+                "/api/openapi-endpoints",
+                json={"target_url": "https://local.example.com", "spec_path": "local.json"}
+            )
+            spec_cache.get("https://staging.example.com").stored_at -= spec_cache.ttl * 2
+            parsed = asyncio.run(OpenAPIParser.get_parsed_spec("https://staging.example.com"))
+            invalid = client.post(
+                "/api/openapi-endpoints/upload",
+                data={"target_url": "https://staging.example.com"},
+                files={"spec": ("api.json", b"[]", "application/json")}
+            )
+
+        # Assert
+        self.assertEqual(uploaded.status_code, 200)
+        self.assertEqual(uploaded.json()["endpoints"][0]["path"], "/orders")
+        self.assertEqual(local.status_code, 200)
+        self.assertEqual(len(local.json()["endpoints"]), 1)
+        self.assertIn("GET /orders", parsed.endpoint_schemas)
+        self.assertEqual(invalid.status_code, 422)
+        fetch.assert_not_awaited()
+
+
+if __name__ == '__main__':
+    unittest.main()
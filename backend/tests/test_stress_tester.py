@@ -1,5 +1,8 @@
 import unittest
 import asyncio
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import httpx
 from unittest.mock import patch, MagicMock, AsyncMock
 import sys
@@ -9,8 +12,8 @@ from datetime import datetime
 # Add the parent directory to the path so we can import our modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from stress_tester import StressTester
-from api_models import DistributionStrategy, EndpointResult
+from stress_tester import StressTester, EndpointStats
+from api_models import DistributionStrategy, EndpointResult, LoadMode, ArrivalDistribution, ResponseBodyMode
 
 
 class TestStressTester(unittest.TestCase):
@@ -156,7 +159,441 @@ class TestStressTester(unittest.TestCase):
         self.assertEqual(result.min_response_time, 0.1)
         self.assertEqual(result.max_response_time, 0.2)
         self.assertEqual(result.status_codes, {"200": 2})
+        self.assertAlmostEqual(result.p50_response_time, 0.1, delta=0.002)
+        self.assertAlmostEqual(result.p99_response_time, 0.2, delta=0.002)
+        self.assertEqual(result.histogram.count, 2)
+        self.assertNotIn("histogram", result.model_dump())
         
+    def test_endpoint_stats_merge_round_trip(self):
+        """Test that stats serialized by a worker merge back into the same totals"""
+        # Setup
+        first = EndpointStats()
+        second = EndpointStats()
+        first.record({"success": True, "status_code": 200, "response_time": 0.1, "phases": {"connect": 0.01}})
+        second.record({"success": False, "status_code": 500, "error_message": "boom", "response_time": 0.3})
+        second.record({"success": True, "status_code": 200, "response_time": 0.2, "response_size": 10})
+        
+        # Execute
+        merged = first.merge(EndpointStats.from_dict(second.to_dict()))
+        result = merged.to_endpoint_result("GET /items", 3)
+        
+        # Assert
+        self.assertEqual(result.success_count, 2)
+        self.assertEqual(result.failure_count, 1)
+        self.assertEqual(result.status_codes, {"200": 2, "500": 1})
+        self.assertEqual(result.error_message, "boom")
+        self.assertEqual(result.max_response_time, 0.2)
+        self.assertEqual(result.connections_opened, 1)
+        self.assertEqual(result.avg_response_size, 10)
+
+    def test_dispatch_concurrently_runs_tasks_together(self):
+        """Test that dispatched requests overlap instead of running one by one"""
+        # Setup
+        self.stress_tester.active_tests[self.test_id] = True
+        collected = []
+        
+        async def slow_request(value):
+            await asyncio.sleep(0.2)
+            return value
+        
+        tasks = [(f"GET /item/{i}", slow_request(i)) for i in range(10)]
+        
+        # Execute
+        start = time.perf_counter()
+        completed = asyncio.run(self.stress_tester._dispatch_concurrently(
+            self.test_id, tasks, lambda key, result: collected.append((key, result))
+        ))
+        elapsed = time.perf_counter() - start
+        
+        # Assert
+        self.assertEqual(completed, 10)
+        self.assertEqual(sorted(result for _, result in collected), list(range(10)))
+        self.assertLess(elapsed, 1.0)
+        
+    def test_dispatch_concurrently_cancels_when_stopped(self):
+        """Test that in-flight requests are cancelled once the test is stopped"""
+        # Setup
+        self.stress_tester.active_tests[self.test_id] = False
+        self.stress_tester.cancel_timeout = 0.5
+        collected = []
+        
+        async def hanging_request():
+            await asyncio.sleep(30)
+        
+        # Execute
+        start = time.perf_counter()
+        completed = asyncio.run(self.stress_tester._dispatch_concurrently(
+            self.test_id, [("GET /slow", hanging_request())], lambda key, result: collected.append(result)
+        ))
+        elapsed = time.perf_counter() - start
+        
+        # Assert
+        self.assertEqual(completed, 0)
+        self.assertEqual(collected, [])
+        self.assertLess(elapsed, 2.0)
+        
+    def test_dispatch_concurrently_reports_exceptions(self):
+        """Test that a failing task is reported to the callback instead of aborting the batch"""
+        # Setup
+        self.stress_tester.active_tests[self.test_id] = True
+        collected = {}
+        
+        async def failing_request():
+            raise RuntimeError("boom")
+        
+        async def ok_request():
+            return "ok"
+        
+        # Execute
+        asyncio.run(self.stress_tester._dispatch_concurrently(
+            self.test_id,
+            [("GET /fail", failing_request()), ("GET /ok", ok_request())],
+            lambda key, result: collected.__setitem__(key, result)
+        ))
+        
+        # Assert
+        self.assertIsInstance(collected["GET /fail"], RuntimeError)
+        self.assertEqual(collected["GET /ok"], "ok")
+        
+    def test_run_random_test_is_concurrent(self):
+        """Test that a random test level issues its requests concurrently"""
+        # Setup
+        self.stress_tester.level_delay = 0
+        
+        async def slow_execute(**kwargs):
+            await asyncio.sleep(0.2)
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "response_time": 0.2,
+                "status_code": 200,
+                "success": True,
+                "error_message": None
+            }
+        
+        self.stress_tester.execute_request = slow_execute
+        endpoints = [{"path": "/a", "method": "GET"}, {"path": "/b", "method": "GET"}]
+        
+        # Execute
+        start = time.perf_counter()
+        results = asyncio.run(self.stress_tester.run_random_test(
+            test_id=self.test_id,
+            target_url="https://example.com",
+            endpoints=endpoints,
+            max_concurrent_users=16,
+            request_rate=1,
+            duration=1
+        ))
+        elapsed = time.perf_counter() - start
+        
+        # Assert: 5 levels of 0.2s each; sequential awaiting would take 6.2s
+        self.assertLess(elapsed, 3.0)
+        self.assertEqual(self.stress_tester.completed_requests[self.test_id], 1 + 2 + 4 + 8 + 16)
+        self.assertEqual(set(results.keys()), {"GET /a", "GET /b"})
+
+    def _mock_execute_request(self, delay: float = 0.0):
+        """Replace execute_request with a coroutine that succeeds after delay seconds"""
+        async def fake_execute(**kwargs):
+            await asyncio.sleep(delay)
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "response_time": delay,
+                "status_code": 200,
+                "success": True,
+                "error_message": None
+            }
+        self.stress_tester.execute_request = fake_execute
+        
+    def test_run_constant_rate_test_follows_schedule(self):
+        """Test that open-loop mode sends request_rate requests per second for the duration"""
+        # Setup
+        self._mock_execute_request(delay=0.01)
+        endpoints = [{"path": "/a", "method": "GET"}, {"path": "/b", "method": "GET", "weight": 3.0}]
+        
+        # Execute
+        results = asyncio.run(self.stress_tester.run_advanced_test(
+            test_id=self.test_id,
+            target_url="https://example.com",
+            strategy=DistributionStrategy.RANDOM,
+            max_concurrent_users=50,
+            request_rate=40,
+            duration=1,
+            endpoints=endpoints,
+            load_mode=LoadMode.OPEN_LOOP
+        ))
+        
+        # Assert
+        schedule = self.stress_tester.schedule_stats[self.test_id]
+        self.assertEqual(schedule["scheduled_requests"], 40)
+        self.assertEqual(schedule["sent_requests"], 40)
+        self.assertEqual(schedule["dropped_requests"], 0)
+        self.assertEqual(self.stress_tester.completed_requests[self.test_id], 40)
+        total = sum(r.success_count for rs in results.values() for r in rs)
+        self.assertEqual(total, 40)
+        self.assertIn("schedule", self.stress_tester.get_advanced_results(self.test_id)["summary"])
+
+    def test_run_profile_test_tags_results_by_phase(self):
+        """Test that a rate profile sends its scheduled arrivals and splits results by phase"""
+        # Setup
+        self._mock_execute_request(delay=0.01)
+        profile = {
+            "shape": "custom",
+            "driver": "rate",
+            "points": [
+                {"at": 0, "value": 20, "phase": "warm_up"},
+                {"at": 0.5, "value": 20},
+                {"at": 0.5, "value": 40, "phase": "steady"},
+                {"at": 1.0, "value": 40}
+            ]
+        }
+
+        # Execute
+        results = asyncio.run(self.stress_tester.run_advanced_test(
+            test_id=self.test_id,
+            target_url="https://example.com",
+            strategy=DistributionStrategy.SEQUENTIAL,
+            max_concurrent_users=50,
+            request_rate=1,
+            duration=1,
+            endpoints=[{"path": "/a", "method": "GET"}],
+            load_profile=profile
+        ))
+
+        # Assert
+        self.assertEqual([(r.phase, r.success_count) for r in results["GET /a"]], [("warm_up", 10), ("steady", 20)])
+        phases = self.stress_tester.get_advanced_results(self.test_id)["summary"]["phases"]
+        self.assertEqual(phases["steady"]["total_requests"], 20)
+
+    def test_run_profile_test_ramps_virtual_users(self):
+        """Test that a users profile ramps virtual users up and retires them when it ends"""
+        # Setup
+        self._mock_execute_request(delay=0.02)
+        self.stress_tester.profile_tick = 0.05
+        profile = {"shape": "ramp", "driver": "users", "target": 4, "ramp_up": 0.4, "steady": 0.4, "think_time": 0.01}
+
+        # Execute
+        start = time.monotonic()
+        results = asyncio.run(self.stress_tester.run_advanced_test(
+            test_id=self.test_id,
+            target_url="https://example.com",
+            strategy=DistributionStrategy.SEQUENTIAL,
+            max_concurrent_users=50,
+            request_rate=1,
+            duration=1,
+            endpoints=[{"path": "/a", "method": "GET"}],
+            load_profile=profile
+        ))
+        elapsed = time.monotonic() - start
+
+        # Assert
+        by_phase = {r.phase: r for r in results["GET /a"]}
+        self.assertEqual(set(by_phase), {"ramp_up", "steady"})
+        self.assertEqual(by_phase["steady"].concurrent_requests, 4)
+        # Four users for 0.4s at ~0.03s per request, more than the ramp sent
+        self.assertGreater(by_phase["steady"].success_count, by_phase["ramp_up"].success_count)
+        self.assertLess(elapsed, 1.5)
+
+    def test_run_adaptive_test_finds_knee(self):
+        """Test that the adaptive strategy settles on the highest concurrency meeting the SLO"""
+        # Setup: every request in flight adds 10ms of latency
+        in_flight = [0]
+
+        async def contended_execute(**kwargs):
+            in_flight[0] += 1
+            delay = 0.01 * in_flight[0]
+            await asyncio.sleep(delay)
+            in_flight[0] -= 1
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "response_time": delay,
+                "status_code": 200,
+                "success": True,
+                "error_message": None
+            }
+
+        self.stress_tester.execute_request = contended_execute
+        self.stress_tester.level_delay = 0
+        adaptive = {"max_latency": 0.045, "window": 0.1, "min_hold": 0.3, "max_hold": 0.5, "resolution": 0}
+
+        # Execute
+        results = asyncio.run(self.stress_tester.run_advanced_test(
+            test_id=self.test_id,
+            target_url="https://example.com",
+            strategy=DistributionStrategy.ADAPTIVE,
+            max_concurrent_users=50,
+            request_rate=1,
+            duration=1,
+            endpoints=[{"path": "/a", "method": "GET"}],
+            adaptive=adaptive
+        ))
+
+        # Assert: 1, 2, 4 pass, 8 breaches, then 6 and 5 narrow the gap
+        knee = self.stress_tester.get_advanced_results(self.test_id)["summary"]["knee"]
+        self.assertEqual(knee["concurrency"], 4)
+        self.assertEqual(knee["breached_at"], 5)
+        self.assertEqual([r.concurrent_requests for r in results["GET /a"]], [1, 2, 4, 8, 6, 5])
+        self.assertGreater(knee["rps"], 0)
+
+    def test_run_advanced_test_publishes_live_metrics(self):
+        """Test that a run streams per-second frames covering every request it sent"""
+        # Setup
+        self._mock_execute_request(delay=0.01)
+
+        async def run():
+            test = asyncio.ensure_future(self.stress_tester.run_advanced_test(
+                test_id=self.test_id,
+                target_url="https://example.com",
+                strategy=DistributionStrategy.RANDOM,
+                max_concurrent_users=10,
+                request_rate=30,
+                duration=2,
+                endpoints=[{"path": "/a", "method": "GET"}],
+                load_mode=LoadMode.OPEN_LOOP
+            ))
+            await asyncio.sleep(0)
+            queue = self.stress_tester.live_metrics.subscribe(self.test_id)
+            frames = []
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    break
+                frames.append(frame)
+            await test
+            return frames
+
+        # Execute
+        frames = asyncio.run(run())
+
+        # Assert
+        self.assertGreaterEqual(len(frames), 2)
+        self.assertEqual(sum(frame["requests"] for frame in frames), 60)
+        self.assertEqual(frames[-1]["totalRequests"], 60)
+        self.assertEqual(frames[-1]["status"], "completed")
+        self.assertEqual(frames[0]["endpoints"][0]["endpoint"], "GET /a")
+        history = self.stress_tester.metrics_history[self.test_id].since()
+        self.assertEqual(history["cursor"], frames[-1]["seq"])
+        self.assertEqual(sum(history["series"]["*"]["requests"]), 60)
+
+    def test_run_constant_rate_test_drops_when_saturated(self):
+        """Test that arrivals beyond max_concurrent_users are dropped rather than delayed"""
+        # Setup
+        self._mock_execute_request(delay=0.5)
+        
+        # Execute
+        asyncio.run(self.stress_tester.run_constant_rate_test(
+            test_id=self.test_id,
+            target_url="https://example.com",
+            endpoints=[{"path": "/slow", "method": "GET"}],
+            max_concurrent_users=2,
+            request_rate=20,
+            duration=1,
+            arrival_distribution=ArrivalDistribution.POISSON
+        ))
+        
+        # Assert
+        schedule = self.stress_tester.schedule_stats[self.test_id]
+        self.assertGreater(schedule["dropped_requests"], 0)
+        self.assertEqual(schedule["sent_requests"] + schedule["dropped_requests"], schedule["scheduled_requests"])
+        self.assertFalse(self.stress_tester.active_tests[self.test_id])
+
+    def _start_json_server(self, body: bytes):
+        """Serve a fixed JSON body from a throwaway local HTTP server"""
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_execute_request_reports_phases(self):
+        """Test that a real request is timed monotonically and split into phases"""
+        # Setup: a throwaway local HTTP server
+        server, base_url = self._start_json_server(b'{"ok": true}')
+        
+        async def run():
+            async with httpx.AsyncClient() as client:
+                first = await self.stress_tester.execute_request(client, base_url, "/ping")
+                second = await self.stress_tester.execute_request(client, base_url, "/ping")
+            return first, second
+        
+        # Execute
+        try:
+            first, second = asyncio.run(run())
+        finally:
+            server.shutdown()
+        
+        # Assert
+        self.assertTrue(first["success"])
+        self.assertIn("connect", first["phases"])
+        self.assertIn("pool_wait", first["phases"])
+        self.assertIn("ttfb", first["phases"])
+        self.assertIn("download", first["phases"])
+        self.assertNotIn("connect", second["phases"])  # keep-alive connection was reused
+        self.assertGreaterEqual(first["response_time"], first["phases"]["ttfb"])
+        
+        stats = EndpointStats()
+        stats.record(first)
+        stats.record(second)
+        result = stats.to_endpoint_result("GET /ping", 2)
+        self.assertEqual(result.connections_opened, 1)
+        self.assertGreater(result.avg_time_to_first_byte, 0)
+
+    def test_execute_request_body_modes(self):
+        """Test that bodies are only decoded when the body mode asks for it"""
+        # Setup
+        body = b'{"id": 1, "name": "widget"}'
+        server, base_url = self._start_json_server(body)
+        schemas = {"200": {"type": "object", "required": ["id", "price"]}}
+        
+        async def run():
+            async with httpx.AsyncClient() as client:
+                results = {}
+                for mode in ResponseBodyMode:
+                    results[mode] = await self.stress_tester.execute_request(
+                        client, base_url, "/items", body_mode=mode,
+                        sample_percent=100.0, response_schemas=schemas
+                    )
+            return results
+        
+        # Execute
+        try:
+            results = asyncio.run(run())
+        finally:
+            server.shutdown()
+        
+        # Assert
+        discard = results[ResponseBodyMode.DISCARD]
+        self.assertTrue(discard["success"])
+        self.assertIsNone(discard["response_body"])
+        self.assertNotIn("response_size", discard)
+        
+        self.assertEqual(results[ResponseBodyMode.SIZE_ONLY]["response_size"], len(body))
+        self.assertIsNone(results[ResponseBodyMode.SIZE_ONLY]["response_body"])
+        
+        self.assertEqual(results[ResponseBodyMode.SAMPLE]["response_body"], {"id": 1, "name": "widget"})
+        self.assertNotIn("validation_error", results[ResponseBodyMode.SAMPLE])
+        
+        validated = results[ResponseBodyMode.VALIDATE]
+        self.assertIn("price", validated["validation_error"])
+        
+        stats = EndpointStats()
+        for result in results.values():
+            stats.record(result)
+        endpoint_result = stats.to_endpoint_result("GET /items", 4)
+        self.assertEqual(endpoint_result.avg_response_size, len(body))
+        self.assertEqual(len(endpoint_result.response_samples), 2)
+        self.assertEqual(endpoint_result.validation_failures, 1)
+
 
 # Helper to run async tests
 def run_async_test(coro):
@@ -0,0 +1,118 @@
+import unittest
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from worker_pool import WorkerPool, split_concurrency
+from request_pool import RequestPool
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_split_concurrency(self):
+        """Test that batches are split evenly and small batches rotate across workers"""
+        # Execute / Assert
+        self.assertEqual(split_concurrency(10, 3), [(0, 4), (1, 3), (2, 3)])
+        self.assertEqual(split_concurrency(1, 4, offset=2), [(2, 1)])
+        self.assertEqual(split_concurrency(2, 4, offset=3), [(3, 1), (0, 1)])
+        self.assertEqual(split_concurrency(0, 2), [])
+
+    def test_run_batch_across_processes(self):
+        """Test that a batch sharded over worker processes is merged into one set of stats"""
+        # Setup: a throwaway local HTTP server
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        target_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        async def run():
+            pool = WorkerPool(2)
+            await pool.start()
+            try:
+                return await pool.run_batch({
+                    "target_url": target_url,
+                    "concurrent_requests": 6,
+                    "request_pool": RequestPool.for_endpoint(target_url, {"path": "/ping", "method": "GET"})
+                })
+            finally:
+                await pool.close()
+
+        # Execute
+        try:
+            stats = asyncio.run(run())
+        finally:
+            server.shutdown()
+
+        # Assert
+        self.assertEqual(stats.success_count, 6)
+        self.assertEqual(stats.failure_count, 0)
+        self.assertEqual(stats.status_codes, {"200": 6})
+        self.assertEqual(stats.histogram.count, 6)
+
+    def test_worker_exit_fails_the_batch(self):
+        """Test that a worker killed mid-batch fails the batch instead of leaving it waiting"""
+        # Setup: a local server slow enough for the batch to still be running
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(5)
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        target_url = f"http://127.0.0.1:{server.server_address[1]}"
+        job = {
+            "target_url": target_url,
+            "concurrent_requests": 2,
+            "request_pool": RequestPool.for_endpoint(target_url, {"path": "/slow", "method": "GET"})
+        }
+
+        async def run():
+            pool = WorkerPool(2)
+            await pool.start()
+            try:
+                batch = asyncio.create_task(pool.run_batch(job))
+                await asyncio.sleep(1)
+                pool._workers[0].kill()
+                with self.assertRaises(RuntimeError):
+                    await asyncio.wait_for(batch, timeout=3)
+                with self.assertRaises(RuntimeError):
+                    await pool.run_batch(job)
+            finally:
+                await pool.close()
+
+        # Execute / Assert
+        try:
+            asyncio.run(run())
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,262 @@
+import asyncio
+import itertools
+import logging
+import math
+import multiprocessing
+import multiprocessing.connection
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stats deltas streamed from a worker for a running batch
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+
+def split_concurrency(total: int, workers: int, offset: int = 0) -> List[Tuple[int, int]]:
+    """Split a batch of requests into (worker index, share) pairs.
+
+    Shares differ by at most one. Batches smaller than the pool start at ``offset``
+    so consecutive small batches land on different workers.
+    """
+    base, extra = divmod(total, workers)
+    shares = []
+    for position in range(workers):
+        share = base + (1 if position < extra else 0)
+        if share:
+            shares.append(((offset + position) % workers, share))
+    return shares
+
+
+async def _run_job(tester, job_id: int, job: Dict[str, Any], outbox, flush_interval: float):
+    """Run one shard of a batch in a worker, streaming EndpointStats deltas"""
+    from stress_tester import EndpointStats
+
+    delta = EndpointStats()
+    last_flush = time.monotonic()
+    tasks = []
+    try:
+        async with tester.client_pool.lease(
+            job["target_url"],
+            job["concurrent_requests"],
+            http2=job.get("http2", False),
+            max_connections=job.get("max_connections"),
+            max_keepalive_connections=job.get("max_keepalive_connections")
+        ) as client:
+            request_pool = job["request_pool"]
+            await request_pool.prepare(job["concurrent_requests"])
+            tasks = [asyncio.ensure_future(request) for request in tester._batch_requests(
+                client,
+                request_pool,
+                job["concurrent_requests"],
+                job.get("body_options")
+            )]
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    delta.record(await next_done)
+                except Exception as e:
+                    delta.record(e)
+                if time.monotonic() - last_flush >= flush_interval:
+                    outbox.put(("delta", job_id, delta.to_dict()))
+                    delta = EndpointStats()
+                    last_flush = time.monotonic()
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Worker batch failed: {str(e)}")
+        delta.record(e)
+    finally:
+        for task in tasks:
+            task.cancel()
+    outbox.put(("done", job_id, delta.to_dict()))
+
+
+async def _worker_loop(inbox, outbox, flush_interval: float):
+    """Event loop of a worker process: run batches until told to stop"""
+    from stress_tester import StressTester
+
+    tester = StressTester()
+    loop = asyncio.get_running_loop()
+    running = {}
+    while True:
+        message = await loop.run_in_executor(None, inbox.get)
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "cancel":
+            task = running.pop(message[1], None)
+            if task is not None:
+                task.cancel()
+        elif kind == "run":
+            job_id, job = message[1], message[2]
+            task = asyncio.create_task(_run_job(tester, job_id, job, outbox, flush_interval))
+            running[job_id] = task
+            task.add_done_callback(lambda _, job_id=job_id: running.pop(job_id, None))
+
+    for task in list(running.values()):
+        task.cancel()
+    await asyncio.gather(*running.values(), return_exceptions=True)
+    await tester.client_pool.aclose()
+
+
+def _worker_main(inbox, outbox, flush_interval: float):
+    asyncio.run(_worker_loop(inbox, outbox, flush_interval))
+
+
+class _PendingBatch:
+    """Coordinator-side state of a batch sharded across workers"""
+    def __init__(self, future: asyncio.Future, workers: List[int], on_delta: Optional[Callable[[Any], None]] = None):
+        from stress_tester import EndpointStats
+
+        self.future = future
+        self.workers = set(workers)
+        self.remaining = len(workers)
+        self.stats = EndpointStats()
+        self.on_delta = on_delta
+
+
+class WorkerPool:
+    """Shards batches of requests across worker processes.
+
+    Each worker runs its own event loop and HTTP client pool, so load generation is
+    not limited to the single core running the API. Workers stream compact
+    EndpointStats deltas (counters plus a latency histogram) back over a queue, and
+    the coordinator merges them into one result per batch. Processes are spawned
+    rather than forked so they do not inherit the parent's running event loop.
+    A worker that exits while the pool is open fails the batches it had a share
+    of, and any later batch, with RuntimeError.
+    """
+
+    def __init__(self, processes: int, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.processes = max(1, processes)
+        self.flush_interval = flush_interval
+        self._context = multiprocessing.get_context("spawn")
+        self._inboxes = []
+        self._workers = []
+        self._outbox = None
+        self._reader = None
+        self._watcher = None
+        self._loop = None
+        self._closing = False
+        self._exited: Dict[int, str] = {}
+        self._batches: Dict[int, _PendingBatch] = {}
+        self._batch_ids = itertools.count()
+
+    async def start(self):
+        """Spawn the worker processes and start collecting their results"""
+        self._loop = asyncio.get_running_loop()
+        self._outbox = self._context.Queue()
+        self._inboxes = [self._context.Queue() for _ in range(self.processes)]
+        self._workers = [
+            self._context.Process(
+                target=_worker_main,
+                args=(inbox, self._outbox, self.flush_interval),
+                daemon=True
+            )
+            for inbox in self._inboxes
+        ]
+        # Spawning imports our modules in each child, which takes a moment
+        await self._loop.run_in_executor(None, lambda: [worker.start() for worker in self._workers])
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        self._watcher = threading.Thread(target=self._watch_workers, daemon=True)
+        self._watcher.start()
+
+    def _watch_workers(self):
+        """Report each worker process as it exits"""
+        running = {worker.sentinel: index for index, worker in enumerate(self._workers)}
+        while running:
+            for sentinel in multiprocessing.connection.wait(list(running)):
+                index = running.pop(sentinel)
+                if not self._closing:
+                    self._loop.call_soon_threadsafe(self._worker_exited, index)
+
+    def _worker_exited(self, index: int):
+        worker = self._workers[index]
+        self._exited[index] = f"Worker process {worker.pid} exited with code {worker.exitcode}"
+        logger.error(self._exited[index])
+        for batch in self._batches.values():
+            if index in batch.workers and not batch.future.done():
+                batch.future.set_exception(RuntimeError(self._exited[index]))
+
+    def _read_results(self):
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                break
+            self._loop.call_soon_threadsafe(self._deliver, message)
+
+    def _deliver(self, message):
+        from stress_tester import EndpointStats
+
+        kind, batch_id, data = message
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            return
+        delta = EndpointStats.from_dict(data)
+        if batch.on_delta is not None:
+            batch.on_delta(delta)
+        batch.stats.merge(delta)
+        if kind == "done":
+            batch.remaining -= 1
+            if batch.remaining == 0 and not batch.future.done():
+                batch.future.set_result(batch.stats)
+
+    async def run_batch(self, job: Dict[str, Any], on_delta: Optional[Callable[[Any], None]] = None):
+        """Run a batch described by job across the workers and return merged EndpointStats
+
+        on_delta, if given, is called on the event loop with each EndpointStats delta as
+        workers stream it in.
+        """
+        batch_id = next(self._batch_ids)
+        total = job["concurrent_requests"]
+        shards = split_concurrency(total, self.processes, offset=batch_id)
+        exited = next((self._exited[index] for index, _ in shards if index in self._exited), None)
+        if exited is not None:
+            raise RuntimeError(exited)
+        batch = _PendingBatch(self._loop.create_future(), [index for index, _ in shards], on_delta)
+        self._batches[batch_id] = batch
+
+        for worker_index, share in shards:
+            shard = dict(job, concurrent_requests=share)
+            # Explicit connection limits are for the whole test, so split them too
+            for limit in ("max_connections", "max_keepalive_connections"):
+                if job.get(limit):
+                    shard[limit] = max(1, math.ceil(job[limit] * share / total))
+            self._inboxes[worker_index].put(("run", batch_id, shard))
+
+        try:
+            if not shards:
+                return batch.stats
+            return await batch.future
+        except (asyncio.CancelledError, RuntimeError):
+            for worker_index, _ in shards:
+                if worker_index not in self._exited:
+                    self._inboxes[worker_index].put(("cancel", batch_id))
+            raise
+        finally:
+            self._batches.pop(batch_id, None)
+
+    async def close(self, timeout: float = 5.0):
+        """Stop the workers, terminating any that do not exit in time"""
+        self._closing = True
+        for inbox in self._inboxes:
+            inbox.put(("stop",))
+
+        def join_workers():
+            deadline = time.monotonic() + timeout
+            for worker in self._workers:
+                worker.join(max(0.0, deadline - time.monotonic()))
+                if worker.is_alive():
+                    logger.warning(f"Worker process {worker.pid} did not stop; terminating it")
+                    worker.terminate()
+                    worker.join()
+
+        await asyncio.get_running_loop().run_in_executor(None, join_workers)
+        if self._watcher is not None:
+            self._watcher.join()
+        if self._reader is not None:
+            self._outbox.put(None)
+            self._reader.join()
+        self._batches.clear()
@@ -20,7 +20,7 @@ export function EndpointDataConfig({
   onDataSamplesChange
 }: EndpointDataConfigProps) {
   const [loading, setLoading] = useState(false);
-  const [dataStrategy, setDataStrategy] = useState<DataGenerationStrategy>('consistent_random');
+  const [dataStrategy, setDataStrategy] = useState<DataGenerationStrategy>('random_each_time');
   const [dataSamples, setDataSamples] = useState<EndpointTestDataSample[]>([]);
   const [activeTab, setActiveTab] = useState('sample-0');
   const [editMode, setEditMode] = useState(false); // Toggle between view/edit mode